@@ -0,0 +1,228 @@
+"""
+Banc de mesure des commandes du bot sur des campagnes synthétiques
+(generate_campaign.py).
+
+Appelle directement les coroutines des commandes (ajout, planete, systeme, stats,
+faction), les autocomplétions, load_data et save_data avec une fausse
+Interaction : aucune connexion à Discord. Pour chaque taille de campagne
+(10, 1 000, 10 000 planètes par défaut) on mesure la latence (moyenne, p50, p95,
+max) et les allocations (tracemalloc), puis on écrit le tout en JSON pour
+comparer deux commits :
+
+    python bench.py --output bench_avant.json
+    python bench.py --output bench_apres.json --compare bench_avant.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from fakes import FakeInteraction
+from generate_campaign import generate_campaign, generate_events
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# ----------------- CAMPAGNE SYNTHÉTIQUE -----------------
+def build_campaign(n_planets: int, seed: int = 0) -> dict:
+    # Sous-secteurs de 10 systèmes de 5 planètes, tronqués à la taille exacte
+    per_ss = 10 * 5
+    return generate_campaign(sous_secteurs=-(-n_planets // per_ss), systemes=10, planetes=5,
+                             phases=2, seed=seed, max_planetes=n_planets)
+
+# ----------------- MESURES -----------------
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+async def quiet(call, i: int):
+    # Les logs du bot (load_data, save_data...) ne doivent ni polluer la sortie
+    # ni coûter une écriture terminal dans la mesure
+    with contextlib.redirect_stdout(io.StringIO()):
+        await call(i)
+
+async def measure(name: str, size: int, iterations: int, call) -> dict:
+    # Passe de latence (sans tracemalloc, qui ralentit tout)
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await quiet(call, i)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Passe d'allocations sur quelques appels
+    alloc_runs = min(iterations, 5)
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for i in range(alloc_runs):
+        await quiet(call, iterations + i)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "bench": name,
+        "planets": size,
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "p50_ms": round(percentile(timings, 0.50), 4),
+        "p95_ms": round(percentile(timings, 0.95), 4),
+        "max_ms": round(max(timings), 4),
+        "alloc_peak_kb": round((peak - base) / 1024, 1),
+        "alloc_net_kb": round((current - base) / alloc_runs / 1024, 2)
+    }
+    print(f"  {name:<24} p50={result['p50_ms']:>9.3f} ms  p95={result['p95_ms']:>9.3f} ms  "
+          f"pic={result['alloc_peak_kb']:>9.1f} Ko")
+    return result
+
+async def bench_size(main, size: int, iterations: int) -> list:
+    data = build_campaign(size)
+    with open(main.DATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    for path in (main.JOURNAL_FILE, main.JOURNAL_ARCHIVE_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+    # Campagne du serveur fictif 0, rechargée depuis la campagne synthétique
+    campaign = main.CAMPAIGNS.get(0)
+    main.load_data(campaign)
+
+    planets = main.all_planets(campaign)
+    systems = main.all_systems(campaign)
+    events = [event["data"] for event in generate_events(data, iterations + 5, seed=size)]
+    planet_queries = [p[:3].lower() for p in planets[:50]] + [""]
+    system_queries = [s[:2].lower() for s in systems[:50]]
+
+    async def ajout(i):
+        event = events[i % len(events)]
+        participants = event["participants"] + [None] * (3 - len(event["participants"]))
+        await main.ajout.callback(FakeInteraction(0), event["planete"], event["gagnant"], event["choix_planete"],
+                                  *participants, phase=event["phase"])
+
+    async def planete(i):
+        await main.planete.callback(FakeInteraction(0), planets[i % len(planets)])
+
+    async def systeme(i):
+        await main.systeme.callback(FakeInteraction(0), systems[i % len(systems)])
+
+    async def stats(i):
+        await main.stats.callback(FakeInteraction(0))
+
+    async def stats_sans_cache(i):
+        campaign.render_cache.version = None  # force un rendu complet
+        await main.stats.callback(FakeInteraction(0))
+
+    async def faction(i):
+        await main.faction.callback(FakeInteraction(0))
+
+    async def autocomplete_planete(i):
+        await main.autocomplete_planete(FakeInteraction(0), planet_queries[i % len(planet_queries)])
+
+    async def autocomplete_systeme(i):
+        await main.autocomplete_systeme(FakeInteraction(0), system_queries[i % len(system_queries)])
+
+    async def autocomplete_honneur(i):
+        await main.autocomplete_honneur(FakeInteraction(0), ["pe", "fair", ""][i % 3])
+
+    async def load_data(i):
+        main.load_data(campaign)
+
+    async def save_data(i):
+        main.save_data(campaign)
+
+    # Entrées/sorties disque : moins d'itérations sur les grosses campagnes
+    io_iterations = max(3, min(iterations, 2000 // max(1, size // 100)))
+    benches = [
+        ("ajout", iterations, ajout),
+        ("planete", iterations, planete),
+        ("systeme", iterations, systeme),
+        ("stats", iterations, stats),
+        ("stats_sans_cache", iterations, stats_sans_cache),
+        ("faction", iterations, faction),
+        ("autocomplete_planete", iterations, autocomplete_planete),
+        ("autocomplete_systeme", iterations, autocomplete_systeme),
+        ("autocomplete_honneur", iterations, autocomplete_honneur),
+        ("save_data", io_iterations, save_data),
+        ("load_data", io_iterations, load_data),
+    ]
+    print(f"📊 Campagne de {size} planètes")
+    results = []
+    for name, n, call in benches:
+        results.append(await measure(name, size, n, call))
+    await campaign.persister.close()
+    return results
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+def compare(results: list, previous_path: str):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {(r["bench"], r["planets"]): r for r in json.load(f)["results"]}
+    print(f"\n🔁 Comparaison avec {previous_path} (p50, ratio > 1 = plus lent)")
+    for r in results:
+        old = previous.get((r["bench"], r["planets"]))
+        if not old or not old["p50_ms"]:
+            continue
+        ratio = r["p50_ms"] / old["p50_ms"]
+        flag = "⚠️" if ratio > 1.2 else "  "
+        print(f"{flag} {r['bench']:<24} {r['planets']:>6} planètes : {old['p50_ms']:.3f} → {r['p50_ms']:.3f} ms (x{ratio:.2f})")
+
+def import_main():
+    # Import hors-ligne : répertoire de travail jetable, stockage JSON, pas de jeton
+    os.environ.setdefault("GUILD_ID", "0")
+    os.environ.setdefault("STORAGE_BACKEND", "json")
+    os.chdir(tempfile.mkdtemp(prefix="bench_"))
+    sys.path.insert(0, ROOT)
+    import main
+    return main
+
+async def run(args) -> list:
+    main = import_main()
+    results = []
+    for size in args.sizes:
+        results.extend(await bench_size(main, size, args.iterations))
+    return results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Banc de mesure hors-ligne des commandes du bot")
+    parser.add_argument("--sizes", default="10,1000,10000",
+                        type=lambda v: [int(x) for x in v.split(",") if x.strip()],
+                        help="tailles de campagne (nombre de planètes), séparées par des virgules")
+    parser.add_argument("--iterations", type=int, default=50, help="appels mesurés par commande")
+    parser.add_argument("--output", default="bench_results.json", help="fichier JSON de résultats")
+    parser.add_argument("--compare", help="résultats JSON précédents à comparer")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.output = os.path.abspath(args.output)
+    if args.compare:
+        args.compare = os.path.abspath(args.compare)
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": "numpy" in sys.modules,
+            "iterations": args.iterations
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Résultats écrits dans {args.output}")
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,55 @@
+"""
+Fausse discord.Interaction partagée par bench.py et les tests : ce que les
+commandes lisent et appellent, sans réseau. Chaque envoi est noté dans `sent`
+sous la forme (type, contenu, arguments).
+"""
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def send_message(self, content=None, **kwargs):
+        assert not self.done, "interaction déjà acquittée"
+        self.done = True
+        self.interaction.sent.append(("message", content, kwargs))
+
+    async def defer(self, **kwargs):
+        assert not self.done, "interaction déjà acquittée"
+        self.done = True
+        self.interaction.sent.append(("defer", None, kwargs))
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        self.interaction.sent.append(("followup", content, kwargs))
+
+class FakeUser:
+    id = 1
+    display_name = "bench"
+
+    class guild_permissions:
+        administrator = True
+
+class FakeInteraction:
+    def __init__(self, guild_id: int = 1):
+        self.guild_id = guild_id
+        self.sent = []
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.user = FakeUser()
+        self.channel = None
+        self.client = None
+        self.created_at = None
+        self.extras = {}
+
+    async def edit_original_response(self, **kwargs):
+        self.sent.append(("edit", kwargs.get("content"), kwargs))
+
+    async def delete_original_response(self):
+        self.sent.append(("delete", None, {}))
@@ -0,0 +1,234 @@
+"""
+Générateur de campagnes synthétiques pour les tests de montée en charge et
+d'endurance.
+
+Produit un data.json valide pour load_data() (secteurs, sous-secteurs, systèmes,
+planètes, system_rules, active_systems, historique des phases) et, en option, un
+flux d'événements /ajout au format de journal.jsonl : au démarrage le bot
+charge l'instantané puis rejoue tout le journal.
+
+    python generate_campaign.py --secteurs 2 --sous-secteurs 6 --systemes 8 --planetes 5 \\
+        --phases 7 --evenements 20000 --sortie data.json --journal journal.jsonl
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+
+FACTIONS = ["Envahisseur", "Défenseur", "Pirate"]
+PHASES_PAR_SOUS_SECTEUR = 3  # /cloture change de sous-secteur toutes les 3 phases locales
+
+SYLLABES = ["ar", "bel", "cad", "dra", "eg", "fen", "gul", "hov", "il", "kra", "leb", "mem",
+            "neg", "or", "pra", "qua", "rim", "sol", "tel", "ud", "vor", "xan", "yul", "zer"]
+ROMAINS = ["", " II", " III", " IV", " V", " VI", " VII"]
+
+# ----------------- NOMS -----------------
+def unique_name(rng: random.Random, used: set, prefix: str = "") -> str:
+    """
+    Nom pseudo-gothique unique dans toute la campagne (les commandes cherchent les
+    planètes et les systèmes par leur seul nom).
+    """
+    while True:
+        base = "".join(rng.choice(SYLLABES) for _ in range(rng.randint(2, 3))).capitalize()
+        for suffix in ROMAINS:
+            name = f"{prefix}{base}{suffix}"
+            if name not in used:
+                used.add(name)
+                return name
+
+# ----------------- RÈGLES -----------------
+def system_rules(rng: random.Random, planets: List[str]) -> dict:
+    # Valeurs 1 ou 2 ; paliers proportionnels à la valeur totale du système,
+    # comme dans la campagne réelle (total ~7 → paliers 2 et 5, bonus à 3)
+    values = {p: rng.choices([1, 2], weights=[3, 2])[0] for p in planets}
+    total = sum(values.values())
+    first = max(1, round(total * 0.28))
+    bonus = max(first + 1, round(total * 0.42))
+    second = max(bonus + 1, round(total * 0.7))
+    return {"pv_thresholds": [first, second], "bonus_threshold": bonus, "planets": values}
+
+# ----------------- BATAILLES -----------------
+def random_battle(rng: random.Random, factions: List[str], planete: str, phase: int) -> dict:
+    # Données d'un événement /ajout (mêmes champs que la commande)
+    participants = rng.sample(factions, min(len(factions), rng.choice([2, 2, 2, 3])))
+    if len(participants) < 2:
+        participants = participants * 2  # une seule faction en lice : partie miroir
+    gagnant = "Egalite" if rng.random() < 0.1 else rng.choice(participants)
+    return {
+        "planete": planete,
+        "gagnant": gagnant,
+        "choix_planete": rng.choice(participants),
+        "participants": participants,
+        "phase": phase
+    }
+
+def play(stats: dict, battle: dict, counters: bool):
+    # Même barème que apply_bataille : 3 points au gagnant, 2 en cas d'égalité, 1 sinon
+    for f in battle["participants"]:
+        if f == battle["gagnant"]:
+            stats[f]["points"] += 3
+        elif battle["gagnant"] == "Egalite":
+            stats[f]["points"] += 2
+        else:
+            stats[f]["points"] += 1
+        if counters:
+            stats[f]["batailles"] += 1
+            if f == battle["choix_planete"]:
+                stats[f]["choix"] += 1
+
+# ----------------- CAMPAGNE -----------------
+def generate_campaign(secteurs: int = 1, sous_secteurs: int = 7, systemes: int = 5, planetes: int = 5,
+                      factions: int = 3, phases: int = 2, batailles: int = 3, seed: int = 0,
+                      max_planetes: Optional[int] = None) -> dict:
+    """
+    Campagne complète au format data.json.
+
+    `phases` phases ont déjà été clôturées dans le premier secteur (3 par
+    sous-secteur, dans l'ordre) ; la phase en cours est la suivante. Chaque phase
+    jouée compte `batailles` parties par planète du sous-secteur concerné, livrées
+    par les `factions` premières factions (les autres restent à zéro : le schéma
+    exige les trois). `max_planetes` tronque la campagne à une taille exacte.
+    """
+    rng = random.Random(seed)
+    fighting = FACTIONS[:max(1, min(factions, len(FACTIONS)))]
+    used = set()
+    sectors, rules, active = {}, {}, {}
+    count = 0
+    for _ in range(secteurs):
+        secteur = unique_name(rng, used)
+        sectors[secteur], rules[secteur], active[secteur] = {}, {}, {}
+        for _ in range(sous_secteurs):
+            ss = unique_name(rng, used)
+            sectors[secteur][ss], rules[secteur][ss], active[secteur][ss] = {}, {}, {}
+            for _ in range(systemes):
+                if max_planetes is not None and count >= max_planetes:
+                    break
+                systeme = unique_name(rng, used)
+                names = []
+                for _ in range(planetes):
+                    if max_planetes is not None and count >= max_planetes:
+                        break
+                    names.append(unique_name(rng, used, rng.choice(["", "", "", "Station "])))
+                    count += 1
+                sectors[secteur][ss][systeme] = {
+                    p: {f: {"points": 0, "batailles": 0, "choix": 0} for f in FACTIONS} for p in names
+                }
+                rules[secteur][ss][systeme] = system_rules(rng, names)
+                active[secteur][ss][systeme] = False
+            if not sectors[secteur][ss]:
+                del sectors[secteur][ss], rules[secteur][ss], active[secteur][ss]
+
+    # --- Historique : phases clôturées du premier secteur ---
+    secteur = next(iter(sectors))
+    ss_list = list(sectors[secteur])
+    # Le dernier sous-secteur s'arrête à sa 3e phase locale : au-delà, /cloture exigerait un sous-secteur suivant
+    phases = min(phases, len(ss_list) * PHASES_PAR_SOUS_SECTEUR - 1)
+    current_index = phases // PHASES_PAR_SOUS_SECTEUR
+    phases_history = {}
+    for index, ss in enumerate(ss_list[:current_index + 1]):
+        closed = PHASES_PAR_SOUS_SECTEUR if index < current_index else phases - index * PHASES_PAR_SOUS_SECTEUR
+        for local in range(1, closed + 1):
+            phase_data = {
+                "total_parties": {f: 0 for f in ["Défenseur", "Envahisseur", "Pirate"]},
+                "choix_planete": {f: 0 for f in ["Défenseur", "Envahisseur", "Pirate"]}
+            }
+            for planets in sectors[secteur][ss].values():
+                for planete, stats in planets.items():
+                    for _ in range(batailles):
+                        battle = random_battle(rng, fighting, planete, local)
+                        play(stats, battle, counters=False)
+                        for f in battle["participants"]:
+                            phase_data["total_parties"][f] += 1
+                            if f == battle["choix_planete"]:
+                                phase_data["choix_planete"][f] += 1
+            phases_history.setdefault(ss, {})[str(local)] = phase_data
+
+    # --- Phase en cours ---
+    current_ss = ss_list[current_index]
+    current_phase = len(phases_history.get(current_ss, {})) + 1
+    total_parties = {f: 0 for f in ["Défenseur", "Envahisseur", "Pirate"]}
+    for systeme, planets in sectors[secteur][current_ss].items():
+        active[secteur][current_ss][systeme] = True
+        for planete, stats in planets.items():
+            for _ in range(rng.randint(0, batailles)):
+                battle = random_battle(rng, fighting, planete, current_phase)
+                play(stats, battle, counters=True)
+                for f in battle["participants"]:
+                    total_parties[f] += 1
+
+    return {
+        "sectors": sectors,
+        "system_rules": rules,
+        "phase_courante": {"phase": current_phase, "secteur": secteur, "sous_secteur": current_ss},
+        "total_parties": total_parties,
+        "phases_history": phases_history,
+        "active_systems": active,
+        "HonneurKeyWords": ["Peinture", "Fair-play", "Héroïque", "Stratège", "Narratif"],
+        "journal_seq": 0
+    }
+
+def generate_events(campaign: dict, count: int, seed: int = 0, factions: int = 3,
+                    start_seq: int = 1) -> Iterator[dict]:
+    """
+    Flux d'événements /ajout au format du journal, sur les planètes des systèmes
+    actifs : surtout dans la phase en cours, parfois dans une phase passée du
+    sous-secteur (comme l'option `phase` de la commande).
+    """
+    rng = random.Random(seed)
+    fighting = FACTIONS[:max(1, min(factions, len(FACTIONS)))]
+    current = campaign["phase_courante"]
+    secteur, ss = current["secteur"], current["sous_secteur"]
+    planets = [
+        planete
+        for systeme, planets in campaign["sectors"][secteur][ss].items()
+        if campaign["active_systems"][secteur][ss].get(systeme)
+        for planete in planets
+    ]
+    ts = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for seq in range(start_seq, start_seq + count):
+        phase = current["phase"]
+        if phase > 1 and rng.random() < 0.1:
+            phase = rng.randint(1, phase - 1)
+        ts += timedelta(seconds=rng.randint(30, 3600))
+        yield {
+            "seq": seq,
+            "ts": ts.isoformat(timespec="seconds"),
+            "type": "bataille",
+            "data": random_battle(rng, fighting, rng.choice(planets), phase)
+        }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Génère une campagne synthétique et son flux d'événements /ajout")
+    parser.add_argument("--secteurs", type=int, default=1)
+    parser.add_argument("--sous-secteurs", type=int, default=7, help="par secteur")
+    parser.add_argument("--systemes", type=int, default=5, help="par sous-secteur")
+    parser.add_argument("--planetes", type=int, default=5, help="par système")
+    parser.add_argument("--factions", type=int, default=3, help="factions qui combattent (1 à 3)")
+    parser.add_argument("--phases", type=int, default=2, help="phases déjà clôturées")
+    parser.add_argument("--batailles", type=int, default=3, help="parties par planète et par phase jouée")
+    parser.add_argument("--evenements", type=int, default=0, help="événements /ajout à écrire dans le journal")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sortie", default="data.json")
+    parser.add_argument("--journal", default="journal.jsonl")
+    args = parser.parse_args()
+    if args.phases >= args.sous_secteurs * PHASES_PAR_SOUS_SECTEUR:
+        parser.error(f"--phases doit rester inférieur à {PHASES_PAR_SOUS_SECTEUR} × --sous-secteurs "
+                     f"({args.sous_secteurs * PHASES_PAR_SOUS_SECTEUR}) : le dernier sous-secteur n'a que "
+                     f"{PHASES_PAR_SOUS_SECTEUR} phases locales")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    campaign = generate_campaign(args.secteurs, args.sous_secteurs, args.systemes, args.planetes,
+                                 args.factions, args.phases, args.batailles, args.seed)
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(campaign, f, indent=4, ensure_ascii=False)
+    n_planets = sum(len(p) for s in campaign["sectors"].values() for ss in s.values() for p in ss.values())
+    print(f"✅ {args.sortie} : {n_planets} planètes, phase {campaign['phase_courante']['phase']} "
+          f"de {campaign['phase_courante']['sous_secteur']}")
+    if args.evenements:
+        with open(args.journal, "w", encoding="utf-8") as f:
+            for event in generate_events(campaign, args.evenements, args.seed, args.factions):
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        print(f"📜 {args.journal} : {args.evenements} événement(s) /ajout")
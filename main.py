@@ -5,12 +5,32 @@ from typing import Optional, Tuple, List
 import os
 from dotenv import load_dotenv
 import json
+import io
+import hashlib
+import sqlite3
 import threading
 import time
 import random
+from array import array
+from datetime import datetime, timezone
+import signal
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict, deque
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import asyncio
+import aiohttp
+from aiohttp import web
+import contextvars
+import functools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # le moteur de score bascule sur son implémentation Python pure
+
+STARTUP_BEGIN = time.perf_counter()  # bilan de démarrage (voir DÉMARRAGE)
 
 load_dotenv()
 
@@ -18,52 +38,260 @@ load_dotenv()
 FACTIONS = ["Envahisseur", "Défenseur", "Pirate"]
 
 # ----------------- SECTEURS, SOUS-SECTEURS, SYSTEMS & PLANETS -----------------
-SECTORS = {}  # sera chargé depuis le JSON
+# Compteurs d'une faction sur une planète, dans l'ordre du tableau de PlanetStats
+COUNTERS = ("points", "batailles", "choix")
+POINTS, BATAILLES, CHOIX = range(len(COUNTERS))
+FACTION_INDEX = {f: i for i, f in enumerate(FACTIONS)}
+JSON_FACTIONS = ["Défenseur", "Envahisseur", "Pirate"]  # ordre des factions dans data.json
+
+class PlanetStats(array):
+    """
+    Statistiques d'une planète : un seul tableau d'entiers indexé par
+    faction (ordre de FACTIONS) puis compteur (ordre de COUNTERS), au lieu d'un
+    dict par faction. Converti depuis et vers la forme de data.json
+    ({faction: {"points", "batailles", "choix"}}) par from_json / to_json.
+    """
+    __slots__ = ()
+
+    def __new__(cls, counts=None):
+        return super().__new__(cls, "i", counts if counts is not None else [0] * (len(FACTIONS) * len(COUNTERS)))
+
+    @classmethod
+    def from_json(cls, data: dict) -> "PlanetStats":
+        return cls([data[f][counter] for f in FACTIONS for counter in COUNTERS])
+
+    def to_json(self) -> dict:
+        return {f: dict(zip(COUNTERS, self.faction(f))) for f in JSON_FACTIONS}
+
+    def faction(self, faction: str) -> tuple:
+        # (points, batailles, choix)
+        start = FACTION_INDEX[faction] * len(COUNTERS)
+        return tuple(self[start:start + len(COUNTERS)])
+
+    def value(self, faction: str, counter: int) -> int:
+        return self[FACTION_INDEX[faction] * len(COUNTERS) + counter]
+
+    def set(self, faction: str, counter: int, value: int):
+        self[FACTION_INDEX[faction] * len(COUNTERS) + counter] = value
+
+    def add(self, faction: str, counter: int, delta: int):
+        self[FACTION_INDEX[faction] * len(COUNTERS) + counter] += delta
+
+    def points(self) -> list:
+        # Points par faction, dans l'ordre de FACTIONS
+        return self[POINTS::len(COUNTERS)].tolist()
+
+    def reset_phase(self):
+        # Batailles et choix remis à zéro par /cloture ; les points sont conservés
+        for i in range(0, len(self), len(COUNTERS)):
+            self[i + BATAILLES] = 0
+            self[i + CHOIX] = 0
+
+    def __repr__(self):
+        return f"PlanetStats({self.to_json()!r})"
 
 def create_planet_stats():
-    return {f: {"points": 0, "batailles": 0, "choix": 0} for f in FACTIONS}
+    return PlanetStats()
+
+def compact_planets(systems: dict):
+    # Remplace en place les statistiques lues en JSON par des PlanetStats
+    for planets in systems.values():
+        for planete, stats in planets.items():
+            if not isinstance(stats, PlanetStats):
+                planets[planete] = PlanetStats.from_json(stats)
+
+# ----------------- INDEX DE CAMPAGNE -----------------
+class CampaignIndex:
+    """
+    Index nom -> chemin dans la hiérarchie secteur → sous-secteur → système → planète.
+    Reconstruit à chaque chargement de campaign.sectors, il évite de reparcourir tout l'arbre
+    à chaque commande. En cas de doublon de nom, la première occurrence l'emporte.
 
-def find_planet(planete: str) -> Optional[Tuple[str, str, str, str]]:
+    Les sous-secteurs en sommeil (None dans campaign.sectors) n'y figurent que par leurs
+    noms : `planet` et `system` les font charger par `loader` au premier accès.
+    """
+    def __init__(self, loader=None):
+        self.planets = {}   # planète -> (secteur, sous_secteur, système, stats ou None si en sommeil)
+        self.systems = {}   # système -> (secteur, sous_secteur, planètes ou None si en sommeil)
+        self.accessed = {}  # (secteur, sous_secteur) -> dernier accès (time.monotonic)
+        self.loader = loader
+
+    def rebuild(self, sectors: dict, layout: Optional[dict] = None):
+        # layout : noms des systèmes et planètes des sous-secteurs en sommeil
+        self.planets = {}
+        self.systems = {}
+        for secteur, sous_secteurs in sectors.items():
+            for sous_secteur, systems in sous_secteurs.items():
+                if systems is None:
+                    for systeme, names in layout[(secteur, sous_secteur)].items():
+                        self.add_system(secteur, sous_secteur, systeme, None, names)
+                    continue
+                for systeme, planets in systems.items():
+                    self.add_system(secteur, sous_secteur, systeme, planets)
+
+    def add_system(self, secteur: str, sous_secteur: str, systeme: str, planets: Optional[dict],
+                   names: Optional[List[str]] = None):
+        self.systems.setdefault(systeme, (secteur, sous_secteur, planets))
+        for planete in (names if planets is None else planets):
+            stats = None if planets is None else planets[planete]
+            self.planets.setdefault(planete, (secteur, sous_secteur, systeme, stats))
+
+    def attach(self, secteur: str, sous_secteur: str, systems: Optional[dict], names: Optional[dict] = None):
+        # Sous-secteur chargé (systems) ou mis en sommeil (systems None, noms dans names)
+        for systeme, planets in (systems if systems is not None else names).items():
+            entry = self.systems.get(systeme)
+            if entry and entry[:2] == (secteur, sous_secteur):
+                self.systems[systeme] = (secteur, sous_secteur, None if systems is None else planets)
+            for planete in planets:
+                entry = self.planets.get(planete)
+                if entry and entry[:3] == (secteur, sous_secteur, systeme):
+                    stats = None if systems is None else planets[planete]
+                    self.planets[planete] = (secteur, sous_secteur, systeme, stats)
+
+    def _resolve(self, entries: dict, name: str, slot: int):
+        entry = entries.get(name)
+        if entry is None:
+            return None
+        if entry[slot] is None and self.loader:
+            self.loader(entry[0], entry[1])
+            entry = entries.get(name)
+        self.accessed[(entry[0], entry[1])] = time.monotonic()
+        return entry
+
+    def planet(self, planete: str):
+        return self._resolve(self.planets, planete, 3)
+
+    def system(self, systeme: str):
+        return self._resolve(self.systems, systeme, 2)
+
+
+def find_planet(campaign: "Campaign", planete: str) -> Optional[Tuple[str, str, str, str]]:
     """
     Retourne : secteur, sous_secteur, système, planète
     """
-    for secteur_name, sous_secteurs in SECTORS.items():
-        for sous_secteur_name, systems in sous_secteurs.items():
-            for system_name, planets in systems.items():
-                if planete in planets:
-                    return secteur_name, sous_secteur_name, system_name, planete
-    return None
+    entry = campaign.index.planet(planete)
+    if not entry:
+        return None
+    secteur, sous_secteur, systeme, _ = entry
+    return secteur, sous_secteur, systeme, planete
 
-def all_planets() -> List[str]:
-    return [
-        p
-        for sous_secteurs in SECTORS.values()
-        for systems in sous_secteurs.values()
-        for planets in systems.values()
-        for p in planets.keys()
-    ]
+def all_planets(campaign: "Campaign") -> List[str]:
+    return list(campaign.index.planets.keys())
 
-def all_systems() -> List[str]:
-    return [
-        s
-        for sous_secteurs in SECTORS.values()
-        for systems in sous_secteurs.values()
-        for s in systems.keys()
-    ]
+def all_systems(campaign: "Campaign") -> List[str]:
+    return list(campaign.index.systems.keys())
 
-def get_planet_data(planete: str):
-    info = find_planet(planete)
-    if not info:
-        return None
-    secteur, sous_secteur, systeme, planete_name = info
-    return SECTORS[secteur][sous_secteur][systeme][planete_name]
-
-def get_system_planets(systeme: str):
-    for secteur, sous_secteurs in SECTORS.items():
-        for sous_secteur, systems in sous_secteurs.items():
-            if systeme in systems:
-                return systems[systeme]
-    return None
+def get_planet_data(campaign: "Campaign", planete: str):
+    entry = campaign.index.planet(planete)
+    return entry[3] if entry else None
+
+def get_system_planets(campaign: "Campaign", systeme: str):
+    entry = campaign.index.system(systeme)
+    return entry[2] if entry else None
+
+# ----------------- INDEX DE RECHERCHE (AUTOCOMPLÉTION) -----------------
+APOSTROPHES = "'’‘`´"
+
+def normalize_search(text: str) -> str:
+    """
+    Minuscules, sans accents ni apostrophes : "Twi’tai" -> "twitai".
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    for a in APOSTROPHES:
+        text = text.replace(a, "")
+    return " ".join(text.lower().split())
+
+class SearchIndex:
+    """
+    Index d'autocomplétion construit une fois par chargement des données.
+    Les préfixes sont trouvés par dichotomie, les sous-chaînes via des trigrammes,
+    et les Choice Discord sont préparés à l'avance.
+    Classement : préfixe du nom, puis préfixe d'un mot, puis sous-chaîne.
+    """
+    def __init__(self, entries=()):
+        self.build(entries)
+
+    def build(self, entries):
+        # entries : itérable de (texte indexé, libellé affiché, valeur)
+        self.keys = []
+        self.choices = []
+        for text, name, value in entries:
+            self.keys.append(normalize_search(text))
+            self.choices.append(app_commands.Choice(name=name[:100], value=value))
+        self.sorted_keys = sorted((k, i) for i, k in enumerate(self.keys))
+        self.trigrams = {}
+        for i, k in enumerate(self.keys):
+            for j in range(len(k) - 2):
+                self.trigrams.setdefault(k[j:j + 3], set()).add(i)
+
+    def _candidates(self, query: str):
+        if len(query) < 3:
+            return range(len(self.keys))
+        sets = []
+        for j in range(len(query) - 2):
+            ids = self.trigrams.get(query[j:j + 3])
+            if not ids:
+                return []
+            sets.append(ids)
+        sets.sort(key=len)
+        return sorted(set.intersection(*sets))
+
+    def search(self, current: str, limit: int = 25) -> List[app_commands.Choice]:
+        query = normalize_search(current)
+        if not query:
+            return self.choices[:limit]
+
+        # 1. Préfixe du nom complet (ordre alphabétique)
+        results = []
+        seen = set()
+        pos = bisect_left(self.sorted_keys, (query, -1))
+        while pos < len(self.sorted_keys) and len(results) < limit:
+            key, i = self.sorted_keys[pos]
+            if not key.startswith(query):
+                break
+            results.append(i)
+            seen.add(i)
+            pos += 1
+        if len(results) >= limit:
+            return [self.choices[i] for i in results]
+
+        # 2. Préfixe d'un mot, puis 3. sous-chaîne quelconque
+        word_prefix = []
+        substring = []
+        for i in self._candidates(query):
+            if i in seen:
+                continue
+            key = self.keys[i]
+            if (" " + key).find(" " + query) != -1:
+                word_prefix.append(i)
+            elif query in key:
+                substring.append(i)
+        results += word_prefix + substring
+        return [self.choices[i] for i in results[:limit]]
+
+
+def rebuild_search_planetes(campaign: "Campaign"):
+    campaign.search_planetes.build((p, p, p) for p in all_planets(campaign))
+    campaign.search_systemes.build((s, s, s) for s in all_systems(campaign))
+
+def rebuild_search_honneur(campaign: "Campaign"):
+    campaign.search_honneur.build((kw, kw, kw) for kw in campaign.honneur_keywords)
+
+def rebuild_search_activation(campaign: "Campaign"):
+    inactifs, actifs = [], []
+    if campaign.active_systems:
+        secteur_nom = list(campaign.active_systems.keys())[0]
+        for ss, systemes in campaign.active_systems[secteur_nom].items():
+            for sys, actif in systemes.items():
+                (actifs if actif else inactifs).append((sys, f"{sys} ({ss})", sys))
+    campaign.search_activer.build(inactifs)
+    campaign.search_desactiver.build(actifs)
+
+def rebuild_search(campaign: "Campaign"):
+    rebuild_search_planetes(campaign)
+    rebuild_search_honneur(campaign)
+    rebuild_search_activation(campaign)
 
 def admin_only():
     async def predicate(interaction: discord.Interaction) -> bool:
@@ -71,13 +299,7 @@ def admin_only():
         return interaction.user.guild_permissions.administrator
     return app_commands.check(predicate)
 
-# ----------------- SYSTEM RULES -----------------
-SYSTEM_RULES = {}  # sera chargé depuis le JSON
-
 # ----------------- PHASES -----------------
-CURRENT_PHASE = {}
-TOTAL_PARTIES = {f: 0 for f in FACTIONS}
-PHASES_HISTORY = {}
 DATA_FILE = "data.json"
 
 PLANET_VALUE_ICONS = {
@@ -85,116 +307,2258 @@ PLANET_VALUE_ICONS = {
     2: "⭐⭐"
 }
 
-# ----------------- HONNEUR -----------------
-HonneurKeyWords = []
+ICONS = {"Défenseur": "🛡️", "Envahisseur": "⚔️", "Pirate": "💀"}
 
-ACTIVE_SYSTEMS = {}  # sera chargé depuis le JSON
+# ----------------- MOTEUR DE SCORE -----------------
+# Définition unique du contrôle : une planète est contrôlée par une faction si
+# celle-ci est seule en tête avec plus de 0 point. Les PV d'un système sont la
+# somme des valeurs (system_rules.planets) des planètes que chaque faction contrôle.
+def system_rules_for(campaign: "Campaign", secteur: str, sous_secteur: str, systeme: str) -> dict:
+    rules = ((campaign.system_rules.get(secteur) or {}).get(sous_secteur) or {}).get(systeme)
+    if rules is None:
+        rules = campaign.system_rules.get(systeme, {})  # ancien format, règles à la racine
+    return rules
+
+def score_row(scores: list) -> Tuple[tuple, int]:
+    # Indices des factions en tête (> 0 point) et faction qui contrôle (-1 sinon)
+    top_score = max(scores)
+    top = tuple(i for i, pts in enumerate(scores) if pts == top_score and pts > 0)
+    return top, top[0] if len(top) == 1 else -1
+
+class ScoringEngine:
+    """
+    Points de toute la campagne rangés dans une matrice planètes × factions
+    (colonnes dans l'ordre de FACTIONS). Meneurs, égalités, planètes contrôlées
+    et PV par système sont calculés en une passe au chargement (vectorisée avec
+    NumPy s'il est installé), puis tenus à jour planète par planète par
+    `update_planet` à chaque bataille ou modification.
+    """
+    def __init__(self, campaign: "Campaign"):
+        self.campaign = campaign
+        self.rows = {}        # (secteur, sous_secteur, système, planète) -> ligne
+        self.row_system = []  # ligne -> indice système
+        self.values = []      # ligne -> valeur de la planète (PV)
+        self.top = []         # ligne -> indices des factions en tête avec > 0 point
+        self.controller = []  # ligne -> indice de la faction qui contrôle, ou -1
+        self.systems = {}     # (secteur, sous_secteur, système) -> indice
+        self.rules = []       # indice système -> règles
+        self.pv = []          # indice système -> PV par faction
+        self.controlled = []  # indice système -> planètes contrôlées par faction
+
+    def rebuild(self):
+        self.rows, self.systems, self.rules = {}, {}, []
+        matrix, values, system_ids = [], [], []
+        for secteur, sous_secteurs in self.campaign.sectors.items():
+            for ss, systemes in sous_secteurs.items():
+                if systemes is None:
+                    continue  # sous-secteur en sommeil
+                for systeme, planets in systemes.items():
+                    sys_id = len(self.rules)
+                    self.systems[(secteur, ss, systeme)] = sys_id
+                    rules = system_rules_for(self.campaign, secteur, ss, systeme)
+                    self.rules.append(rules)
+                    planet_values = rules.get("planets", {})
+                    for planete, data in planets.items():
+                        self.rows[(secteur, ss, systeme, planete)] = len(matrix)
+                        matrix.append(data.points())
+                        values.append(planet_values.get(planete, 0))
+                        system_ids.append(sys_id)
+        self.row_system, self.values = system_ids, values
+
+        n_factions = len(FACTIONS)
+        if np is not None and matrix:
+            points = np.array(matrix, dtype=np.int64)
+            np_values = np.array(values, dtype=np.int64)
+            np_systems = np.array(system_ids, dtype=np.int64)
+            top_score = points.max(axis=1)
+            is_top = (points == top_score[:, None]) & (top_score[:, None] > 0)
+            controlled = is_top.sum(axis=1) == 1
+            controller = np.where(controlled, is_top.argmax(axis=1), -1)
+            pv = np.zeros((len(self.rules), n_factions), dtype=np.int64)
+            counts = np.zeros((len(self.rules), n_factions), dtype=np.int64)
+            np.add.at(pv, (np_systems[controlled], controller[controlled]), np_values[controlled])
+            np.add.at(counts, (np_systems[controlled], controller[controlled]), 1)
+            self.top = [tuple(np.flatnonzero(row).tolist()) for row in is_top]
+            self.controller = controller.tolist()
+            self.pv = pv.tolist()
+            self.controlled = counts.tolist()
+        else:
+            self.top, self.controller = [], []
+            self.pv = [[0] * n_factions for _ in self.rules]
+            self.controlled = [[0] * n_factions for _ in self.rules]
+            for scores, value, sys_id in zip(matrix, values, system_ids):
+                top, leader = score_row(scores)
+                self.top.append(top)
+                self.controller.append(leader)
+                if leader >= 0:
+                    self.pv[sys_id][leader] += value
+                    self.controlled[sys_id][leader] += 1
+
+    def update_planet(self, secteur: str, sous_secteur: str, systeme: str, planete: str) -> dict:
+        """
+        Recalcule une seule planète après un changement de points et reporte le
+        delta sur les PV de son système. Retourne le changement de contrôle et les
+        paliers franchis.
+        """
+        row = self.rows[(secteur, sous_secteur, systeme, planete)]
+        sys_id = self.row_system[row]
+        pv_before = list(self.pv[sys_id])
+        data = self.campaign.sectors[secteur][sous_secteur][systeme][planete]
+        old = self.controller[row]
+        self.top[row], leader = score_row(data.points())
+        self.controller[row] = leader
+        if leader != old:
+            if old >= 0:
+                self.pv[sys_id][old] -= self.values[row]
+                self.controlled[sys_id][old] -= 1
+            if leader >= 0:
+                self.pv[sys_id][leader] += self.values[row]
+                self.controlled[sys_id][leader] += 1
+        return {
+            "ancien": FACTIONS[old] if old >= 0 else None,
+            "nouveau": FACTIONS[leader] if leader >= 0 else None,
+            "paliers": self.crossed_thresholds(sys_id, pv_before)
+        }
+
+    def crossed_thresholds(self, sys_id: int, pv_before: list) -> List[dict]:
+        rules = self.rules[sys_id]
+        steps = [(t, "pv") for t in rules.get("pv_thresholds", [5])]
+        steps.append((rules.get("bonus_threshold", 3), "bonus"))
+        crossed = []
+        for i, f in enumerate(FACTIONS):
+            before, after = pv_before[i], self.pv[sys_id][i]
+            for threshold, kind in steps:
+                if before < threshold <= after:
+                    crossed.append({"faction": f, "seuil": threshold, "type": kind, "atteint": True})
+                elif after < threshold <= before:
+                    crossed.append({"faction": f, "seuil": threshold, "type": kind, "atteint": False})
+        return crossed
+
+    def leaders(self, secteur: str, sous_secteur: str, systeme: str, planete: str) -> List[str]:
+        # Factions en tête (🏆 si une seule, ⚖️ en cas d'égalité)
+        return [FACTIONS[i] for i in self.top[self.rows[(secteur, sous_secteur, systeme, planete)]]]
+
+    def owner(self, secteur: str, sous_secteur: str, systeme: str, planete: str) -> Optional[str]:
+        leader = self.controller[self.rows[(secteur, sous_secteur, systeme, planete)]]
+        return FACTIONS[leader] if leader >= 0 else None
+
+    def system_pv(self, secteur: str, sous_secteur: str, systeme: str) -> dict:
+        pv = self.pv[self.systems[(secteur, sous_secteur, systeme)]]
+        return {f: pv[i] for i, f in enumerate(FACTIONS)}
+
+    def system_controlled(self, secteur: str, sous_secteur: str, systeme: str) -> dict:
+        counts = self.controlled[self.systems[(secteur, sous_secteur, systeme)]]
+        return {f: counts[i] for i, f in enumerate(FACTIONS)}
+
+    def thresholds_reached(self, secteur: str, sous_secteur: str, systeme: str) -> dict:
+        # Par faction : paliers de PV atteints et bonus atteint ou non
+        sys_id = self.systems[(secteur, sous_secteur, systeme)]
+        rules = self.rules[sys_id]
+        pv_thresholds = rules.get("pv_thresholds", [5])
+        bonus_threshold = rules.get("bonus_threshold", 3)
+        return {
+            f: {
+                "paliers": [t for t in pv_thresholds if self.pv[sys_id][i] >= t],
+                "bonus": self.pv[sys_id][i] >= bonus_threshold
+            }
+            for i, f in enumerate(FACTIONS)
+        }
+
+
+# ----------------- AGRÉGATS PAR FACTION -----------------
+class FactionTotals:
+    """
+    Compteurs de /faction tenus à jour par les événements (bataille, modif,
+    clôture) au lieu d'être recalculés à chaque commande : parties des phases
+    clôturées, batailles et choix de la phase en cours, planètes contrôlées et
+    systèmes dominés dans le sous-secteur courant. Reconstruits une seule fois
+    au chargement (install_data) ; /faction n'est plus qu'une lecture.
+    """
+    def __init__(self, campaign: "Campaign"):
+        n = len(FACTIONS)
+        self.campaign = campaign
+        self.history = [0] * n     # total_parties de campaign.phases_history, par faction
+        self.batailles = [0] * n   # phase en cours, planètes du sous-secteur courant
+        self.choix = [0] * n
+        self.controlled = [0] * n  # planètes contrôlées dans le sous-secteur courant
+        self.systems = {}          # système du sous-secteur courant -> planètes contrôlées par faction
+        self.scope = (None, None)  # (secteur, sous_secteur) courant
+
+    def rebuild(self):
+        self.history = [0] * len(FACTIONS)
+        for phases in self.campaign.phases_history.values():
+            for phase_data in phases.values():
+                self.add_history(phase_data["total_parties"])
+        self.rebuild_phase()
+
+    def add_history(self, total_parties: dict):
+        for f, count in total_parties.items():
+            if f in FACTION_INDEX:
+                self.history[FACTION_INDEX[f]] += count
+
+    def rebuild_phase(self):
+        # Compteurs du sous-secteur courant seulement : au chargement et après /cloture
+        campaign = self.campaign
+        secteur, sous_secteur = campaign.current_phase.get("secteur"), campaign.current_phase.get("sous_secteur")
+        n, step = len(FACTIONS), len(COUNTERS)
+        self.scope = (secteur, sous_secteur)
+        self.batailles, self.choix, self.controlled = [0] * n, [0] * n, [0] * n
+        self.systems = {}
+        for systeme, planets in (campaign.sectors.get(secteur, {}).get(sous_secteur) or {}).items():
+            for data in planets.values():
+                for i in range(n):
+                    self.batailles[i] += data[i * step + BATAILLES]
+                    self.choix[i] += data[i * step + CHOIX]
+            counts = list(campaign.scoring.system_controlled(secteur, sous_secteur, systeme).values())
+            self.systems[systeme] = counts
+            for i in range(n):
+                self.controlled[i] += counts[i]
+
+    def battle(self, secteur: str, sous_secteur: str, participants: List[str], choix_planete: str, current_phase: bool):
+        if not current_phase:
+            # Phase passée : comptée dans l'historique, comme dans phases_history
+            self.add_history({f: 1 for f in participants})
+        elif (secteur, sous_secteur) == self.scope:
+            for f in participants:
+                self.batailles[FACTION_INDEX[f]] += 1
+                if f == choix_planete:
+                    self.choix[FACTION_INDEX[f]] += 1
+
+    def battles_changed(self, secteur: str, sous_secteur: str, faction: str, delta: int):
+        if (secteur, sous_secteur) == self.scope:
+            self.batailles[FACTION_INDEX[faction]] += delta
+
+    def control_changed(self, secteur: str, sous_secteur: str, systeme: str, change: dict):
+        # change : retour de ScoringEngine.update_planet
+        if (secteur, sous_secteur) != self.scope or change["ancien"] == change["nouveau"]:
+            return
+        counts = self.systems[systeme]
+        for faction, delta in ((change["ancien"], -1), (change["nouveau"], 1)):
+            if faction:
+                counts[FACTION_INDEX[faction]] += delta
+                self.controlled[FACTION_INDEX[faction]] += delta
+
+    def report(self, faction: str) -> dict:
+        i = FACTION_INDEX[faction]
+        return {
+            "historique": self.history[i] + self.batailles[i],
+            "batailles": self.batailles[i],
+            "choix": self.choix[i],
+            "planetes": self.controlled[i],
+            "systemes": {systeme: counts[i] for systeme, counts in self.systems.items() if counts[i] > 0}
+        }
+
+
+# ----------------- SOUS-SECTEURS EN SOMMEIL -----------------
+# Seuls les sous-secteurs en jeu (sous-secteur courant, ou au moins un système actif)
+# sont gardés en mémoire. Les autres valent None dans campaign.sectors (et campaign.system_rules) :
+# l'index ne garde que leurs noms, ils sont relus depuis le stockage au premier accès
+# (/planete, /systeme, /ajout…) et remis en sommeil après SUB_SECTOR_IDLE_TIMEOUT
+# secondes sans accès. phases_history reste entièrement chargé : quelques entiers par
+# phase, et /faction additionne l'historique de tous les sous-secteurs.
+# Réservé au backend SQLite, qui relit un sous-secteur par requête indexée : avec
+# data.json, chaque relecture et chaque instantané repasseraient par tout le fichier.
+LAZY_SUB_SECTORS = os.getenv("LAZY_SUB_SECTORS", "1") != "0"
+SUB_SECTOR_IDLE_TIMEOUT = float(os.getenv("SUB_SECTOR_IDLE_TIMEOUT", "600"))
+
+def sub_sector_in_play(secteur: str, sous_secteur: str, systemes, active_systems: dict, current_phase: dict) -> bool:
+    if not LAZY_SUB_SECTORS:
+        return True
+    if (current_phase.get("secteur"), current_phase.get("sous_secteur")) == (secteur, sous_secteur):
+        return True
+    # Un système absent de active_systems compte comme actif (voir /stats)
+    actifs = active_systems.get(secteur, {}).get(sous_secteur, {})
+    return any(actifs.get(systeme, True) for systeme in systemes)
+
+def split_dormant(sectors: dict, system_rules: dict, layout: dict, active_systems: dict, current_phase: dict):
+    """
+    Met en sommeil (None) les sous-secteurs hors jeu de `sectors` et de `system_rules`,
+    en place, et range les noms de leurs systèmes et planètes dans `layout`.
+    """
+    for secteur, sous_secteurs in sectors.items():
+        for ss, systems in sous_secteurs.items():
+            if systems is None:
+                continue  # déjà en sommeil (lecture partielle de SQLite)
+            if sub_sector_in_play(secteur, ss, systems, active_systems, current_phase):
+                continue
+            layout[(secteur, ss)] = {systeme: list(planets) for systeme, planets in systems.items()}
+            sous_secteurs[ss] = None
+            rules = system_rules.get(secteur)
+            if isinstance(rules, dict) and isinstance(rules.get(ss), dict):
+                rules[ss] = None
+
+def ensure_sub_sector(campaign: "Campaign", secteur: str, sous_secteur: str):
+    if sous_secteur in campaign.sectors.get(secteur, {}) and campaign.sectors[secteur][sous_secteur] is None:
+        campaign.load_sub_sector(secteur, sous_secteur)
 
 # ----------------- LOAD/SAVE DATA -----------------
-def load_data():
-    global SECTORS, SYSTEM_RULES, ACTIVE_SYSTEMS, CURRENT_PHASE, TOTAL_PARTIES, PHASES_HISTORY, HonneurKeyWords
+def install_data(campaign: "Campaign", data: dict) -> int:
+    """
+    Remplace tout l'état d'un coup (fonction synchrone : aucune commande ne peut
+    s'exécuter au milieu), puis rejoue la fin du journal. Retourne le nombre
+    d'événements rejoués.
+    """
+    campaign.sectors = data.get("sectors", campaign.sectors)
+    campaign.system_rules = data.get("system_rules", campaign.system_rules)
+    campaign.active_systems = data.get("active_systems", campaign.active_systems)
+    campaign.current_phase = data.get("phase_courante", {"phase": 1, "secteur": "Eguedine"})
+    campaign.total_parties = data.get("total_parties", {f: 0 for f in FACTIONS})
+    campaign.phases_history = data.get("phases_history", {})
+    campaign.honneur_keywords = data.get("HonneurKeyWords", [])
+    campaign.layout = data.get("layout", {})
+    if campaign.store.lazy:
+        split_dormant(campaign.sectors, campaign.system_rules, campaign.layout,
+                      campaign.active_systems, campaign.current_phase)
+    for sous_secteurs in campaign.sectors.values():
+        for systems in sous_secteurs.values():
+            if systems is not None:
+                compact_planets(systems)
+    campaign.index.rebuild(campaign.sectors, campaign.layout)
+    campaign.scoring.rebuild()
+    campaign.faction_totals.rebuild()
+    campaign.dirty_planets.clear()
+    replayed = replay_journal(campaign, data.get("journal_seq", 0))
+    rebuild_search(campaign)
+    return replayed
+
+def load_data(campaign: "Campaign"):
     try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            SECTORS = data.get("sectors", SECTORS)
-            SYSTEM_RULES = data.get("system_rules", SYSTEM_RULES)
-            ACTIVE_SYSTEMS = data.get("active_systems", ACTIVE_SYSTEMS)
-            CURRENT_PHASE = data.get("phase_courante", {"phase": 1, "secteur": "Eguedine"})
-            TOTAL_PARTIES = data.get("total_parties", {f: 0 for f in FACTIONS})
-            PHASES_HISTORY = data.get("phases_history", {})
-            HonneurKeyWords = data.get("HonneurKeyWords", [])
-            print("✅ Données chargées depuis data.json")
+        replayed = install_data(campaign, campaign.store.load())
+        print(f"✅ Données chargées depuis {campaign.store.label}")
+        if replayed:
+            print(f"📜 {replayed} événement(s) rejoué(s) depuis {campaign.journal.path}")
     except FileNotFoundError:
-        print("⚠️ data.json introuvable, création du fichier par défaut")
-        save_data()
+        print(f"⚠️ {campaign.store.label} introuvable, création du fichier par défaut")
+        save_data(campaign)
     except Exception as e:
         print(f"❌ Erreur lors du chargement des données : {e}")
 
-def save_data():
+def snapshot_data(campaign: "Campaign") -> dict:
+    """
+    Copie structurelle de l'état, prise sur la boucle asyncio pour que
+    l'écriture en arrière-plan ne voie jamais un état à moitié modifié.
+    Les sous-secteurs en sommeil y valent None : le stockage les complète
+    depuis le disque (liste « dormant »).
+    """
+    dormant = [
+        [secteur, ss]
+        for secteur, sous_secteurs in campaign.sectors.items()
+        for ss, systems in sous_secteurs.items() if systems is None
+    ]
+    return copy_json({
+        "sectors": campaign.sectors,
+        "system_rules": campaign.system_rules,
+        "active_systems": campaign.active_systems,
+        "phase_courante": campaign.current_phase,
+        "total_parties": campaign.total_parties,
+        "phases_history": campaign.phases_history,
+        "HonneurKeyWords": campaign.honneur_keywords,
+        "journal_seq": campaign.journal.seq,
+        "dormant": dormant
+    })
+
+def copy_json(obj):
+    if isinstance(obj, PlanetStats):
+        return obj.to_json()
+    if isinstance(obj, dict):
+        return {k: copy_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [copy_json(v) for v in obj]
+    return obj
+
+def write_json_atomic(path: str, payload: dict) -> str:
+    # Fichier temporaire + fsync + rename : data.json n'est jamais tronqué.
+    # Retourne l'empreinte du contenu écrit.
+    raw = json.dumps(payload, indent=4, ensure_ascii=False).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return hashlib.sha256(raw).hexdigest()
+
+def validate_data(data: dict):
+    """
+    Vérifie la structure d'un data.json avant de l'installer (ValueError sinon).
+    """
+    if not isinstance(data, dict):
+        raise ValueError("le document doit être un objet JSON")
+    for key in ("sectors", "system_rules", "active_systems", "phase_courante", "phases_history"):
+        if key in data and not isinstance(data[key], dict):
+            raise ValueError(f"« {key} » doit être un objet")
+    for secteur, sous_secteurs in data.get("sectors", {}).items():
+        for ss, systems in sous_secteurs.items():
+            for systeme, planets in systems.items():
+                for planete, stats in planets.items():
+                    for f in FACTIONS:
+                        counters = stats.get(f)
+                        if not isinstance(counters, dict):
+                            raise ValueError(f"{planete} ({systeme}) : faction {f} manquante")
+                        for counter in ("points", "batailles", "choix"):
+                            if not isinstance(counters.get(counter), int):
+                                raise ValueError(f"{planete} ({systeme}) : {f}.{counter} doit être un entier")
+    if not isinstance(data.get("phase_courante", {}).get("phase", 1), int):
+        raise ValueError("phase_courante.phase doit être un entier")
+
+def save_data(campaign: "Campaign"):
     try:
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump({
-                "sectors": SECTORS,
-                "system_rules": SYSTEM_RULES,
-                "active_systems": ACTIVE_SYSTEMS,
-                "phase_courante": CURRENT_PHASE,
-                "total_parties": TOTAL_PARTIES,
-                "phases_history": PHASES_HISTORY,
-                "HonneurKeyWords": HonneurKeyWords
-            }, f, indent=4, ensure_ascii=False)
-            print("💾 Données sauvegardées dans data.json")
+        campaign.store.write(campaign.store.prepare(campaign, set(), full=True))
+        print(f"💾 Données sauvegardées dans {campaign.store.label}")
     except Exception as e:
         print(f"❌ Erreur lors de la sauvegarde des données : {e}")
 
+# ----------------- STOCKAGE -----------------
+# Deux backends interchangeables : le fichier data.json historique, ou une base SQLite.
+# prepare() tourne sur la boucle asyncio (copie de l'état), write() dans un thread.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+SQLITE_FILE = os.getenv("SQLITE_FILE", "data.db")
+
+def mark_planet_dirty(campaign: "Campaign", planete: str):
+    entry = campaign.index.planet(planete)
+    if entry:
+        campaign.dirty_planets.add((entry[0], entry[1], entry[2], planete))
+
+class JsonStore:
+    """
+    Backend historique : tout l'état dans un seul document JSON réécrit à chaque instantané.
+    """
+    lazy = False  # tout le document est en mémoire : pas de sous-secteurs en sommeil
+
+    def __init__(self, path: str):
+        self.path = path
+        self.label = path
+        self.watch_path = path
+        self.last_hash = None  # empreinte du dernier contenu lu ou écrit par le bot
+
+    def load(self) -> dict:
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        self.last_hash = hashlib.sha256(raw).hexdigest()
+        return json.loads(raw.decode("utf-8"))
+
+    def read_external(self):
+        """
+        Relit le fichier après une modification externe : (données validées, empreinte),
+        ou (None, empreinte) si le contenu est celui que le bot connaît déjà.
+        """
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest == self.last_hash:
+            return None, digest
+        data = json.loads(raw.decode("utf-8"))
+        validate_data(data)
+        return data, digest
+
+    def disk_hash(self) -> Optional[str]:
+        try:
+            with open(self.path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def prepare(self, campaign: "Campaign", dirty_planets: set, full: bool = False) -> dict:
+        return snapshot_data(campaign)
+
+    def write(self, payload: dict):
+        payload.pop("dormant", None)  # toujours vide : pas de sommeil avec data.json
+        self.last_hash = write_json_atomic(self.path, payload)
+
+    def close(self):
+        pass
+
+class SqliteStore:
+    """
+    Backend SQLite (mode WAL) : une ligne par planète et par faction, si bien qu'un
+    instantané ne réécrit que les planètes modifiées. Au premier lancement, la base
+    est migrée depuis data.json s'il existe.
+    """
+    lazy = True  # un sous-secteur se relit seul (voir SOUS-SECTEURS EN SOMMEIL)
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS systems (
+            secteur TEXT, sous_secteur TEXT, systeme TEXT,
+            PRIMARY KEY (secteur, sous_secteur, systeme)
+        );
+        CREATE TABLE IF NOT EXISTS planets (
+            id INTEGER PRIMARY KEY,
+            secteur TEXT, sous_secteur TEXT, systeme TEXT, planete TEXT,
+            UNIQUE (secteur, sous_secteur, systeme, planete)
+        );
+        CREATE INDEX IF NOT EXISTS idx_planets_sous_secteur ON planets (secteur, sous_secteur);
+        CREATE TABLE IF NOT EXISTS faction_stats (
+            planet_id INTEGER REFERENCES planets (id), faction TEXT,
+            points INTEGER, batailles INTEGER, choix INTEGER,
+            PRIMARY KEY (planet_id, faction)
+        );
+        CREATE TABLE IF NOT EXISTS system_rules (
+            secteur TEXT, sous_secteur TEXT, systeme TEXT, rules TEXT,
+            PRIMARY KEY (secteur, sous_secteur, systeme)
+        );
+        CREATE TABLE IF NOT EXISTS active_systems (
+            secteur TEXT, sous_secteur TEXT, systeme TEXT, actif INTEGER,
+            PRIMARY KEY (secteur, sous_secteur, systeme)
+        );
+        CREATE TABLE IF NOT EXISTS phase_history (
+            sous_secteur TEXT, phase TEXT, faction TEXT,
+            total_parties INTEGER, choix_planete INTEGER,
+            PRIMARY KEY (sous_secteur, phase, faction)
+        );
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, path: str, json_path: str):
+        self.path = path
+        self.json_path = json_path
+        self.label = path
+        self.watch_path = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def load(self) -> dict:
+        with self._lock:
+            conn = self._conn
+            if conn.execute("SELECT 1 FROM meta LIMIT 1").fetchone() is None:
+                if not os.path.exists(self.json_path):
+                    raise FileNotFoundError(self.path)
+                # Migration unique depuis data.json
+                with open(self.json_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._write_full(conn, data)
+                print(f"🗄️ {self.json_path} migré vers {self.path}")
+                return data
+
+            # Noms seulement : les statistiques ne sont lues que pour les sous-secteurs en jeu
+            names = {}
+            for secteur, ss, systeme in conn.execute(
+                "SELECT secteur, sous_secteur, systeme FROM systems ORDER BY rowid"
+            ):
+                names.setdefault(secteur, {}).setdefault(ss, {})[systeme] = []
+            for secteur, ss, systeme, planete in conn.execute(
+                "SELECT secteur, sous_secteur, systeme, planete FROM planets ORDER BY id"
+            ):
+                names[secteur][ss][systeme].append(planete)
+
+            active_systems = {}
+            for secteur, ss, systeme, actif in conn.execute(
+                "SELECT secteur, sous_secteur, systeme, actif FROM active_systems ORDER BY rowid"
+            ):
+                active_systems.setdefault(secteur, {}).setdefault(ss, {})[systeme] = bool(actif)
+
+            phases_history = {}
+            for ss, phase, faction, total_parties, choix_planete in conn.execute(
+                "SELECT sous_secteur, phase, faction, total_parties, choix_planete FROM phase_history ORDER BY rowid"
+            ):
+                phase_data = phases_history.setdefault(ss, {}).setdefault(
+                    phase, {"total_parties": {}, "choix_planete": {}}
+                )
+                phase_data["total_parties"][faction] = total_parties
+                phase_data["choix_planete"][faction] = choix_planete
+
+            data = {k: json.loads(v) for k, v in conn.execute("SELECT key, value FROM meta")}
+            with_rules = set(conn.execute("SELECT DISTINCT secteur, sous_secteur FROM system_rules"))
+            sectors, system_rules, layout = {}, {}, {}
+            for secteur, sous_secteurs in names.items():
+                for ss, systems in sous_secteurs.items():
+                    in_play = sub_sector_in_play(secteur, ss, systems, active_systems, data.get("phase_courante", {}))
+                    if in_play:
+                        planets, rules = self._read_sub_sector(conn, secteur, ss)
+                    else:
+                        planets, rules = None, None
+                        layout[(secteur, ss)] = systems
+                    sectors.setdefault(secteur, {})[ss] = planets
+                    if (secteur, ss) in with_rules:
+                        system_rules.setdefault(secteur, {})[ss] = rules
+            data.update({
+                "sectors": sectors,
+                "system_rules": system_rules,
+                "active_systems": active_systems,
+                "phases_history": phases_history,
+                "layout": layout
+            })
+            return data
+
+    def _read_sub_sector(self, conn, secteur: str, sous_secteur: str) -> Tuple[dict, dict]:
+        planets = {}
+        for (systeme,) in conn.execute(
+            "SELECT systeme FROM systems WHERE secteur = ? AND sous_secteur = ? ORDER BY rowid", (secteur, sous_secteur)
+        ):
+            planets[systeme] = {}
+        for systeme, planete, faction, points, batailles, choix in conn.execute(
+            "SELECT p.systeme, p.planete, fs.faction, fs.points, fs.batailles, fs.choix "
+            "FROM planets p JOIN faction_stats fs ON fs.planet_id = p.id "
+            "WHERE p.secteur = ? AND p.sous_secteur = ? ORDER BY p.id, fs.rowid",
+            (secteur, sous_secteur)
+        ):
+            planet = planets[systeme].get(planete)
+            if planet is None:
+                planet = planets[systeme][planete] = PlanetStats()
+            if faction in FACTION_INDEX:
+                planet.set(faction, POINTS, points)
+                planet.set(faction, BATAILLES, batailles)
+                planet.set(faction, CHOIX, choix)
+        rules = {
+            systeme: json.loads(raw) for systeme, raw in conn.execute(
+                "SELECT systeme, rules FROM system_rules WHERE secteur = ? AND sous_secteur = ? ORDER BY rowid",
+                (secteur, sous_secteur)
+            )
+        }
+        return planets, rules
+
+    def load_sub_sector(self, secteur: str, sous_secteur: str) -> Tuple[dict, Optional[dict]]:
+        with self._lock:
+            planets, rules = self._read_sub_sector(self._conn, secteur, sous_secteur)
+        return planets, rules or None
+
+    def prepare(self, campaign: "Campaign", dirty_planets: set, full: bool = False) -> dict:
+        if full:
+            return {"full": True, **snapshot_data(campaign)}
+        planets = {}
+        for secteur, ss, systeme, planete in dirty_planets:
+            stats = (campaign.sectors.get(secteur, {}).get(ss) or {}).get(systeme, {}).get(planete)
+            if stats is not None:
+                planets[(secteur, ss, systeme, planete)] = copy_json(stats)
+        return {
+            "full": False,
+            "planets": planets,
+            "active_systems": copy_json(campaign.active_systems),
+            "phases_history": copy_json(campaign.phases_history),
+            "phase_courante": copy_json(campaign.current_phase),
+            "total_parties": copy_json(campaign.total_parties),
+            "HonneurKeyWords": list(campaign.honneur_keywords),
+            "journal_seq": campaign.journal.seq
+        }
+
+    def write(self, payload: dict):
+        with self._lock, self._conn as conn:
+            if payload["full"]:
+                self._write_full(conn, payload)
+                return
+            for (secteur, ss, systeme, planete), stats in payload["planets"].items():
+                self._upsert_planet(conn, secteur, ss, systeme, planete, stats)
+            self._write_small_tables(conn, payload)
+
+    def _write_full(self, conn, data: dict):
+        dormant = {tuple(pair) for pair in data.get("dormant", [])}
+        if dormant:
+            # Sous-secteurs en sommeil : leurs lignes restent telles quelles en base
+            stale = [pair for pair in conn.execute("SELECT DISTINCT secteur, sous_secteur FROM systems") if pair not in dormant]
+            for secteur, ss in stale:
+                conn.execute(
+                    "DELETE FROM faction_stats WHERE planet_id IN "
+                    "(SELECT id FROM planets WHERE secteur = ? AND sous_secteur = ?)", (secteur, ss)
+                )
+                for table in ("planets", "systems", "system_rules"):
+                    conn.execute(f"DELETE FROM {table} WHERE secteur = ? AND sous_secteur = ?", (secteur, ss))
+            tables = ("active_systems", "phase_history", "meta")
+        else:
+            tables = ("systems", "faction_stats", "planets", "system_rules", "active_systems", "phase_history", "meta")
+        for table in tables:
+            conn.execute(f"DELETE FROM {table}")
+        for secteur, sous_secteurs in data.get("sectors", {}).items():
+            for ss, systems in sous_secteurs.items():
+                if systems is None:
+                    continue
+                for systeme, planets in systems.items():
+                    conn.execute("INSERT INTO systems VALUES (?, ?, ?)", (secteur, ss, systeme))
+                    for planete, stats in planets.items():
+                        self._upsert_planet(conn, secteur, ss, systeme, planete, stats)
+        for secteur, sous_secteurs in data.get("system_rules", {}).items():
+            for ss, systems in sous_secteurs.items():
+                if systems is None:
+                    continue
+                for systeme, rules in systems.items():
+                    conn.execute(
+                        "INSERT INTO system_rules VALUES (?, ?, ?, ?)",
+                        (secteur, ss, systeme, json.dumps(rules, ensure_ascii=False))
+                    )
+        self._write_small_tables(conn, data)
+        conn.commit()
+
+    def _upsert_planet(self, conn, secteur, ss, systeme, planete, stats: dict):
+        conn.execute(
+            "INSERT INTO planets (secteur, sous_secteur, systeme, planete) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT DO NOTHING",
+            (secteur, ss, systeme, planete)
+        )
+        planet_id = conn.execute(
+            "SELECT id FROM planets WHERE secteur = ? AND sous_secteur = ? AND systeme = ? AND planete = ?",
+            (secteur, ss, systeme, planete)
+        ).fetchone()[0]
+        conn.executemany(
+            "INSERT INTO faction_stats VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (planet_id, faction) DO UPDATE SET "
+            "points = excluded.points, batailles = excluded.batailles, choix = excluded.choix",
+            [(planet_id, f, v["points"], v["batailles"], v["choix"]) for f, v in stats.items()]
+        )
+
+    def _write_small_tables(self, conn, data: dict):
+        conn.executemany(
+            "INSERT INTO active_systems VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (secteur, sous_secteur, systeme) DO UPDATE SET actif = excluded.actif",
+            [
+                (secteur, ss, systeme, int(actif))
+                for secteur, sous_secteurs in data.get("active_systems", {}).items()
+                for ss, systems in sous_secteurs.items()
+                for systeme, actif in systems.items()
+            ]
+        )
+        rows = []
+        for ss, phases in data.get("phases_history", {}).items():
+            for phase, phase_data in phases.items():
+                factions = list(phase_data["total_parties"])
+                factions += [f for f in phase_data["choix_planete"] if f not in factions]
+                for f in factions:
+                    rows.append((
+                        ss, str(phase), f,
+                        phase_data["total_parties"].get(f, 0), phase_data["choix_planete"].get(f, 0)
+                    ))
+        conn.executemany(
+            "INSERT INTO phase_history VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (sous_secteur, phase, faction) DO UPDATE SET "
+            "total_parties = excluded.total_parties, choix_planete = excluded.choix_planete",
+            rows
+        )
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            [
+                (key, json.dumps(data.get(key), ensure_ascii=False))
+                for key in ("phase_courante", "total_parties", "HonneurKeyWords", "journal_seq")
+            ]
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ----------------- SAUVEGARDE DIFFÉRÉE -----------------
+# Chaque événement est déjà dans le journal : data.json n'est qu'un instantané périodique.
+# En SQLite, un instantané ne touche que quelques lignes : on peut l'écrire bien plus souvent.
+SAVE_DELAY = float(os.getenv("SAVE_DELAY", "1" if STORAGE_BACKEND == "sqlite" else "60"))
+SNAPSHOT_EVERY = int(os.getenv("SNAPSHOT_EVERY", "100"))
+
+class DataPersister:
+    """
+    Instantané différé de data.json : les commandes marquent l'état comme modifié,
+    et toutes les modifications survenues pendant `delay` secondes (ou jusqu'à
+    SNAPSHOT_EVERY événements journalisés) sont regroupées en une seule écriture
+    atomique, exécutée hors de la boucle asyncio. Le journal est ensuite compacté.
+    """
+    def __init__(self, campaign: "Campaign", delay: float):
+        self.campaign = campaign
+        self.delay = delay
+        self.dirty = False
+        self._task = None
+        self.lock = asyncio.Lock()  # tenu pendant chaque écriture (voir apply_external_reload)
+        self._wake = asyncio.Event()
+        self._closing = False
+
+    def mark_dirty(self, now: bool = False):
+        self.dirty = True
+        if self._task is None or self._task.done():
+            self._wake.clear()
+            self._task = asyncio.get_running_loop().create_task(self._flush_later())
+        if now or self.campaign.journal.pending >= SNAPSHOT_EVERY:
+            self._wake.set()
+
+    async def _flush_later(self):
+        # Boucle tant qu'il reste quelque chose à écrire : une mutation arrivée
+        # pendant l'écriture, ou une écriture échouée, repart pour un délai
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+            if not self.dirty or self._closing:
+                return
+
+    async def flush(self):
+        campaign = self.campaign
+        async with self.lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            dirty_planets = set(campaign.dirty_planets)
+            campaign.dirty_planets.clear()
+            payload = campaign.store.prepare(campaign, dirty_planets)
+            try:
+                await asyncio.to_thread(campaign.store.write, payload)
+                await asyncio.to_thread(campaign.journal.compact, payload["journal_seq"])
+                campaign.journal.pending = campaign.journal.seq - payload["journal_seq"]
+                print(f"💾 Données sauvegardées dans {campaign.store.label}")
+            except Exception as e:
+                self.dirty = True
+                campaign.dirty_planets.update(dirty_planets)
+                print(f"❌ Erreur lors de la sauvegarde des données : {e}")
+
+    async def close(self):
+        # Arrêt du bot : on force l'écriture en attente et on attend sa fin
+        self._closing = True
+        self._wake.set()
+        try:
+            if self._task is not None:
+                await self._task
+            await self.flush()
+        finally:
+            self._closing = False
+
+
+# ----------------- JOURNAL DES ÉVÉNEMENTS -----------------
+JOURNAL_FILE = "journal.jsonl"
+JOURNAL_ARCHIVE_FILE = "journal.archive.jsonl"
+
+class BattleJournal:
+    """
+    Journal append-only (JSON Lines) des batailles, modifications, clôtures et activations.
+    Chaque événement coûte une ligne ; au démarrage, les événements postérieurs à
+    l'instantané data.json sont rejoués. Après chaque instantané, les événements
+    déjà inclus sont déplacés dans l'archive, qui sert de trace d'audit.
+    """
+    def __init__(self, path: str, archive_path: str):
+        self.path = path
+        self.archive_path = archive_path
+        self.seq = 0        # numéro du dernier événement
+        self.pending = 0    # événements pas encore inclus dans data.json
+        self.compacted = 0  # dernier événement déplacé dans l'archive
+        self._lock = threading.Lock()
+
+    def make_event(self, kind: str, data: dict) -> dict:
+        # seq n'avance qu'une fois l'événement appliqué (voir CampaignWriter)
+        return {
+            "seq": self.seq + 1,
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "type": kind,
+            "data": data
+        }
+
+    def append(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read(self, after_seq: int = 0, archive: bool = False):
+        # archive : commence par l'archive, pour un instantané antérieur à la dernière compaction
+        last = after_seq
+        for path in ([self.archive_path] if archive else []) + [self.path]:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            continue  # ligne tronquée par un arrêt brutal
+                        if event.get("seq", 0) > last:
+                            last = event["seq"]
+                            yield event
+            except FileNotFoundError:
+                continue
+
+    def compact(self, upto_seq: int):
+        with self._lock:
+            self.compacted = max(self.compacted, upto_seq)
+            if not os.path.exists(self.path):
+                return
+            archived, kept = [], []
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        seq = json.loads(line)["seq"]
+                    except (ValueError, KeyError):
+                        continue
+                    (archived if seq <= upto_seq else kept).append(line)
+            if not archived:
+                return
+            with open(self.archive_path, "a", encoding="utf-8") as f:
+                f.writelines(archived)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(kept)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+
+# ----------------- ÉVÉNEMENTS DE CAMPAGNE -----------------
+# Toute modification de la campagne passe par un événement : appliqué en direct
+# par les commandes, et rejoué à l'identique depuis le journal au démarrage.
+def local_phase(campaign: "Campaign", sous_secteur: str) -> int:
+    local_history = campaign.phases_history.get(sous_secteur, {})
+    if local_history:
+        return max(int(k) for k in local_history.keys()) + 1
+    return 1
+
+def apply_bataille(campaign: "Campaign", event: dict) -> dict:
+    secteur, ss, systeme, planet_info = campaign.index.planet(event["planete"])
+    mark_planet_dirty(campaign, event["planete"])
+    gagnant = event["gagnant"]
+    choix_planete = event["choix_planete"]
+    participants_list = event["participants"]
+    target_phase = event["phase"]
+
+    # Si on ajoute dans la phase en cours, on incrémente total_parties
+    if target_phase == campaign.current_phase["phase"]:
+        for f in participants_list:
+            campaign.total_parties[f] += 1
+
+    # Attribution des points et choix pour la planète
+    for f in participants_list:
+        # Points (conservés entre les phases)
+        if f == gagnant:
+            planet_info.add(f, POINTS, 3)
+        elif gagnant == "Egalite":
+            planet_info.add(f, POINTS, 2)
+        else:
+            planet_info.add(f, POINTS, 1)
+
+        # Batailles & choix (par phase)
+        if target_phase == campaign.current_phase["phase"]:
+            planet_info.add(f, BATAILLES, 1)
+            if f == choix_planete:
+                planet_info.add(f, CHOIX, 1)
+        else:
+            # Phase passée : rangée avec les autres phases du sous-secteur courant
+            history = campaign.phases_history.setdefault(campaign.current_phase.get("sous_secteur"), {})
+            phase_data = history.setdefault(str(target_phase), {
+                "total_parties": {f: 0 for f in FACTIONS},
+                "choix_planete": {f: 0 for f in FACTIONS}
+            })
+            phase_data["total_parties"][f] = phase_data["total_parties"].get(f, 0) + 1
+            if f == choix_planete:
+                phase_data["choix_planete"][f] = phase_data["choix_planete"].get(f, 0) + 1
+    campaign.faction_totals.battle(secteur, ss, participants_list, choix_planete, target_phase == campaign.current_phase["phase"])
+
+    change = campaign.scoring.update_planet(secteur, ss, systeme, event["planete"])
+    campaign.faction_totals.control_changed(secteur, ss, systeme, change)
+    return change
+
+def apply_modif(campaign: "Campaign", event: dict) -> dict:
+    secteur, ss, systeme, planet_data = campaign.index.planet(event["planete"])
+    mark_planet_dirty(campaign, event["planete"])
+    faction = event["faction"]
+
+    if event["points"] is not None:
+        planet_data.set(faction, POINTS, event["points"])
+
+    if event["batailles"] is not None:
+        delta = event["batailles"] - planet_data.value(faction, BATAILLES)
+        planet_data.set(faction, BATAILLES, event["batailles"])
+        campaign.total_parties[faction] += delta
+        campaign.faction_totals.battles_changed(secteur, ss, faction, delta)
+
+    change = campaign.scoring.update_planet(secteur, ss, systeme, event["planete"])
+    campaign.faction_totals.control_changed(secteur, ss, systeme, change)
+    return change
+
+def apply_cloture(campaign: "Campaign", event: dict) -> dict:
+    nouveau_sous_secteur = event["nouveau_sous_secteur"]
+    secteur = campaign.current_phase.get("secteur")
+    ancien_ss = campaign.current_phase.get("sous_secteur")
+    phase_local = local_phase(campaign, ancien_ss)
+
+    # --- Sauvegarde ordonnée des statistiques ---
+    ordre_factions = ["Défenseur", "Envahisseur", "Pirate"]
+
+    phase_data = {
+        "total_parties": {f: campaign.total_parties.get(f, 0) for f in ordre_factions},
+        "choix_planete": {f: 0 for f in ordre_factions}
+    }
+
+    for systeme, planets in campaign.sectors[secteur][ancien_ss].items():
+        for planet, data in planets.items():
+            for f in ordre_factions:
+                phase_data["choix_planete"][f] += data.value(f, CHOIX)
+
+    # Créer le sous-secteur s'il n'existe pas encore
+    if ancien_ss not in campaign.phases_history:
+        campaign.phases_history[ancien_ss] = {}
+
+    campaign.phases_history[ancien_ss][str(phase_local)] = phase_data
+    campaign.faction_totals.add_history(phase_data["total_parties"])
+
+    # --- Réinitialiser compteurs ---
+    campaign.total_parties.clear()
+    campaign.total_parties.update({f: 0 for f in ordre_factions})
+    for systeme, planets in campaign.sectors[secteur][ancien_ss].items():
+        for planet, data in planets.items():
+            campaign.dirty_planets.add((secteur, ancien_ss, systeme, planet))
+            data.reset_phase()
+
+    # --- Si changement de sous-secteur ---
+    if phase_local % 3 == 0 and nouveau_sous_secteur:
+        # Désactivation ancien sous-secteur
+        if secteur in campaign.active_systems and ancien_ss in campaign.active_systems[secteur]:
+            for systeme in campaign.active_systems[secteur][ancien_ss]:
+                campaign.active_systems[secteur][ancien_ss][systeme] = False
+
+        # Activation nouveau sous-secteur
+        if secteur not in campaign.active_systems:
+            campaign.active_systems[secteur] = {}
+        if nouveau_sous_secteur not in campaign.active_systems[secteur]:
+            campaign.active_systems[secteur][nouveau_sous_secteur] = {}
+        ensure_sub_sector(campaign, secteur, nouveau_sous_secteur)
+        for systeme in campaign.sectors[secteur][nouveau_sous_secteur]:
+            campaign.active_systems[secteur][nouveau_sous_secteur][systeme] = True
+        rebuild_search_activation(campaign)
+
+        campaign.current_phase["sous_secteur"] = nouveau_sous_secteur
+
+        # Calculer la nouvelle phase pour le nouveau sous-secteur
+        campaign.current_phase["phase"] = local_phase(campaign, nouveau_sous_secteur)
+    else:
+        # --- Sinon, même sous-secteur ---
+        campaign.current_phase["phase"] = phase_local + 1
+
+    campaign.faction_totals.rebuild_phase()
+    return {"phase_cloturee": phase_local, "ancien_sous_secteur": ancien_ss, "nouvelle_phase": campaign.current_phase["phase"]}
+
+def apply_activation(campaign: "Campaign", event: dict) -> Optional[str]:
+    secteur_nom = list(campaign.active_systems.keys())[0]
+    for ss, systemes in campaign.active_systems[secteur_nom].items():
+        if event["systeme"] in systemes:
+            if event["actif"]:
+                ensure_sub_sector(campaign, secteur_nom, ss)
+            systemes[event["systeme"]] = event["actif"]
+            rebuild_search_activation(campaign)
+            return ss
+    return None
+
+def apply_honneur_tags(campaign: "Campaign", event: dict):
+    campaign.honneur_keywords = list(event["tags"])
+    rebuild_search_honneur(campaign)
+
+EVENT_HANDLERS = {
+    "bataille": apply_bataille,
+    "modif": apply_modif,
+    "cloture": apply_cloture,
+    "activation": apply_activation,
+    "honneur_tags": apply_honneur_tags
+}
+
+# ----------------- VALIDATION DES ÉVÉNEMENTS -----------------
+# Exécutée par le CampaignWriter juste avant l'application, sur l'état à jour.
+class MutationError(Exception):
+    def __init__(self, message: str, ephemeral: bool = True):
+        super().__init__(message)
+        self.ephemeral = ephemeral
+
+def check_bataille(campaign: "Campaign", event: dict):
+    if not campaign.index.planet(event["planete"]):
+        raise MutationError(f"❌ Planète inconnue : {event['planete']}")
+    participants_list = event["participants"]
+    for f in participants_list:
+        if f not in FACTIONS:
+            raise MutationError(f"❌ Faction inconnue : {f}")
+    if event["gagnant"] != "Egalite" and event["gagnant"] not in participants_list:
+        raise MutationError("❌ Le gagnant doit être parmi les participants ou 'Egalite'")
+    if event["choix_planete"] not in participants_list:
+        raise MutationError("❌ La faction qui choisit la planète doit être parmi les participants")
+    # Sans phase explicite : la phase en cours au moment où la bataille est appliquée
+    if event["phase"] is None:
+        event["phase"] = campaign.current_phase["phase"]
+    # Une phase future créerait une entrée d'historique et fausserait local_phase (/cloture)
+    if not 1 <= event["phase"] <= campaign.current_phase["phase"]:
+        raise MutationError(f"❌ Phase {event['phase']} invalide : choisir une phase de 1 à {campaign.current_phase['phase']}")
+
+def check_modif(campaign: "Campaign", event: dict):
+    if not campaign.index.planet(event["planete"]):
+        raise MutationError(f"❌ Planète inconnue : {event['planete']}")
+    if event["faction"] not in FACTIONS:
+        raise MutationError(f"❌ Faction inconnue : {event['faction']}")
+
+def check_cloture(campaign: "Campaign", event: dict):
+    nouveau_sous_secteur = event["nouveau_sous_secteur"]
+    secteur = campaign.current_phase.get("secteur")
+    ancien_ss = campaign.current_phase.get("sous_secteur")
+
+    if not secteur or not ancien_ss:
+        raise MutationError("❌ Impossible de déterminer le secteur ou le sous-secteur courant.")
+
+    # --- Vérifier changement de sous-secteur ---
+    if local_phase(campaign, ancien_ss) % 3 == 0:
+        if not nouveau_sous_secteur:
+            raise MutationError("⚠️ Fin de phase 3 (guerre totale) : vous devez indiquer un nouveau sous-secteur.")
+        if nouveau_sous_secteur not in campaign.sectors.get(secteur, {}):
+            raise MutationError(f"❌ Sous-secteur inconnu dans le secteur {secteur}.")
+    elif nouveau_sous_secteur:
+        raise MutationError(
+            "⚠️ Vous ne pouvez pas changer de sous-secteur maintenant : la phase locale n'est pas multiple de 3."
+        )
+
+def check_activation(campaign: "Campaign", event: dict):
+    systeme = event["systeme"]
+    secteur_nom = list(campaign.active_systems.keys())[0]
+    for ss, systemes in campaign.active_systems[secteur_nom].items():
+        if systeme in systemes:
+            if systemes[systeme] == event["actif"]:
+                if event["actif"]:
+                    raise MutationError(f"🟢 Le système **{systeme}** est déjà activé.", ephemeral=False)
+                raise MutationError(f"🔴 Le système **{systeme}** est déjà désactivé.", ephemeral=False)
+            return
+    raise MutationError(
+        f"❌ Le système **{systeme}** n'a pas été trouvé dans le secteur {secteur_nom}.", ephemeral=False
+    )
+
+EVENT_CHECKS = {
+    "bataille": check_bataille,
+    "modif": check_modif,
+    "cloture": check_cloture,
+    "activation": check_activation
+}
+
+# ----------------- PIPELINE D'ÉCRITURE -----------------
+class CampaignWriter:
+    """
+    Point de passage unique des mutations de la campagne. Les événements sont
+    validés, appliqués puis journalisés (hors de la boucle) un par un, dans l'ordre
+    d'arrivée ; chacun incrémente `version`. Un événement refusé ou en échec n'est
+    jamais écrit dans le journal, et son numéro n'est pas consommé.
+
+    Les commandes de lecture qui ne font aucun `await` pendant leur calcul voient
+    toujours un état cohérent.
+    """
+    def __init__(self, campaign: "Campaign"):
+        self.campaign = campaign
+        self.version = 0
+        self._lock = asyncio.Lock()
+
+    async def submit(self, kind: str, data: dict):
+        campaign = self.campaign
+        async with self._lock:
+            check = EVENT_CHECKS.get(kind)
+            if check:
+                check(campaign, data)
+            event = campaign.journal.make_event(kind, data)
+            try:
+                result = EVENT_HANDLERS[kind](campaign, data)
+            except Exception:
+                # Application peut-être partielle : le prochain instantané
+                # reprend l'état en mémoire, le journal n'en garde aucune trace
+                self.version += 1
+                campaign.persister.mark_dirty()
+                raise
+            campaign.journal.seq = event["seq"]
+            self.version += 1
+            try:
+                await asyncio.to_thread(campaign.journal.append, event)
+                campaign.journal.pending += 1
+                campaign.persister.mark_dirty()
+            except OSError as e:
+                # L'événement est déjà appliqué : un instantané immédiat le rend durable
+                print(f"❌ Erreur lors de la journalisation de l'événement {event['seq']} : {e}")
+                campaign.persister.mark_dirty(now=True)
+            return result
+
+    async def install(self, data: dict) -> int:
+        # Rechargement externe : remplace l'état entre deux mutations
+        async with self._lock:
+            replayed = install_data(self.campaign, data)
+            self.version += 1
+            return replayed
+
+def replay_journal(campaign: "Campaign", after_seq: int) -> int:
+    campaign.journal.seq = after_seq
+    campaign.journal.pending = 0
+    for event in campaign.journal.read(after_seq, archive=after_seq < campaign.journal.compacted):
+        try:
+            EVENT_HANDLERS[event["type"]](campaign, event["data"])
+        except Exception as e:
+            print(f"⚠️ Événement {event.get('seq')} ignoré lors du rejeu : {e}")
+        campaign.journal.seq = max(campaign.journal.seq, event["seq"])
+        campaign.journal.pending += 1
+    return campaign.journal.pending
+
 # ----------------- CONFIG -----------------
 # Lecture des IDs depuis .env
-GUILD_ID = int(os.getenv("GUILD_ID"))
+# GUILD_IDS : serveurs servis, séparés par des virgules (GUILD_ID seul reste accepté)
+GUILD_IDS = [int(gid.strip()) for gid in os.getenv("GUILD_IDS", os.getenv("GUILD_ID", "")).split(",") if gid.strip()]
+
+def default_guild_id() -> int:
+    # Campagne des interactions sans serveur (messages privés) : celle du premier serveur
+    if not GUILD_IDS:
+        raise RuntimeError("Aucun serveur configuré : définir GUILD_ID (ou GUILD_IDS) dans .env")
+    return GUILD_IDS[0]
+# Forums d'honneur de tous les serveurs : chaque serveur ne tire que dans les siens
 FORUM_IDS = [int(fid.strip()) for fid in os.getenv("FORUM_IDS", "").split(",") if fid.strip()]
 
-guild = discord.Object(id=GUILD_ID)
+GUILDS = [discord.Object(id=gid) for gid in GUILD_IDS]
 intents = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=intents)
-load_data()
+
+# ----------------- LIMITES DE DÉBIT -----------------
+class TokenBucket:
+    """
+    Seau à jetons : `rate` requêtes par seconde en régime établi, rafales de
+    `capacity`. `observe` recale le seau sur les en-têtes X-RateLimit-* renvoyés
+    par Discord (plus de jeton disponible que ce que Discord annonce, jamais).
+    """
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+
+    def observe(self, remaining: int, reset_after: float):
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, remaining)
+        if remaining == 0:
+            self.blocked_until = max(self.blocked_until, now + reset_after)
+
+RATE_LIMIT_WATCHERS = {}  # fragment de chemin d'API -> TokenBucket
+
+async def on_http_request_end(session, context, params):
+    # Relais des en-têtes de limite de débit vers les seaux concernés
+    headers = params.response.headers
+    if "X-RateLimit-Remaining" not in headers:
+        return
+    for fragment, bucket in list(RATE_LIMIT_WATCHERS.items()):
+        if fragment in params.url.path:
+            bucket.observe(
+                int(headers["X-RateLimit-Remaining"]),
+                float(headers.get("X-RateLimit-Reset-After", 0))
+            )
+
+HTTP_TRACE = aiohttp.TraceConfig()
+HTTP_TRACE.on_request_end.append(on_http_request_end)
+
+# ----------------- DÉMARRAGE -----------------
+# Chaque campagne est chargée une seule fois, dans setup_hook, et ses caches sont
+# préchauffés avant la première interaction. Les slash commands ne sont
+# resynchronisées que si leur définition a changé depuis la dernière
+# synchronisation réussie (empreintes dans COMMAND_SYNC_FILE) : les reconnexions
+# et redémarrages ne consomment plus d'appel d'API limité.
+COMMAND_SYNC_FILE = os.getenv("COMMAND_SYNC_FILE", "commands_sync.json")
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "0") == "1"
+
+class StartupTimer:
+    """
+    Durée de chaque étape du démarrage, affichée une seule fois au premier on_ready.
+    """
+    def __init__(self, begin: float):
+        self.begin = begin
+        self.last = begin
+        self.steps = []
+        self.reported = False
+
+    def step(self, name: str):
+        now = time.perf_counter()
+        self.steps.append((name, now - self.last))
+        self.last = now
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        total = time.perf_counter() - self.begin
+        details = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.steps)
+        print(f"⏱️ Démarrage en {total * 1000:.0f} ms : {details}")
+
+STARTUP = StartupTimer(STARTUP_BEGIN)
+
+def warm_caches(campaign: "Campaign"):
+    # Première page de /stats et fiches des systèmes du sous-secteur courant, rendues d'avance
+    stats_pager(campaign).page(0)
+    phase = campaign.current_phase
+    systems = campaign.sectors.get(phase.get("secteur"), {}).get(phase.get("sous_secteur")) or {}
+    for systeme in systems:
+        cached_embed(campaign, "systeme", systeme, lambda: render_systeme(campaign, systeme))
+
+def command_tree_hash(guild: discord.abc.Snowflake) -> str:
+    # Empreinte de ce que tree.sync enverrait à Discord pour ce serveur
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    raw = json.dumps([bot.application_id, payload], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def load_sync_hashes() -> dict:
+    try:
+        with open(COMMAND_SYNC_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+async def sync_commands():
+    # Serveur par serveur : un échec n'empêche pas les autres, et n'est pas mémorisé
+    hashes = load_sync_hashes()
+    for guild_obj in GUILDS:
+        digest = command_tree_hash(guild_obj)
+        if not FORCE_COMMAND_SYNC and hashes.get(str(guild_obj.id)) == digest:
+            print(f"⏭️ Slash commands inchangées sur le serveur {guild_obj.id}, synchronisation évitée")
+            continue
+        try:
+            await bot.tree.sync(guild=guild_obj)
+            hashes[str(guild_obj.id)] = digest
+            write_json_atomic(COMMAND_SYNC_FILE, hashes)
+            print(f"🌍 Slash commands synchronisées sur le serveur {guild_obj.id}")
+        except Exception as e:
+            print(f"❌ Erreur lors de la synchronisation des commandes sur {guild_obj.id} : {e}")
+
+class CampaignBot(commands.Bot):
+    async def setup_hook(self):
+        STARTUP.step("connexion HTTP")
+
+        # Chargement unique des campagnes configurées, puis préchauffage des caches
+        for guild_id in GUILD_IDS:
+            await CAMPAIGNS.load(guild_id)
+        STARTUP.step("campagnes")
+        for campaign in list(CAMPAIGNS.campaigns.values()):
+            warm_caches(campaign)
+        STARTUP.step("caches")
+
+        CAMPAIGNS.start()  # surveillance des fichiers et déchargement des campagnes inactives
+
+        # Démarrage à chaud : les honneurs connus sont servis avant le rafraîchissement
+        HONNEUR_INDEX.load_cache()
+        await METRICS.start()
+        STARTUP.step("honneurs et métriques")
+
+        # SIGTERM (redéploiement) : fermeture propre pour vider la sauvegarde en attente
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, lambda: asyncio.create_task(self.close())
+            )
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    async def close(self):
+        await CAMPAIGNS.close()
+        if HONNEUR_INDEX.dirty and HONNEUR_INDEX.saved_at:
+            HONNEUR_INDEX.save_cache()
+        await super().close()
+
+bot = CampaignBot(command_prefix="!", intents=intents, http_trace=HTTP_TRACE)
 tree = bot.tree
 
 # ----------------- SURVEILLANCE DATA -----------------
+RELOAD_DEBOUNCE = float(os.getenv("RELOAD_DEBOUNCE", "1"))
+RELOAD_CHANNEL_ID = int(os.getenv("RELOAD_CHANNEL_ID", "0") or 0)
+
 class DataFileHandler(FileSystemEventHandler):
-    def __init__(self, file_path, callback):
-        self.file_path = file_path
-        self.callback = callback
-    def on_modified(self, event):
-        if event.src_path.endswith(self.file_path):
-            print(f"🔄 {self.file_path} modifié, rechargement des données...")
-            self.callback()
-
-def start_data_watch(file_path: str, callback):
-    event_handler = DataFileHandler(file_path, callback)
+    """
+    Surveille le data.json d'une campagne. Les rafales d'écriture d'un éditeur sont
+    regroupées, les écritures du bot sont reconnues à leur empreinte et ignorées, et
+    le fichier est lu et validé dans ce thread avant d'être installé d'un bloc sur
+    la boucle asyncio.
+    """
+    def __init__(self, campaign: "Campaign", loop):
+        self.campaign = campaign
+        self.file_path = os.path.abspath(campaign.store.watch_path)
+        self.loop = loop
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in ("modified", "created", "moved"):
+            return
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        if not any(p and os.path.abspath(p) == self.file_path for p in paths):
+            return
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(RELOAD_DEBOUNCE, self._reload)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _reload(self):
+        store = self.campaign.store
+        try:
+            data, digest = store.read_external()
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"❌ {store.label} modifié mais invalide, rechargement ignoré : {e}")
+            return
+        if data is None:
+            return
+        print(f"🔄 {store.label} modifié, rechargement des données...")
+        asyncio.run_coroutine_threadsafe(apply_external_reload(self.campaign, data, digest), self.loop)
+
+def describe_reload(old: dict, new: dict) -> List[str]:
+    changes = []
+    for secteur, sous_secteurs in new["sectors"].items():
+        for ss, systems in sous_secteurs.items():
+            old_systems = old["sectors"].get(secteur, {}).get(ss, {})
+            if systems is None or old_systems is None:
+                continue  # sous-secteur en sommeil d'un côté : pas de détail
+            for systeme, planets in systems.items():
+                old_planets = old_systems.get(systeme)
+                if old_planets is None:
+                    changes.append(f"➕ Système {systeme} ({len(planets)} planètes)")
+                    continue
+                for planete, stats in planets.items():
+                    old_stats = old_planets.get(planete)
+                    if old_stats is None:
+                        changes.append(f"➕ Planète {planete} ({systeme})")
+                    elif old_stats != stats:
+                        details = ", ".join(
+                            f"{f} {old_stats.value(f, POINTS)}→{stats.value(f, POINTS)} pts"
+                            for f in JSON_FACTIONS if old_stats.faction(f) != stats.faction(f)
+                        )
+                        changes.append(f"✏️ {planete} ({systeme}) : {details}")
+                for planete in old_planets.keys() - planets.keys():
+                    changes.append(f"➖ Planète {planete} ({systeme})")
+    for secteur, sous_secteurs in new["active_systems"].items():
+        for ss, systems in sous_secteurs.items():
+            for systeme, actif in systems.items():
+                if old["active_systems"].get(secteur, {}).get(ss, {}).get(systeme) != actif:
+                    changes.append(f"{'🟢' if actif else '🔴'} {systeme} {'activé' if actif else 'désactivé'}")
+    if old["phase"] != new["phase"]:
+        changes.append(f"🕹️ Phase : {old['phase']} → {new['phase']}")
+    if old["system_rules"] != new["system_rules"]:
+        changes.append("📜 Règles des systèmes modifiées")
+    if old["HonneurKeyWords"] != new["HonneurKeyWords"]:
+        changes.append(f"🏅 Mots-clés d'honneur : {len(new['HonneurKeyWords'])}")
+    return changes
+
+def current_state_refs(campaign: "Campaign") -> dict:
+    return {
+        "sectors": campaign.sectors,
+        "active_systems": campaign.active_systems,
+        "phase": dict(campaign.current_phase),
+        "system_rules": campaign.system_rules,
+        "HonneurKeyWords": campaign.honneur_keywords
+    }
+
+async def apply_external_reload(campaign: "Campaign", data: dict, digest: str):
+    # Exécuté sur la boucle asyncio : l'état est remplacé en une seule étape.
+    # Un instantané en cours a été préparé avant la modification : on attend sa
+    # fin, et s'il a recouvert le fichier de l'opérateur, on réécrit l'état installé
+    async with campaign.persister.lock:
+        old = current_state_refs(campaign)
+        await campaign.writer.install(data)
+        on_disk = await asyncio.to_thread(campaign.store.disk_hash)
+        campaign.store.last_hash = digest
+        if on_disk != digest:
+            print(f"⚠️ {campaign.store.label} réécrit par une sauvegarde pendant le rechargement : les données rechargées sont réenregistrées")
+            campaign.persister.mark_dirty(now=True)
+    changes = describe_reload(old, current_state_refs(campaign))
+
+    summary = f"🔄 {campaign.store.label} rechargé après modification externe"
+    if changes:
+        shown = changes[:15]
+        if len(changes) > len(shown):
+            shown.append(f"… et {len(changes) - len(shown)} autre(s) changement(s)")
+        summary += " :\n" + "\n".join(shown)
+    else:
+        summary += " (aucun changement visible)."
+    print(summary)
+
+    channel = bot.get_channel(RELOAD_CHANNEL_ID) if RELOAD_CHANNEL_ID else None
+    if channel:
+        try:
+            await channel.send(summary[:2000])
+        except Exception as e:
+            print(f"⚠️ Impossible de publier le résumé du rechargement : {e}")
+
+def start_data_watch(campaign: "Campaign", loop):
+    event_handler = DataFileHandler(campaign, loop)
     observer = Observer()
-    observer.schedule(event_handler, ".", recursive=False)
+    observer.schedule(event_handler, os.path.dirname(event_handler.file_path), recursive=False)
+    observer.daemon = True
     observer.start()
-    def keep_alive():
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            observer.stop()
-        observer.join()
-    threading.Thread(target=keep_alive, daemon=True).start()
+    return observer
+
+# ----------------- RENDU DES SYSTÈMES -----------------
+CASE_EMPTY = "▫️"
+CASE_PV = "🏅"
+CASE_BONUS = "🚩"
+SPACE = " "
+MAX_FIELD_LEN = 1000
+
+def render_avancement(total_pv: dict, rules: dict) -> str:
+    pv_thresholds = rules.get("pv_thresholds", [5])
+    bonus_threshold = rules.get("bonus_threshold", 3)
+    max_points = max(pv_thresholds + [bonus_threshold])
+
+    # Construction ligne des seuils
+    alignment_prefix = " " * len(f"{ICONS['Défenseur']} : ")
+    line_thresholds = alignment_prefix + CASE_EMPTY + SPACE
+    for pos in range(1, max_points + 1):
+        if pos in pv_thresholds:
+            line_thresholds += CASE_PV + SPACE
+        elif pos == bonus_threshold:
+            line_thresholds += CASE_BONUS + SPACE
+        else:
+            line_thresholds += CASE_EMPTY + SPACE
+
+    # Construction ligne des factions
+    faction_lines = []
+    for f in ICONS:
+        pos_line = [CASE_EMPTY] * (max_points + 1)
+        pos_index = min(max(total_pv[f], 0), max_points)
+        pos_line[pos_index] = ICONS[f]
+        faction_lines.append(SPACE.join(pos_line))
+
+    return "**Avancement :**\n" + line_thresholds.strip() + "\n" + "\n".join(faction_lines)
+
+def render_planet_lines(campaign: "Campaign", secteur: str, sous_secteur: str, systeme: str, planets: dict, planet_values: dict) -> List[str]:
+    lines = []
+    for planet, data in planets.items():
+        value_icon = PLANET_VALUE_ICONS.get(planet_values.get(planet, 0), "")
+        lines.append(f"▪️ 🌏 **{planet}** {value_icon}")
+        leaders = campaign.scoring.leaders(secteur, sous_secteur, systeme, planet)
+        for f in ICONS:
+            points, batailles, _ = data.faction(f)
+            suffix = " 🏆" if f in leaders and len(leaders) == 1 else " ⚖️" if f in leaders else ""
+            lines.append(f"▪️  {ICONS[f]}{suffix} {f} : **{points} pts** | `{batailles} batailles`")
+        lines.append("")
+    return lines
+
+def render_score_change(planete: str, systeme: str, change: dict) -> str:
+    # Lignes ajoutées à /ajout et /modif quand le contrôle ou un palier change
+    lines = []
+    if change["nouveau"] != change["ancien"]:
+        if change["nouveau"]:
+            lines.append(f"🏆 **{planete}** passe sous le contrôle des **{change['nouveau']}**"
+                         + (f" (auparavant : {change['ancien']})" if change["ancien"] else ""))
+        else:
+            lines.append(f"⚖️ **{planete}** n'est plus contrôlée par les **{change['ancien']}**")
+    for step in change["paliers"]:
+        icon = CASE_PV if step["type"] == "pv" else CASE_BONUS
+        label = "le palier" if step["type"] == "pv" else "le seuil bonus"
+        if step["atteint"]:
+            lines.append(f"{icon} **{step['faction']}** atteint {label} de {step['seuil']} PV dans **{systeme}**")
+        else:
+            lines.append(f"⬇️ **{step['faction']}** repasse sous {label} de {step['seuil']} PV dans **{systeme}**")
+    return "".join(f"\n{ln}" for ln in lines)
+
+def chunk_lines(lines: List[str]) -> List[str]:
+    # Découpage en champs de moins de MAX_FIELD_LEN caractères
+    chunks = []
+    current = ""
+    for ln in lines:
+        if len(current) + len(ln) + 1 > MAX_FIELD_LEN:
+            chunks.append(current.rstrip("\n"))
+            current = ""
+        current += ln + "\n"
+    if current:
+        chunks.append(current.rstrip("\n"))
+    return chunks
+
+# ----------------- MISE EN PAGE DES EMBEDS -----------------
+# Limites Discord : 25 champs par embed, 256 caractères par nom de champ et 1024 par
+# valeur, 10 embeds par message et 6000 caractères au total par message (tous embeds
+# confondus, titres et pieds de page compris).
+EMBED_MAX_FIELDS = 25
+EMBED_MAX_FIELD_NAME = 256
+EMBED_MAX_FIELD_VALUE = 1024
+MESSAGE_MAX_EMBEDS = 10
+MESSAGE_MAX_CHARS = 6000
+PAGE_FOOTER_RESERVE = 64  # place gardée pour « Page 2 · systèmes 11 à 20 sur 48 »
+PAGER_TIMEOUT = 600       # secondes pendant lesquelles les boutons restent actifs
+
+def clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+class EmbedPager:
+    """
+    Met en page des blocs de champs (un bloc par système pour /stats) en pages
+    de message de MESSAGE_MAX_EMBEDS embeds au plus, dans toutes les limites
+    Discord. Un bloc ne change d'embed ou de page que s'il ne tient pas dans la
+    place restante, et n'est coupé que s'il ne tient sur aucune page.
+
+    Les pages sont calculées à la demande et dans l'ordre : seules les pages
+    affichées sont rendues. render_block(clé) -> [(nom, valeur), ...].
+    """
+    def __init__(self, title: str, color: discord.Color, keys: list, render_block, empty: str):
+        self.title = title
+        self.color = color
+        self.keys = keys
+        self.render_block = render_block
+        self.empty = empty
+        self.starts = [(0, 0)]  # page -> (bloc, champ) de départ ; le dernier est la suite à rendre
+        self.pages = []         # pages rendues, embeds sous forme de dict
+
+    def page(self, index: int) -> List[discord.Embed]:
+        # Page demandée, ou la dernière s'il y en a moins
+        while len(self.pages) <= index and self.has_next(len(self.pages) - 1):
+            self._layout_next()
+        index = min(max(index, 0), len(self.pages) - 1)
+        return [discord.Embed.from_dict(payload) for payload in self.pages[index]]
+
+    def has_next(self, index: int) -> bool:
+        if index < 0:
+            return not self.pages
+        return index + 1 < len(self.starts) and self.starts[index + 1][0] < len(self.keys)
+
+    def _layout_next(self):
+        block, field = self.starts[-1]
+        first_block = block
+        embeds = [discord.Embed(title=self.title, color=self.color)]
+        used = len(self.title) + PAGE_FOOTER_RESERVE
+        placed = 0
+        while block < len(self.keys):
+            pending = [
+                (clip(name, EMBED_MAX_FIELD_NAME), clip(value, EMBED_MAX_FIELD_VALUE))
+                for name, value in self.render_block(self.keys[block])[field:]
+            ]
+            size = sum(len(name) + len(value) for name, value in pending)
+            fits_embed = len(embeds[-1].fields) + len(pending) <= EMBED_MAX_FIELDS
+            if placed and not fits_embed and len(pending) <= EMBED_MAX_FIELDS:
+                # Le bloc tient dans un embed neuf : on le garde d'un seul tenant
+                if len(embeds) >= MESSAGE_MAX_EMBEDS or used + size > MESSAGE_MAX_CHARS:
+                    break
+                embeds.append(discord.Embed(color=self.color))
+            elif placed and used + size > MESSAGE_MAX_CHARS:
+                break
+            for name, value in pending:
+                cost = len(name) + len(value)
+                if len(embeds[-1].fields) >= EMBED_MAX_FIELDS:
+                    if len(embeds) >= MESSAGE_MAX_EMBEDS:
+                        break
+                    embeds.append(discord.Embed(color=self.color))
+                if used + cost > MESSAGE_MAX_CHARS:
+                    break
+                embeds[-1].add_field(name=name, value=value, inline=False)
+                used += cost
+                placed += 1
+                field += 1
+            else:
+                block, field = block + 1, 0
+                continue
+            break  # page pleine au milieu d'un bloc trop grand : la suite passe à la page suivante
+
+        self.starts.append((block, field))
+        if not self.keys:
+            embeds[0].description = self.empty
+        elif len(self.pages) > 0 or block < len(self.keys):
+            last = block + (1 if field else 0)
+            embeds[-1].set_footer(
+                text=f"Page {len(self.pages) + 1} · systèmes {first_block + 1} à {last} sur {len(self.keys)}"
+            )
+        self.pages.append([embed.to_dict() for embed in embeds])
+
+class PagerView(discord.ui.View):
+    """
+    Boutons ◀️ ▶️ d'un message paginé. `build` renvoie l'EmbedPager de l'état
+    courant (mis en cache par version) : une page n'est rendue qu'au clic.
+    """
+    def __init__(self, build):
+        super().__init__(timeout=PAGER_TIMEOUT)
+        self.build = build
+        self.index = 0
+        self._update_buttons(build())
+
+    def _update_buttons(self, pager: EmbedPager):
+        self.previous.disabled = self.index == 0
+        self.next.disabled = not pager.has_next(self.index)
+
+    async def show(self, interaction: discord.Interaction, index: int):
+        pager = self.build()
+        embeds = pager.page(index)
+        self.index = min(max(index, 0), len(pager.pages) - 1)
+        self._update_buttons(pager)
+        await interaction.response.edit_message(embeds=embeds, view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.index - 1)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.index + 1)
+
+# ----------------- CACHE DE RENDU -----------------
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "256"))
+
+class RenderCache:
+    """
+    Cache LRU des embeds de /systeme et /planete et de la mise en page de /stats, indexé par
+    (commande, argument, version de l'état). Toute mutation incrémente la version
+    du CampaignWriter : les entrées précédentes sont alors vidées d'un coup.
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.version = None
+        self._entries = OrderedDict()
+
+    def get(self, key: tuple):
+        if key[-1] != self.version:
+            self._entries.clear()
+            self.version = key[-1]
+            return None
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+        return payload
+
+    def put(self, key: tuple, payload):
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+def cached_embed(campaign: "Campaign", command: str, argument: str, render) -> Optional[discord.Embed]:
+    key = (command, argument, campaign.writer.version)
+    payload = campaign.render_cache.get(key)
+    if payload is None:
+        embed = render()
+        if embed is None:
+            return None
+        payload = embed.to_dict()
+        campaign.render_cache.put(key, payload)
+    return discord.Embed.from_dict(payload)
+
+# ----------------- CAMPAGNES PAR SERVEUR -----------------
+CAMPAIGN_DIR = os.getenv("CAMPAIGN_DIR", "campagnes")
+CAMPAIGN_IDLE_TIMEOUT = float(os.getenv("CAMPAIGN_IDLE_TIMEOUT", "3600"))  # secondes sans commande avant déchargement
+CAMPAIGN_SWEEP_INTERVAL = 60
+
+def campaign_directory(guild_id: int) -> str:
+    # Le premier serveur garde les fichiers historiques (data.json, journal.jsonl…)
+    # à la racine ; les autres ont chacun leur dossier dans CAMPAIGN_DIR
+    if GUILD_IDS and guild_id == GUILD_IDS[0]:
+        return ""
+    return os.path.join(CAMPAIGN_DIR, str(guild_id))
+
+class Campaign:
+    """
+    État complet de la campagne d'un serveur : données, index, moteur de score,
+    stockage, journal, pipeline d'écriture et cache de rendu. Elle est passée
+    explicitement au code qui lit ou modifie l'état : les commandes la trouvent
+    dans `interaction.extras["campaign"]` (voir `instrumented`).
+    """
+    def __init__(self, guild_id: int, directory: str):
+        self.guild_id = guild_id
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Données (remplacées par install_data)
+        self.sectors = {}
+        self.system_rules = {}
+        self.active_systems = {}
+        self.current_phase = {}
+        self.total_parties = {f: 0 for f in FACTIONS}
+        self.phases_history = {}
+        self.honneur_keywords = []
+        self.dirty_planets = set()  # (secteur, sous_secteur, système, planète) modifiées depuis le dernier instantané
+        self.layout = {}  # (secteur, sous_secteur) en sommeil -> {système: [planètes]}
+
+        # Index et caches dérivés
+        self.index = CampaignIndex(self.load_sub_sector)
+        self.scoring = ScoringEngine(self)
+        self.faction_totals = FactionTotals(self)
+        self.search_planetes = SearchIndex()
+        self.search_systemes = SearchIndex()
+        self.search_honneur = SearchIndex()
+        self.search_activer = SearchIndex()
+        self.search_desactiver = SearchIndex()
+        self.render_cache = RenderCache(RENDER_CACHE_SIZE)
+
+        # Persistance
+        data_file = self.path(DATA_FILE)
+        if STORAGE_BACKEND == "sqlite":
+            self.store = SqliteStore(self.path(SQLITE_FILE), data_file)
+        else:
+            self.store = JsonStore(data_file)
+        self.journal = BattleJournal(self.path(JOURNAL_FILE), self.path(JOURNAL_ARCHIVE_FILE))
+        self.persister = DataPersister(self, SAVE_DELAY)
+        self.writer = CampaignWriter(self)
+
+        self.active = 0  # interactions en cours
+        self.last_used = time.monotonic()
+        self.observer = None
+
+    def path(self, file_name: str) -> str:
+        return os.path.join(self.directory, os.path.basename(file_name)) if self.directory else file_name
+
+    def watch(self, loop):
+        if self.observer is None and self.store.watch_path:
+            self.observer = start_data_watch(self, loop)
+
+    async def flush(self):
+        await self.persister.close()
+
+    def load_sub_sector(self, secteur: str, sous_secteur: str):
+        # Lecture synchrone : appelée depuis index.planet / index.system
+        systems, rules = self.store.load_sub_sector(secteur, sous_secteur)
+        compact_planets(systems)
+        self.sectors[secteur][sous_secteur] = systems
+        nested = self.system_rules.get(secteur)
+        if rules is not None and isinstance(nested, dict):
+            nested[sous_secteur] = rules
+        self.layout.pop((secteur, sous_secteur), None)
+        self.index.attach(secteur, sous_secteur, systems)
+        self.index.accessed[(secteur, sous_secteur)] = time.monotonic()
+        self.scoring.rebuild()
+        print(f"📦 Sous-secteur {sous_secteur} chargé à la demande depuis {self.store.label}")
+
+    def _sub_sector_idle(self, secteur: str, sous_secteur: str, now: float) -> bool:
+        systems = self.sectors.get(secteur, {}).get(sous_secteur)
+        return (
+            systems is not None
+            and not sub_sector_in_play(secteur, sous_secteur, systems, self.active_systems, self.current_phase)
+            and now - self.index.accessed.get((secteur, sous_secteur), 0) >= SUB_SECTOR_IDLE_TIMEOUT
+            and not any(key[:2] == (secteur, sous_secteur) for key in self.dirty_planets)
+        )
+
+    async def evict_dormant(self):
+        """
+        Remet en sommeil les sous-secteurs hors jeu inutilisés depuis
+        SUB_SECTOR_IDLE_TIMEOUT, une fois leur état écrit sur disque.
+        """
+        if not self.store.lazy:
+            return
+        now = time.monotonic()
+        candidates = [
+            (secteur, ss) for secteur, sous_secteurs in self.sectors.items() for ss, systems in sous_secteurs.items()
+            if systems is not None and not sub_sector_in_play(secteur, ss, systems, self.active_systems, self.current_phase)
+            and now - self.index.accessed.get((secteur, ss), 0) >= SUB_SECTOR_IDLE_TIMEOUT
+        ]
+        if not candidates:
+            return
+        await self.persister.flush()
+        evicted = []
+        for secteur, ss in candidates:
+            if not self._sub_sector_idle(secteur, ss, time.monotonic()):
+                continue  # modifié ou consulté pendant l'écriture
+            systems = self.sectors[secteur][ss]
+            names = {systeme: list(planets) for systeme, planets in systems.items()}
+            self.layout[(secteur, ss)] = names
+            self.index.attach(secteur, ss, None, names)
+            self.sectors[secteur][ss] = None
+            nested = self.system_rules.get(secteur)
+            if isinstance(nested, dict) and isinstance(nested.get(ss), dict):
+                nested[ss] = None
+            evicted.append(ss)
+        if evicted:
+            self.scoring.rebuild()
+            print(f"💤 Sous-secteur(s) remis en sommeil : {', '.join(evicted)}")
+
+    def unload(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer = None
+        self.store.close()
+
+class CampaignRegistry:
+    """
+    Campagnes chargées, par id de serveur. Une campagne est lue sur disque à la
+    première interaction de son serveur (dans un thread, voir `load`) et déchargée
+    après CAMPAIGN_IDLE_TIMEOUT secondes sans commande : la mémoire suit les
+    serveurs actifs.
+    """
+    def __init__(self):
+        self.campaigns = {}
+        self._loop = None
+        self._task = None
+        self._locks = {}  # id de serveur -> asyncio.Lock du chargement
+        self._preloads = set()  # chargements lancés par les autocomplétions
+
+    def loaded(self, guild_id: Optional[int]) -> Optional[Campaign]:
+        return self.campaigns.get(default_guild_id() if guild_id is None else guild_id)
+
+    def get(self, guild_id: Optional[int]) -> Campaign:
+        # Chargement synchrone, hors de la boucle asyncio (bench.py, tests)
+        if guild_id is None:
+            guild_id = default_guild_id()
+        campaign = self.campaigns.get(guild_id)
+        if campaign is None:
+            campaign = Campaign(guild_id, campaign_directory(guild_id))
+            load_data(campaign)
+            self._register(campaign)
+        return campaign
+
+    async def load(self, guild_id: Optional[int]) -> Campaign:
+        """
+        Charge la campagne d'un serveur sans bloquer la boucle : lecture du stockage
+        et rejeu du journal tournent dans un thread. Deux interactions simultanées
+        du même serveur attendent le même chargement.
+        """
+        if guild_id is None:
+            guild_id = default_guild_id()
+        campaign = self.campaigns.get(guild_id)
+        if campaign is not None:
+            return campaign
+        async with self._locks.setdefault(guild_id, asyncio.Lock()):
+            campaign = self.campaigns.get(guild_id)
+            if campaign is None:
+                campaign = Campaign(guild_id, campaign_directory(guild_id))
+                await asyncio.to_thread(load_data, campaign)
+                self._register(campaign)
+        return campaign
+
+    def preload(self, guild_id: Optional[int]):
+        # Chargement en arrière-plan, sans attendre (autocomplétions)
+        task = asyncio.create_task(self.load(guild_id))
+        self._preloads.add(task)
+        task.add_done_callback(self._preloads.discard)
+
+    def _register(self, campaign: Campaign):
+        self.campaigns[campaign.guild_id] = campaign
+        print(f"📂 Campagne du serveur {campaign.guild_id} chargée ({len(self.campaigns)} en mémoire)")
+        if self._loop is not None:
+            campaign.watch(self._loop)
+
+    def start(self):
+        # Appelé par setup_hook : surveillance des data.json et balayage des campagnes inactives
+        self._loop = asyncio.get_running_loop()
+        for campaign in self.campaigns.values():
+            campaign.watch(self._loop)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(CAMPAIGN_SWEEP_INTERVAL)
+            await self.evict_idle()
+            for campaign in list(self.campaigns.values()):
+                await campaign.evict_dormant()
+
+    async def evict_idle(self):
+        now = time.monotonic()
+        for guild_id, campaign in list(self.campaigns.items()):
+            if campaign.active or now - campaign.last_used < CAMPAIGN_IDLE_TIMEOUT:
+                continue
+            last_used = campaign.last_used
+            await campaign.flush()
+            # Une commande a pu arriver pendant l'écriture : la campagne reste alors chargée
+            if campaign.active or campaign.last_used != last_used or self.campaigns.get(guild_id) is not campaign:
+                continue
+            campaign.unload()
+            del self.campaigns[guild_id]
+            print(f"💤 Campagne du serveur {guild_id} déchargée après inactivité ({len(self.campaigns)} en mémoire)")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        for campaign in list(self.campaigns.values()):
+            await campaign.flush()
+
+CAMPAIGNS = CampaignRegistry()
+
+# ----------------- MÉTRIQUES -----------------
+METRICS_FILE = os.getenv("METRICS_FILE", "")  # vide (défaut) : pas d'export fichier
+METRICS_INTERVAL = float(os.getenv("METRICS_INTERVAL", "15"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0") or 0)  # 0 : pas de serveur HTTP
+METRICS_SAMPLES = 1000  # échantillons récents conservés pour les percentiles de /diag
+INTERACTION_DEADLINE = 3.0  # délai de première réponse imposé par Discord (secondes)
+AUTO_DEFER_BUDGET = float(os.getenv("AUTO_DEFER_BUDGET", "2.0"))  # 0 : pas de defer automatique
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+class Histogram:
+    """Histogramme cumulatif au format Prometheus + échantillons récents."""
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=METRICS_SAMPLES)
+
+    def observe(self, seconds: float):
+        self.total += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+        index = bisect_left(LATENCY_BUCKETS, seconds)
+        if index < len(self.counts):
+            self.counts[index] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class CommandMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.deferred = 0
+        self.late = 0  # première réponse après INTERACTION_DEADLINE
+        self.latency = Histogram()
+        self.first_response = Histogram()
+
+class InteractionCall:
+    """Suivi d'une interaction en cours (voir `instrumented`, `reply`, `defer`)."""
+    def __init__(self, name: str, interaction: discord.Interaction, ephemeral: bool = False):
+        self.name = name
+        self.interaction = interaction
+        self.ephemeral = ephemeral  # mode des defers automatiques
+        self.placeholder = False    # « réfléchit… » automatique pas encore remplacé
+        self.start = time.perf_counter()
+        self.first_response_at = None
+        self.deferred = False
+        # Temps déjà écoulé depuis la création de l'interaction côté Discord
+        created_at = getattr(interaction, "created_at", None)
+        self.lag = 0.0
+        if created_at:
+            lag = (discord.utils.utcnow() - created_at).total_seconds()
+            self.lag = min(max(lag, 0.0), INTERACTION_DEADLINE)
+        # Sérialise la première réponse entre le handler et le defer automatique
+        self.lock = asyncio.Lock()
+
+    def responded(self):
+        if self.first_response_at is None:
+            self.first_response_at = time.perf_counter()
+
+    async def auto_defer(self):
+        """
+        Diffère la réponse (« réfléchit… ») si le handler n'a toujours rien envoyé
+        une fois AUTO_DEFER_BUDGET écoulé : la réponse finale passera par le followup.
+        """
+        await asyncio.sleep(max(0.0, AUTO_DEFER_BUDGET - self.lag))
+        async with self.lock:
+            if self.interaction.response.is_done():
+                return
+            try:
+                await self.interaction.response.defer(thinking=True, ephemeral=self.ephemeral)
+            except discord.HTTPException as e:
+                print(f"⚠️ /{self.name} : defer automatique impossible : {e}")
+                return
+            self.deferred = True
+            self.placeholder = True
+            self.responded()
+        print(f"⏳ /{self.name} : réponse différée automatiquement après {time.perf_counter() - self.start + self.lag:.2f}s")
+
+CURRENT_CALL = contextvars.ContextVar("CURRENT_CALL", default=None)
+
+class MetricsRegistry:
+    """
+    Latences, temps de première réponse, erreurs et recours à defer par commande
+    et par autocomplétion. Exportées au format texte Prometheus, sur demande : dans
+    METRICS_FILE (collecteur textfile) et/ou sur http://127.0.0.1:METRICS_PORT/metrics.
+    """
+    def __init__(self):
+        self.commands = {}  # nom -> CommandMetrics
+        self.started = time.time()
+        self._task = None
+        self._runner = None
+
+    def record(self, call: InteractionCall, error: bool):
+        metrics = self.commands.setdefault(call.name, CommandMetrics())
+        end = time.perf_counter()
+        metrics.calls += 1
+        metrics.errors += int(error)
+        metrics.deferred += int(call.deferred)
+        metrics.latency.observe(end - call.start)
+        first = (call.first_response_at or end) - call.start
+        metrics.first_response.observe(first)
+        if first > INTERACTION_DEADLINE:
+            metrics.late += 1
+            print(f"⏱️ /{call.name} : première réponse après {first:.2f}s (limite {INTERACTION_DEADLINE:g}s)")
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP campagne_commandes_total Appels par commande",
+            "# TYPE campagne_commandes_total counter",
+        ]
+        for name, m in sorted(self.commands.items()):
+            lines.append(f'campagne_commandes_total{{commande="{name}"}} {m.calls}')
+        for metric, attr, help_text in (
+            ("campagne_erreurs_total", "errors", "Exceptions levées par commande"),
+            ("campagne_defer_total", "deferred", "Réponses différées (defer) par commande"),
+            ("campagne_reponses_tardives_total", "late", "Premières réponses au-delà du délai de Discord"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, m in sorted(self.commands.items()):
+                lines.append(f'{metric}{{commande="{name}"}} {getattr(m, attr)}')
+        for metric, attr, help_text in (
+            ("campagne_latence_secondes", "latency", "Durée totale du traitement"),
+            ("campagne_premiere_reponse_secondes", "first_response", "Délai avant la première réponse"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, m in sorted(self.commands.items()):
+                hist = getattr(m, attr)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, hist.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{commande="{name}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{commande="{name}",le="+Inf"}} {hist.total}')
+                lines.append(f'{metric}_sum{{commande="{name}"}} {hist.sum:.6f}')
+                lines.append(f'{metric}_count{{commande="{name}"}} {hist.total}')
+        return "\n".join(lines) + "\n"
+
+    def write_file(self):
+        tmp_path = f"{METRICS_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, METRICS_FILE)
+
+    async def _export_loop(self):
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            try:
+                await asyncio.to_thread(self.write_file)
+            except OSError as e:
+                print(f"⚠️ Export des métriques impossible : {e}")
+
+    async def start(self):
+        if METRICS_FILE and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._export_loop())
+        if METRICS_PORT and self._runner is None:
+            async def handle(request):
+                return web.Response(text=self.render_prometheus(), content_type="text/plain", charset="utf-8")
+            app = web.Application()
+            app.router.add_get("/metrics", handle)
+            self._runner = web.AppRunner(app)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, "127.0.0.1", METRICS_PORT).start()
+            print(f"📈 Métriques servies sur http://127.0.0.1:{METRICS_PORT}/metrics")
+
+METRICS = MetricsRegistry()
+
+def instrumented(kind: str = "commande", ephemeral: bool = False):
+    """
+    Mesure une commande (ou une autocomplétion avec kind="autocomplete") :
+    latence, première réponse, erreurs, defer. Une commande qui n'a pas répondu
+    après AUTO_DEFER_BUDGET secondes est différée automatiquement. Le handler
+    reçoit la campagne du serveur dans interaction.extras["campaign"] ; si elle n'est pas
+    encore en mémoire, la commande est différée pendant son chargement et
+    l'autocomplétion ne propose rien. `ephemeral` : les réponses de la commande
+    sont privées, ses defers automatiques le sont donc aussi.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+            call = InteractionCall(func.__name__, interaction, ephemeral)
+            token = CURRENT_CALL.set(call)
+            campaign = CAMPAIGNS.loaded(interaction.guild_id)
+            entered = False
+            watchdog = None
+            error = False
+            try:
+                if campaign is None:
+                    if kind != "commande":
+                        # Autocomplétion : aucun choix tant que la campagne se charge
+                        CAMPAIGNS.preload(interaction.guild_id)
+                        call.responded()
+                        return []
+                    # Première interaction du serveur : on diffère avant de lire le disque
+                    await defer(interaction, thinking=True, ephemeral=ephemeral)
+                    call.placeholder = True
+                    campaign = await CAMPAIGNS.load(interaction.guild_id)
+                campaign.active += 1
+                entered = True
+                interaction.extras["campaign"] = campaign
+                if kind == "commande" and AUTO_DEFER_BUDGET > 0:
+                    watchdog = asyncio.create_task(call.auto_defer())
+                result = await func(interaction, *args, **kwargs)
+                if kind != "commande":
+                    call.responded()  # l'autocomplétion répond en retournant ses choix
+                return result
+            except Exception:
+                error = True
+                raise
+            finally:
+                if watchdog:
+                    watchdog.cancel()
+                CURRENT_CALL.reset(token)
+                if entered:
+                    campaign.active -= 1
+                    campaign.last_used = time.monotonic()
+                METRICS.record(call, error)
+        return wrapper
+    return decorator
+
+async def reply(interaction: discord.Interaction, content: Optional[str] = None, **kwargs):
+    """
+    Envoie une réponse : la première passe par interaction.response, les suivantes
+    (ou après un defer, éventuellement automatique) par le followup. Une réponse
+    éphémère après un defer automatique public remplace le « réfléchit… » par un
+    message privé.
+    """
+    call = CURRENT_CALL.get()
+    if call and call.interaction is interaction:
+        async with call.lock:
+            if not interaction.response.is_done():
+                await interaction.response.send_message(content, **kwargs)
+                call.responded()
+                return
+            if call.placeholder:
+                call.placeholder = False
+                if kwargs.get("ephemeral") and not call.ephemeral:
+                    # Un « réfléchit… » public ne peut pas devenir privé : on le retire
+                    # et la réponse (une erreur, le plus souvent) part en message éphémère
+                    await interaction.delete_original_response()
+    elif not interaction.response.is_done():
+        return await interaction.response.send_message(content, **kwargs)
+    return await interaction.followup.send(content, **kwargs)
+
+async def defer(interaction: discord.Interaction, **kwargs):
+    call = CURRENT_CALL.get()
+    if not (call and call.interaction is interaction):
+        return await interaction.response.defer(**kwargs)
+    async with call.lock:
+        if interaction.response.is_done():
+            return  # déjà différée automatiquement
+        await interaction.response.defer(**kwargs)
+        call.deferred = True
+        call.responded()
 
 # ----------------- AUTOCOMPLETION -----------------
+@instrumented("autocomplete")
 async def autocomplete_planete(interaction: discord.Interaction, current: str):
-    return [app_commands.Choice(name=p, value=p) for p in all_planets() if current.lower() in p.lower()][:25]
+    return interaction.extras["campaign"].search_planetes.search(current)
 
+@instrumented("autocomplete")
 async def autocomplete_faction(interaction: discord.Interaction, current: str):
     return [app_commands.Choice(name=f, value=f) for f in FACTIONS if current.lower() in f.lower()][:25]
 
+@instrumented("autocomplete")
 async def autocomplete_numbers(interaction: discord.Interaction, current: str):
     numbers = [str(i) for i in range(0, 21)]
     return [app_commands.Choice(name=n, value=n) for n in numbers if current in n][:25]
 
+@instrumented("autocomplete")
 async def autocomplete_systeme(interaction: discord.Interaction, current: str):
-    return [app_commands.Choice(name=s, value=s) for s in all_systems() if current.lower() in s.lower()][:25]
+    return interaction.extras["campaign"].search_systemes.search(current)
 
-async def autocomplete_phase(interaction: discord.Interaction, current: str):
-    current_phase_number = CURRENT_PHASE.get("phase", 1)
+@instrumented("autocomplete")
+async def autocomplete_phase_jouable(interaction: discord.Interaction, current: str):
+    campaign = interaction.extras["campaign"]
+    # Phases où /ajout peut ranger une partie : de 1 à la phase en cours
+    current_phase_number = campaign.current_phase.get("phase", 1)
     phases = [str(i) for i in range(1, current_phase_number + 1)]
-    return [app_commands.Choice(name=p, value=p) for p in phases if current in p][:25]
+    return [app_commands.Choice(name=p, value=int(p)) for p in phases if current in p][:25]
 
+@instrumented("autocomplete")
 async def autocomplete_honneur(interaction: discord.Interaction, current: str):
-    return [app_commands.Choice(name=kw, value=kw) for kw in HonneurKeyWords if current.lower() in kw.lower()][:25]
+    return interaction.extras["campaign"].search_honneur.search(current)
 
+@instrumented("autocomplete")
 async def autocomplete_sous_secteur(interaction: discord.Interaction, current: str):
-    secteur_courant = CURRENT_PHASE.get("secteur")
-    if not secteur_courant or secteur_courant not in SECTORS:
+    campaign = interaction.extras["campaign"]
+    secteur_courant = campaign.current_phase.get("secteur")
+    if not secteur_courant or secteur_courant not in campaign.sectors:
         return []
 
     # Liste des sous-secteurs disponibles dans le secteur courant
-    sous_secteurs = [ss for ss in SECTORS[secteur_courant].keys() if current.lower() in ss.lower()]
+    sous_secteurs = [ss for ss in campaign.sectors[secteur_courant].keys() if current.lower() in ss.lower()]
 
     # Limiter à 25 choix comme Discord l'impose
     return [app_commands.Choice(name=ss, value=ss) for ss in sous_secteurs][:25]
 
 # --- Autocomplétion des numéros de phase ---
+@instrumented("autocomplete")
 async def autocomplete_phase(interaction: discord.Interaction, current: str):
     phases = [str(i) for i in range(1, 16)]
     return [
@@ -203,31 +2567,21 @@ async def autocomplete_phase(interaction: discord.Interaction, current: str):
     ][:25]
 
 # --- Autocompletion pour activer les systèmes ---
+@instrumented("autocomplete")
 async def completer_activer(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-    secteur_nom = list(ACTIVE_SYSTEMS.keys())[0]
-    choices = []
-    for ss, systemes in ACTIVE_SYSTEMS[secteur_nom].items():
-        for sys, actif in systemes.items():
-            if not actif and current.lower() in sys.lower():
-                choices.append(app_commands.Choice(name=f"{sys} ({ss})", value=sys))
-    return choices[:25]  # Discord limite à 25 choix max
+    return interaction.extras["campaign"].search_activer.search(current)  # Discord limite à 25 choix max
 
 # --- Autocompletion pour désactiver les systèmes ---
+@instrumented("autocomplete")
 async def completer_desactiver(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-    secteur_nom = list(ACTIVE_SYSTEMS.keys())[0]
-    choices = []
-    for ss, systemes in ACTIVE_SYSTEMS[secteur_nom].items():
-        for sys, actif in systemes.items():
-            if actif and current.lower() in sys.lower():
-                choices.append(app_commands.Choice(name=f"{sys} ({ss})", value=sys))
-    return choices[:25]
+    return interaction.extras["campaign"].search_desactiver.search(current)
 
 # ---------------------------------------------
 # ---------------------------------------------
 # ----------------- COMMANDES -----------------
 
 # ----------------- COMMANDE /ajout -----------
-@tree.command(name="ajout", description="Ajouter une partie/bataille", guild=guild)
+@tree.command(name="ajout", description="Ajouter une partie/bataille", guilds=GUILDS)
 @app_commands.describe(
     planete="Nom de la planète",
     gagnant="Faction gagnante ou 'Egalite'",
@@ -240,228 +2594,84 @@ async def completer_desactiver(interaction: discord.Interaction, current: str) -
 @app_commands.autocomplete(planete=autocomplete_planete, gagnant=autocomplete_faction,
                            choix_planete=autocomplete_faction, participant1=autocomplete_faction,
                            participant2=autocomplete_faction, participant3=autocomplete_faction,
-                           phase=autocomplete_phase)
+                           phase=autocomplete_phase_jouable)
 @admin_only()
+@instrumented()
 async def ajout(interaction: discord.Interaction, planete: str, gagnant: str, choix_planete: str,
-                participant1: str, participant2: str, participant3: Optional[str] = None,
-                phase: Optional[int] = None):
-    global CURRENT_PHASE, TOTAL_PARTIES, PHASES_HISTORY
-
-    participants_list = [p for p in [participant1, participant2, participant3] if p]
-
-    # --- Recherche de la planète dans la nouvelle hiérarchie ---
-    systeme_found = None
-    sous_secteur_found = None
-    secteur_found = None
-
-    for secteur, sous_secteurs in SECTORS.items():
-        for sous_secteur, systemes in sous_secteurs.items():
-            for systeme, planets in systemes.items():
-                if planete in planets:
-                    systeme_found = systeme
-                    sous_secteur_found = sous_secteur
-                    secteur_found = secteur
-                    planet_info = planets[planete]
-                    break
-            if systeme_found:
-                break
-        if systeme_found:
-            break
-
-    if not systeme_found:
-        await interaction.response.send_message(f"❌ Planète inconnue : {planete}", ephemeral=True)
-        return
-
-    gagnant = gagnant.capitalize()
-    choix_planete = choix_planete.capitalize()
-
-    # Validation participants
-    for f in participants_list:
-        if f not in FACTIONS:
-            await interaction.response.send_message(f"❌ Faction inconnue : {f}", ephemeral=True)
-            return
-    if gagnant != "Egalite" and gagnant not in participants_list:
-        await interaction.response.send_message(
-            "❌ Le gagnant doit être parmi les participants ou 'Egalite'", ephemeral=True
-        )
-        return
-    if choix_planete not in participants_list:
-        await interaction.response.send_message(
-            "❌ La faction qui choisit la planète doit être parmi les participants", ephemeral=True
-        )
-        return
-
-    # Déterminer la phase
-    target_phase = phase if phase is not None else CURRENT_PHASE["phase"]
-
-    # Si on ajoute dans la phase en cours, on incrémente TOTAL_PARTIES
-    if target_phase == CURRENT_PHASE["phase"]:
-        for f in participants_list:
-            TOTAL_PARTIES[f] += 1
-
-    # Attribution des points et choix pour la planète
-    for f in participants_list:
-        # Points (conservés entre les phases)
-        if f == gagnant:
-            planet_info[f]["points"] += 3
-        elif gagnant == "Egalite":
-            planet_info[f]["points"] += 2
-        else:
-            planet_info[f]["points"] += 1
-
-        # Batailles & choix (par phase)
-        if target_phase == CURRENT_PHASE["phase"]:
-            planet_info[f]["batailles"] += 1
-            if f == choix_planete:
-                planet_info[f]["choix"] += 1
-        else:
-            if target_phase not in PHASES_HISTORY:
-                PHASES_HISTORY[target_phase] = {
-                    "total_parties": {f: 0 for f in FACTIONS},
-                    "choix_planete": {f: 0 for f in FACTIONS}
-                }
-            PHASES_HISTORY[target_phase]["total_parties"][f] += 1
-            if f == choix_planete:
-                PHASES_HISTORY[target_phase]["choix_planete"][f] += 1
-
-    await interaction.response.send_message(
-        f"✅ Partie ajoutée sur **{planete} ({systeme_found})** dans la phase {target_phase} !\n"
-        f"Gagnant : **{gagnant}**, choix de la planète : **{choix_planete}**, participants : {', '.join(participants_list)}"
-    )
-    save_data()
-
-
-# ----------------- Clôturer phase -----------------
-@tree.command(
-    name="cloture",
-    description="Clôturer la phase en cours",
-    guild=guild
-)
-@app_commands.describe(
-    nouveau_sous_secteur="Nouveau sous-secteur (obligatoire si la phase locale est multiple de 3)"
-)
-@app_commands.autocomplete(nouveau_sous_secteur=autocomplete_sous_secteur)
-@admin_only()
-async def cloture(interaction: discord.Interaction, nouveau_sous_secteur: Optional[str] = None):
-    global CURRENT_PHASE, TOTAL_PARTIES, PHASES_HISTORY, ACTIVE_SYSTEMS
-
-    secteur = CURRENT_PHASE.get("secteur")
-    ancien_ss = CURRENT_PHASE.get("sous_secteur")
-
-    if not secteur or not ancien_ss:
-        await interaction.response.send_message(
-            "❌ Impossible de déterminer le secteur ou le sous-secteur courant.",
-            ephemeral=True
-        )
-        return
-
-    # --- Déterminer la phase locale actuelle ---
-    local_history = PHASES_HISTORY.get(ancien_ss, {})
-    if local_history:
-        phase_local = max(int(k) for k in local_history.keys()) + 1
-    else:
-        phase_local = 1
-
-    # --- Vérifier changement de sous-secteur ---
-    if phase_local % 3 == 0:
-        if not nouveau_sous_secteur:
-            await interaction.response.send_message(
-                "⚠️ Fin de phase 3 (guerre totale) : vous devez indiquer un nouveau sous-secteur.",
-                ephemeral=True
-            )
-            return
-        if nouveau_sous_secteur not in SECTORS.get(secteur, {}):
-            await interaction.response.send_message(
-                f"❌ Sous-secteur inconnu dans le secteur {secteur}.",
-                ephemeral=True
-            )
-            return
-    else:
-        if nouveau_sous_secteur:
-            await interaction.response.send_message(
-                "⚠️ Vous ne pouvez pas changer de sous-secteur maintenant : la phase locale n'est pas multiple de 3.",
-                ephemeral=True
-            )
-            return
-
-    # --- Sauvegarde ordonnée des statistiques ---
-    ordre_factions = ["Défenseur", "Envahisseur", "Pirate"]
+                participant1: str, participant2: str, participant3: Optional[str] = None,
+                phase: Optional[int] = None):
+    campaign = interaction.extras["campaign"]
+    participants_list = [p for p in [participant1, participant2, participant3] if p]
 
-    phase_data = {
-        "total_parties": {f: TOTAL_PARTIES.get(f, 0) for f in ordre_factions},
-        "choix_planete": {f: 0 for f in ordre_factions}
+    event = {
+        "planete": planete,
+        "gagnant": gagnant.capitalize(),
+        "choix_planete": choix_planete.capitalize(),
+        "participants": participants_list,
+        "phase": phase
     }
+    try:
+        change = await campaign.writer.submit("bataille", event)
+    except MutationError as e:
+        await reply(interaction, str(e), ephemeral=e.ephemeral)
+        return
 
-    for systeme, planets in SECTORS[secteur][ancien_ss].items():
-        for planet, data in planets.items():
-            for f, stats in data.items():
-                if f in phase_data["choix_planete"]:
-                    phase_data["choix_planete"][f] += stats.get("choix", 0)
-
-    # Créer le sous-secteur s'il n'existe pas encore
-    if ancien_ss not in PHASES_HISTORY:
-        PHASES_HISTORY[ancien_ss] = {}
+    systeme_found = campaign.index.planet(planete)[2]
+    await reply(interaction, 
+        f"✅ Partie ajoutée sur **{planete} ({systeme_found})** dans la phase {event['phase']} !\n"
+        f"Gagnant : **{event['gagnant']}**, choix de la planète : **{event['choix_planete']}**, participants : {', '.join(participants_list)}"
+        f"{render_score_change(planete, systeme_found, change)}"
+    )
 
-    PHASES_HISTORY[ancien_ss][str(phase_local)] = phase_data
 
-    # --- Réinitialiser compteurs ---
-    TOTAL_PARTIES = {f: 0 for f in ordre_factions}
-    for systeme, planets in SECTORS[secteur][ancien_ss].items():
-        for planet, data in planets.items():
-            for f in data:
-                data[f]["batailles"] = 0
-                data[f]["choix"] = 0
+# ----------------- Clôturer phase -----------------
+@tree.command(
+    name="cloture",
+    description="Clôturer la phase en cours",
+    guilds=GUILDS
+)
+@app_commands.describe(
+    nouveau_sous_secteur="Nouveau sous-secteur (obligatoire si la phase locale est multiple de 3)"
+)
+@app_commands.autocomplete(nouveau_sous_secteur=autocomplete_sous_secteur)
+@admin_only()
+@instrumented()
+async def cloture(interaction: discord.Interaction, nouveau_sous_secteur: Optional[str] = None):
+    campaign = interaction.extras["campaign"]
+    try:
+        result = await campaign.writer.submit("cloture", {"nouveau_sous_secteur": nouveau_sous_secteur})
+    except MutationError as e:
+        await reply(interaction, str(e), ephemeral=e.ephemeral)
+        return
 
     # --- Si changement de sous-secteur ---
-    if phase_local % 3 == 0 and nouveau_sous_secteur:
-        # Désactivation ancien sous-secteur
-        if secteur in ACTIVE_SYSTEMS and ancien_ss in ACTIVE_SYSTEMS[secteur]:
-            for systeme in ACTIVE_SYSTEMS[secteur][ancien_ss]:
-                ACTIVE_SYSTEMS[secteur][ancien_ss][systeme] = False
-
-        # Activation nouveau sous-secteur
-        if secteur not in ACTIVE_SYSTEMS:
-            ACTIVE_SYSTEMS[secteur] = {}
-        if nouveau_sous_secteur not in ACTIVE_SYSTEMS[secteur]:
-            ACTIVE_SYSTEMS[secteur][nouveau_sous_secteur] = {}
-        for systeme in SECTORS[secteur][nouveau_sous_secteur]:
-            ACTIVE_SYSTEMS[secteur][nouveau_sous_secteur][systeme] = True
-
-        CURRENT_PHASE["sous_secteur"] = nouveau_sous_secteur
-
-        # Calculer la nouvelle phase pour le nouveau sous-secteur
-        new_hist = PHASES_HISTORY.get(nouveau_sous_secteur, {})
-        next_phase = max((int(k) for k in new_hist.keys()), default=0) + 1
-        CURRENT_PHASE["phase"] = next_phase
-
-        save_data()
-        await interaction.response.send_message(
-            f"✅ Phase {phase_local} clôturée dans **{ancien_ss}**.\n"
-            f"➡️ Changement vers **{nouveau_sous_secteur}**, début de la **phase {next_phase}**."
+    if nouveau_sous_secteur:
+        await reply(interaction, 
+            f"✅ Phase {result['phase_cloturee']} clôturée dans **{result['ancien_sous_secteur']}**.\n"
+            f"➡️ Changement vers **{nouveau_sous_secteur}**, début de la **phase {result['nouvelle_phase']}**."
         )
         return
 
     # --- Sinon, même sous-secteur ---
-    CURRENT_PHASE["phase"] = phase_local + 1
-
-    save_data()
-    await interaction.response.send_message(
-        f"✅ Phase {phase_local} clôturée. Nouvelle phase : **{CURRENT_PHASE['phase']}** "
-        f"(Sous-secteur : **{ancien_ss}**)."
+    await reply(interaction, 
+        f"✅ Phase {result['phase_cloturee']} clôturée. Nouvelle phase : **{result['nouvelle_phase']}** "
+        f"(Sous-secteur : **{result['ancien_sous_secteur']}**)."
     )
 
 # ----------------- Commande phase actuelle -----------------
 @tree.command(
     name="phase",
     description="Afficher la phase en cours",
-    guild=guild
+    guilds=GUILDS
 )
+@instrumented()
 async def phase(interaction: discord.Interaction):
-    phase_num = CURRENT_PHASE.get("phase", 1)
-    secteur = CURRENT_PHASE.get("secteur", "Inconnu")
-    sous_secteur = CURRENT_PHASE.get("sous_secteur", "Inconnu")
+    campaign = interaction.extras["campaign"]
+    phase_num = campaign.current_phase.get("phase", 1)
+    secteur = campaign.current_phase.get("secteur", "Inconnu")
+    sous_secteur = campaign.current_phase.get("sous_secteur", "Inconnu")
 
-    await interaction.response.send_message(
+    await reply(interaction, 
         f"📌 Phase actuelle : **{phase_num}**\n"
         f"🏛️ Secteur : **{secteur}**\n"
         f"🌌 Sous-secteur : **{sous_secteur}**"
@@ -473,7 +2683,7 @@ async def phase(interaction: discord.Interaction):
 @tree.command(
     name="phase_stats",
     description="Afficher les statistiques d'une phase spécifique dans un sous-secteur",
-    guild=guild
+    guilds=GUILDS
 )
 @app_commands.describe(
     phase="Numéro de la phase (1 à 15)",
@@ -483,24 +2693,26 @@ async def phase(interaction: discord.Interaction):
     phase=autocomplete_phase,
     sous_secteur=autocomplete_sous_secteur  # ✅ on réutilise ton autocomplete existant
 )
+@instrumented()
 async def phase_stats(interaction: discord.Interaction, phase: int, sous_secteur: str):
+    campaign = interaction.extras["campaign"]
     # Vérification du sous-secteur
-    if sous_secteur not in PHASES_HISTORY:
-        await interaction.response.send_message(
+    if sous_secteur not in campaign.phases_history:
+        await reply(interaction, 
             f"❌ Aucun historique trouvé pour le sous-secteur **{sous_secteur}**.",
             ephemeral=True
         )
         return
 
     # Vérification de la phase dans le sous-secteur
-    if str(phase) not in PHASES_HISTORY[sous_secteur]:
-        await interaction.response.send_message(
+    if str(phase) not in campaign.phases_history[sous_secteur]:
+        await reply(interaction, 
             f"❌ Phase {phase} inconnue dans le sous-secteur **{sous_secteur}**.",
             ephemeral=True
         )
         return
 
-    data = PHASES_HISTORY[sous_secteur][str(phase)]
+    data = campaign.phases_history[sous_secteur][str(phase)]
 
     # Création de l'embed
     embed = discord.Embed(
@@ -519,276 +2731,146 @@ async def phase_stats(interaction: discord.Interaction, phase: int, sous_secteur
             inline=False
         )
 
-    await interaction.response.send_message(embed=embed)
+    await reply(interaction, embed=embed)
 
 # ----------------- STATS PLANETE -----------------
+def render_planete(campaign: "Campaign", planete: str) -> Optional[discord.Embed]:
+    entry = campaign.index.planet(planete)
+    if entry is None:
+        return None
+    secteur, sous_secteur, systeme_found, planet_data = entry
+
+    embed = discord.Embed(title=f"🪐 {systeme_found.upper()}", color=discord.Color.green())
+
+    value = f"▪️\u2003🌏 **{planete}**\n"
+    leaders = campaign.scoring.leaders(secteur, sous_secteur, systeme_found, planete)
+
+    for f in ["Défenseur", "Envahisseur", "Pirate"]:
+        points, batailles, _ = planet_data.faction(f)
+        suffix = " 🏆" if f in leaders and len(leaders) == 1 else " ⚖️" if f in leaders else ""
+        value += f"▪️\u2003 \u2003{ICONS.get(f,'')}{suffix} {f} : **{points} pts** | `{batailles} batailles`\n"
+
+    embed.add_field(name="", value=value, inline=False)
+    return embed
+
 @tree.command(name="planete",
               description="Afficher les stats d’une planète",
-              guild=guild)
+              guilds=GUILDS)
 @app_commands.describe(planete="Nom de la planète")
 @app_commands.autocomplete(planete=autocomplete_planete)
+@instrumented()
 async def planete(interaction: discord.Interaction, planete: str):
-    # Parcours hiérarchique secteur → sous_secteur → système → planète
-    planet_data = None
-    systeme_found = None
+    campaign = interaction.extras["campaign"]
+    embed = cached_embed(campaign, "planete", planete, lambda: render_planete(campaign, planete))
+    if embed is None:
+        await reply(interaction, f"❌ Planète inconnue : {planete}", ephemeral=True)
+        return
+    await reply(interaction, embed=embed)
 
-    for secteur, sous_secteurs in SECTORS.items():
-        for sous_secteur, systemes in sous_secteurs.items():
-            for systeme, planets in systemes.items():
-                if planete in planets:
-                    planet_data = planets[planete]
-                    systeme_found = systeme
-                    break
-            if planet_data:
-                break
-        if planet_data:
-            break
 
-    if planet_data is None:
-        await interaction.response.send_message(f"❌ Planète inconnue : {planete}", ephemeral=True)
-        return
+# ----------------- STATS SYSTEME -----------------
+def render_systeme(campaign: "Campaign", systeme: str) -> Optional[discord.Embed]:
+    # Recherche du système
+    entry = campaign.index.system(systeme)
+    if not entry or not entry[2]:
+        return None
+    secteur_courant, sous_secteur_courant, system_data = entry
 
-    embed = discord.Embed(title=f"🪐 {systeme_found.upper()}", color=discord.Color.green())
-    ICONS = {"Défenseur": "🛡️", "Envahisseur": "⚔️", "Pirate": "💀"}
+    embed = discord.Embed(title=f"🪐 {systeme.upper()}", color=discord.Color.green())
 
-    value = f"▪️\u2003🌏 **{planete}**\n"
-    scores = {f: planet_data[f]["points"] for f in FACTIONS}
-    max_score = max(scores.values())
-    leaders = [f for f, pts in scores.items() if pts == max_score and pts > 0]
+    # --- Avancement par contrôle de planète ---
+    rules = system_rules_for(campaign, secteur_courant, sous_secteur_courant, systeme)
+    total_pv = campaign.scoring.system_pv(secteur_courant, sous_secteur_courant, systeme)
+    embed.add_field(name="", value=render_avancement(total_pv, rules), inline=False)
 
-    for f in ["Défenseur", "Envahisseur", "Pirate"]:
-        v = planet_data[f]
-        suffix = " 🏆" if f in leaders and len(leaders) == 1 else " ⚖️" if f in leaders else ""
-        value += f"▪️\u2003 \u2003{ICONS.get(f,'')}{suffix} {f} : **{v['points']} pts** | `{v['batailles']} batailles`\n"
+    # --- Détails des planètes ---
+    lines = render_planet_lines(
+        campaign, secteur_courant, sous_secteur_courant, systeme, system_data, rules.get("planets", {})
+    )
+    for chunk in chunk_lines(lines):
+        embed.add_field(name="", value=chunk, inline=False)
+
+    return embed
 
-    embed.add_field(name="", value=value, inline=False)
-    await interaction.response.send_message(embed=embed)
 
-# ----------------- STATS SYSTEME -----------------
 @tree.command(
     name="systeme",
     description="Afficher les stats d’un système précis avec toutes ses planètes",
-    guild=guild
+    guilds=GUILDS
 )
 @app_commands.describe(systeme="Nom du système")
 @app_commands.autocomplete(systeme=autocomplete_systeme)
+@instrumented()
 async def systeme(interaction: discord.Interaction, systeme: str):
+    campaign = interaction.extras["campaign"]
     systeme = systeme.capitalize()
 
-    # Recherche du système
-    system_data = None
-    secteur_courant = None
-    sous_secteur_courant = None
-    for secteur, sous_secteurs in SECTORS.items():
-        for sous_secteur, systemes in sous_secteurs.items():
-            if systeme in systemes:
-                system_data = systemes[systeme]
-                secteur_courant = secteur
-                sous_secteur_courant = sous_secteur
-                break
-        if system_data:
-            break
-
-    if not system_data:
-        await interaction.response.send_message(f"❌ Système inconnu : {systeme}", ephemeral=True)
+    embed = cached_embed(campaign, "systeme", systeme, lambda: render_systeme(campaign, systeme))
+    if embed is None:
+        await reply(interaction, f"❌ Système inconnu : {systeme}", ephemeral=True)
         return
+    await reply(interaction, embed=embed)
 
-    embed = discord.Embed(title=f"🪐 {systeme.upper()}", color=discord.Color.green())
-
-    ICONS = {"Défenseur": "🛡️", "Envahisseur": "⚔️", "Pirate": "💀"}
-    CASE_EMPTY = "▫️"
-    CASE_PV = "🏅"
-    CASE_BONUS = "🚩"
-    SPACE = " "
-
-    # Règles du système
-    rules = SYSTEM_RULES.get(systeme, {})
-    if not rules:
-        rules = SYSTEM_RULES.get(secteur_courant, {}).get(sous_secteur_courant, {}).get(systeme, {})
-    pv_thresholds = rules.get("pv_thresholds", [5])
-    bonus_threshold = rules.get("bonus_threshold", 3)
-    planet_values = rules.get("planets", {})
-    max_points = max(pv_thresholds + [bonus_threshold])
-
-    # --- Calcul de l'avancement par contrôle de planète ---
-    total_pv = {f: 0 for f in ICONS.keys()}
-    for planet, data in system_data.items():
-        if planet not in planet_values:
-            continue
-        scores = {f: data[f]["points"] for f in ICONS.keys()}
-        max_score = max(scores.values())
-        leaders = [f for f, pts in scores.items() if pts == max_score]
-        # Une planète est contrôlée seulement si un leader absolu
-        if len(leaders) == 1:
-            faction = leaders[0]
-            total_pv[faction] += planet_values[planet]
-
-    # Construction ligne des seuils
-    alignment_prefix = " " * len(f"{ICONS['Défenseur']} : ")
-    line_thresholds = alignment_prefix + CASE_EMPTY + SPACE
-    for pos in range(1, max_points + 1):
-        if pos in pv_thresholds:
-            line_thresholds += CASE_PV + SPACE
-        elif pos == bonus_threshold:
-            line_thresholds += CASE_BONUS + SPACE
-        else:
-            line_thresholds += CASE_EMPTY + SPACE
-
-    # Construction ligne des factions
-    faction_lines = []
-    for f, pts in total_pv.items():
-        pos_line = [CASE_EMPTY] * (max_points + 1)
-        pos_index = min(max(pts, 0), max_points)
-        pos_line[pos_index] = ICONS[f]
-        faction_lines.append(SPACE.join(pos_line))
-
-    avancement_block = "**Avancement :**\n" + line_thresholds.strip() + "\n" + "\n".join(faction_lines)
-    embed.add_field(name="", value=avancement_block, inline=False)
 
-    # --- Détails des planètes ---
-    lines = []
-    for planet, data in system_data.items():
-        value_icon = PLANET_VALUE_ICONS.get(planet_values.get(planet, 0), "")
-        lines.append(f"▪️ 🌏 **{planet}** {value_icon}")
-        scores = {f: data[f]["points"] for f in ICONS.keys()}
-        max_score = max(scores.values())
-        leaders = [f for f, pts in scores.items() if pts == max_score and pts > 0]
-        for f in ICONS.keys():
-            v = data[f]
-            suffix = " 🏆" if f in leaders and len(leaders) == 1 else " ⚖️" if f in leaders else ""
-            lines.append(f"▪️  {ICONS[f]}{suffix} {f} : **{v['points']} pts** | `{v['batailles']} batailles`")
-        lines.append("")
-
-    # Découpage en chunks
-    MAX_FIELD_LEN = 1000
-    chunks = []
-    current = ""
-    for ln in lines:
-        if len(current) + len(ln) + 1 > MAX_FIELD_LEN:
-            chunks.append(current.rstrip("\n"))
-            current = ""
-        current += ln + "\n"
-    if current:
-        chunks.append(current.rstrip("\n"))
 
-    for chunk in chunks:
-        embed.add_field(name="", value=chunk, inline=False)
-
-    await interaction.response.send_message(embed=embed)
+# ----------------- STATS TOUT -----------------
+def active_system_keys(campaign: "Campaign") -> List[Tuple[str, str, str]]:
+    # Systèmes actifs, dans l'ordre secteurs → sous-secteurs → systèmes
+    keys = []
+    for secteur, sous_secteurs in campaign.sectors.items():
+        for sous_secteur, systemes in sous_secteurs.items():
+            if systemes is None:
+                continue  # sous-secteur en sommeil : aucun système actif
+            for systeme in systemes:
+                if campaign.active_systems.get(secteur, {}).get(sous_secteur, {}).get(systeme, True):
+                    keys.append((secteur, sous_secteur, systeme))
+    return keys
+
+def render_stats_block(campaign: "Campaign", key: Tuple[str, str, str]) -> List[Tuple[str, str]]:
+    # Avancement du système puis ses planètes, découpées en champs
+    secteur, sous_secteur, systeme = key
+    rules = system_rules_for(campaign, secteur, sous_secteur, systeme)
+    total_pv = campaign.scoring.system_pv(secteur, sous_secteur, systeme)
+    fields = [(f"🪐 {systeme.upper()}", render_avancement(total_pv, rules))]
+    planet_lines = render_planet_lines(campaign, secteur, sous_secteur, systeme,
+                                       campaign.sectors[secteur][sous_secteur][systeme], rules.get("planets", {}))
+    fields.extend(("", chunk) for chunk in chunk_lines(planet_lines))
+    return fields
+
+def stats_pager(campaign: "Campaign") -> EmbedPager:
+    # Une mise en page par version de l'état, partagée par /stats et ses boutons
+    key = ("stats", "", campaign.writer.version)
+    pager = campaign.render_cache.get(key)
+    if pager is None:
+        pager = EmbedPager("⚔️ Statistiques des systèmes actifs", discord.Color.green(),
+                           active_system_keys(campaign), functools.partial(render_stats_block, campaign),
+                           "❌ Aucun système actif pour cette phase.")
+        campaign.render_cache.put(key, pager)
+    return pager
 
 
-# ----------------- STATS TOUT -----------------
 @tree.command(
     name="stats",
     description="Afficher les stats de toutes les planètes des systèmes actifs",
-    guild=guild
+    guilds=GUILDS
 )
+@instrumented()
 async def stats(interaction: discord.Interaction):
-    embed = discord.Embed(
-        title="⚔️ Statistiques des systèmes actifs",
-        color=discord.Color.green()
-    )
-
-    ICONS = {"Défenseur": "🛡️", "Envahisseur": "⚔️", "Pirate": "💀"}
-    CASE_EMPTY = "▫️"
-    CASE_PV = "🏅"
-    CASE_BONUS = "🚩"
-    SPACE = " "
-    MAX_FIELD_LEN = 1000
-    MAX_FIELDS = 25
-    systems_displayed = 0
-
-    # Parcours hiérarchique secteurs → sous_secteurs → systèmes
-    for secteur, sous_secteurs in SECTORS.items():
-        for sous_secteur, systemes in sous_secteurs.items():
-            for systeme, system_data in systemes.items():
-                if not ACTIVE_SYSTEMS.get(secteur, {}).get(sous_secteur, {}).get(systeme, True):
-                    continue
-
-                rules = SYSTEM_RULES.get(secteur, {}).get(sous_secteur, {}).get(systeme, {})
-                pv_thresholds = rules.get("pv_thresholds", [5])
-                bonus_threshold = rules.get("bonus_threshold", 3)
-                planet_values = rules.get("planets", {})
-                max_points = max(pv_thresholds + [bonus_threshold])
+    campaign = interaction.extras["campaign"]
+    pager = stats_pager(campaign)
+    embeds = pager.page(0)
+    if pager.has_next(0):
+        await reply(interaction, embeds=embeds, view=PagerView(functools.partial(stats_pager, campaign)))
+    else:
+        await reply(interaction, embeds=embeds)
 
-                # --- Avancement ---
-                total_pv = {f: 0 for f in ICONS.keys()}
-                for planet, data in system_data.items():
-                    if planet not in planet_values:
-                        continue
-                    scores = {f: data[f]["points"] for f in ICONS.keys()}
-                    max_score = max(scores.values())
-                    if max_score <= 0:
-                        continue
-                    leaders = [f for f, pts in scores.items() if pts == max_score]
-                    if len(leaders) == 1:
-                        total_pv[leaders[0]] += planet_values[planet]
-
-                alignment_prefix = " " * len(f"{ICONS['Défenseur']} : ")
-                line_avancement = alignment_prefix + CASE_EMPTY + SPACE
-                for pos in range(1, max_points + 1):
-                    if pos in pv_thresholds:
-                        line_avancement += CASE_PV + SPACE
-                    elif pos == bonus_threshold:
-                        line_avancement += CASE_BONUS + SPACE
-                    else:
-                        line_avancement += CASE_EMPTY + SPACE
-
-                faction_lines = []
-                for f, pts in total_pv.items():
-                    pos_line = [CASE_EMPTY] * (max_points + 1)
-                    pos_index = min(max(pts, 0), max_points)
-                    pos_line[pos_index] = ICONS[f]
-                    faction_lines.append(SPACE.join(pos_line))
-
-                avancement_block = "**Avancement :**\n" + line_avancement.strip() + "\n" + "\n".join(faction_lines)
-
-                # --- Ajout embed ---
-                if len(embed.fields) < MAX_FIELDS:
-                    embed.add_field(name=f"🪐 {systeme.upper()}", value=avancement_block, inline=False)
-                    systems_displayed += 1
-
-                # --- Lignes planètes ---
-                planet_lines = []
-                for planet, data in system_data.items():
-                    value_icon = PLANET_VALUE_ICONS.get(planet_values.get(planet, 0), "")
-                    planet_lines.append(f"▪️ 🌏 **{planet}** {value_icon}")
-                    scores = {f: data[f]["points"] for f in data.keys()}
-                    max_score = max(scores.values())
-                    leaders = [f for f, pts in scores.items() if pts == max_score and pts > 0]
-
-                    for f in ["Défenseur", "Envahisseur", "Pirate"]:
-                        v = data[f]
-                        suffix = " 🏆" if f in leaders and len(leaders) == 1 else " ⚖️" if f in leaders else ""
-                        planet_lines.append(f"▪️  {ICONS[f]}{suffix} {f} : **{v['points']} pts** | `{v['batailles']} batailles`")
-                    planet_lines.append("")
-
-                # --- Découpage en chunks ---
-                chunks = []
-                current = ""
-                for ln in planet_lines:
-                    if len(current) + len(ln) + 1 > MAX_FIELD_LEN:
-                        chunks.append(current.rstrip("\n"))
-                        current = ""
-                    current += ln + "\n"
-                if current:
-                    chunks.append(current.rstrip("\n"))
-
-                for chunk in chunks:
-                    if len(embed.fields) < MAX_FIELDS:
-                        embed.add_field(name="", value=chunk, inline=False)
-
-    if systems_displayed == 0:
-        embed.description = "❌ Aucun système actif pour cette phase."
-
-    await interaction.response.send_message(embed=embed)
 
 
 # ----------------- MODIFIER STATS -----------------
 @tree.command(
     name="modif",
     description="Modifier directement les points ou batailles d’une faction sur une planète",
-    guild=guild
+    guilds=GUILDS
 )
 @app_commands.describe(
     planete="Nom de la planète",
@@ -803,58 +2885,36 @@ async def stats(interaction: discord.Interaction):
     batailles=autocomplete_numbers
 )
 @admin_only()
+@instrumented()
 async def modif(interaction: discord.Interaction,
                 planete: str,
                 faction: str,
                 points: Optional[int] = None,
                 batailles: Optional[int] = None):
+    campaign = interaction.extras["campaign"]
     faction = faction.capitalize()
-    
-    # Recherche de la planète dans la hiérarchie
-    planet_info = None
-    for secteur, sous_secteurs in SECTORS.items():
-        for sous_secteur, systemes in sous_secteurs.items():
-            for systeme_name, planets in systemes.items():
-                if planete in planets:
-                    planet_info = (secteur, sous_secteur, systeme_name, planets[planete])
-                    break
-            if planet_info:
-                break
-        if planet_info:
-            break
-
-    if planet_info is None:
-        await interaction.response.send_message(f"❌ Planète inconnue : {planete}", ephemeral=True)
-        return
-
-    secteur_found, sous_secteur_found, systeme_found, planet_data = planet_info
-
-    if faction not in FACTIONS:
-        await interaction.response.send_message(f"❌ Faction inconnue : {faction}", ephemeral=True)
-        return
 
     # Mise à jour des stats
-    if points is not None:
-        planet_data[faction]["points"] = points
+    try:
+        change = await campaign.writer.submit("modif", {"planete": planete, "faction": faction, "points": points, "batailles": batailles})
+    except MutationError as e:
+        await reply(interaction, str(e), ephemeral=e.ephemeral)
+        return
 
-    if batailles is not None:
-        delta = batailles - planet_data[faction]["batailles"]
-        planet_data[faction]["batailles"] = batailles
-        TOTAL_PARTIES[faction] += delta
+    systeme_found = campaign.index.planet(planete)[2]
 
-    await interaction.response.send_message(
+    await reply(interaction, 
         f"✅ Stats modifiées pour **{faction}** sur **{planete}** ({systeme_found}) : points={points} batailles={batailles}"
+        f"{render_score_change(planete, systeme_found, change)}"
     )
-    save_data()
 
 
 # ----------------- AUTRES COMMANDES -----------------
-ICONS = {"Défenseur": "🛡️", "Envahisseur": "⚔️", "Pirate": "💀"}
 
 @tree.command(
     name="faction",
     description="Afficher les statistiques de toutes les factions ou d'une faction précise",
-    guild=guild
+    guilds=GUILDS
 )
 @app_commands.describe(faction="Nom de la faction (Défenseur, Envahisseur, Pirate)")
 @app_commands.choices(faction=[
@@ -862,13 +2922,15 @@ ICONS = {"Défenseur": "🛡️", "Envahisseur": "⚔️", "Pirate": "💀"}
     app_commands.Choice(name="Envahisseur", value="Envahisseur"),
     app_commands.Choice(name="Pirate", value="Pirate")
 ])
+@instrumented()
 async def faction(interaction: discord.Interaction, faction: Optional[app_commands.Choice[str]] = None):
+    campaign = interaction.extras["campaign"]
     # Déterminer quelles factions afficher
     factions_to_show = [faction.value] if faction else ["Défenseur", "Envahisseur", "Pirate"]
 
-    secteur_courant = CURRENT_PHASE.get("secteur", "Inconnu")
-    sous_secteur_courant = CURRENT_PHASE.get("sous_secteur", "Inconnu")
-    phase_courante = CURRENT_PHASE.get("phase", 1)
+    secteur_courant = campaign.current_phase.get("secteur", "Inconnu")
+    sous_secteur_courant = campaign.current_phase.get("sous_secteur", "Inconnu")
+    phase_courante = campaign.current_phase.get("phase", 1)
 
     # --- Embed principal ---
     embed = discord.Embed(title="📊 Rapport stratégique", color=discord.Color.dark_blue())
@@ -884,39 +2946,14 @@ async def faction(interaction: discord.Interaction, faction: Optional[app_comman
         inline=False
     )
 
+    # Agrégats matérialisés : lecture en temps constant, sans parcours de l'historique
     for faction_nom in factions_to_show:
-        total_batailles = 0
-        batailles_cette_phase = 0
-        choix_planete = 0
-        planètes_gagnées = 0
-        systèmes_domines = {}
-
-        # --- Total batailles historique ---
-        for ss, phases in PHASES_HISTORY.items():
-            for phase_data in phases.values():
-                total_batailles += phase_data["total_parties"].get(faction_nom, 0)
-
-        # --- Batailles et choix en cours ---
-        if secteur_courant in SECTORS and sous_secteur_courant in SECTORS[secteur_courant]:
-            for systeme, planets in SECTORS[secteur_courant][sous_secteur_courant].items():
-                system_points = 0
-                for planete, data in planets.items():
-                    # Batailles cette phase
-                    batailles_cette_phase += data[faction_nom]["batailles"]
-                    total_batailles += data[faction_nom]["batailles"]
-
-                    # Choix de planète cette phase
-                    choix_planete += data[faction_nom]["choix"]
-
-                    # Vérification planète contrôlée
-                    max_points = max(fdata["points"] for fdata in data.values())
-                    leaders = [f for f, fdata in data.items() if fdata["points"] == max_points]
-                    if len(leaders) == 1 and leaders[0] == faction_nom:
-                        planètes_gagnées += 1
-                        system_points += 1
-
-                if system_points > 0:
-                    systèmes_domines[f"{systeme} ({sous_secteur_courant})"] = system_points
+        totals = campaign.faction_totals.report(faction_nom)
+        total_batailles = totals["historique"]
+        batailles_cette_phase = totals["batailles"]
+        choix_planete = totals["choix"]
+        planètes_gagnées = totals["planetes"]
+        systèmes_domines = {f"{systeme} ({sous_secteur_courant})": n for systeme, n in totals["systemes"].items()}
 
         # --- Embed par faction ---
         color = discord.Color.blue() if faction_nom == "Défenseur" else \
@@ -942,15 +2979,252 @@ async def faction(interaction: discord.Interaction, faction: Optional[app_comman
         embed.add_field(name="\u200b", value=value, inline=False)
         embed.color = color  # Mettre la couleur de la faction si c'est une seule
 
-    await interaction.response.send_message(embed=embed)
+    await reply(interaction, embed=embed)
+
+
+
+# ----------------- INDEX DES HONNEURS -----------------
+THREAD_CACHE_FILE = os.getenv("THREAD_CACHE_FILE", "threads_cache.json")
+THREAD_CACHE_MAX_AGE = float(os.getenv("THREAD_CACHE_MAX_AGE", "7"))  # jours avant un parcours complet
+THREAD_CACHE_SAVE_DELAY = float(os.getenv("THREAD_CACHE_SAVE_DELAY", "30"))  # secondes avant l'écriture différée
+FORUM_CONCURRENCY = max(1, int(os.getenv("FORUM_CONCURRENCY", "3")))  # forums lus en même temps
+FORUM_TIMEOUT = float(os.getenv("FORUM_TIMEOUT", "30"))  # secondes par forum
 
+async def resolve_forum(forum_id: int, semaphore: asyncio.Semaphore):
+    """
+    Forum depuis le cache, sinon une requête bornée par le sémaphore et FORUM_TIMEOUT.
+    Retourne (forum, None) ou (None, raison).
+    """
+    forum = bot.get_channel(forum_id)
+    if forum:
+        return forum, None
+    async with semaphore:
+        try:
+            return await asyncio.wait_for(bot.fetch_channel(forum_id), timeout=FORUM_TIMEOUT), None
+        except asyncio.TimeoutError:
+            return None, "délai dépassé"
+        except discord.NotFound:
+            return None, "introuvable"
+        except discord.HTTPException as e:
+            return None, f"erreur {e.status}"
+
+class ThreadTagIndex:
+    """
+    Index inversé tag → posts des forums d'honneur (FORUM_IDS), tenu à jour par
+    les événements de thread : un tirage /honneur devient une simple recherche
+    locale, sans appel à l'API.
+
+    L'index est conservé dans THREAD_CACHE_FILE. Au redémarrage il est servi
+    aussitôt, puis rafraîchi en ne lisant que les threads archivés après le
+    curseur de chaque forum (les listes d'archives sont triées du plus récent au
+    plus ancien). Au-delà de THREAD_CACHE_MAX_AGE jours, parcours complet pour
+    oublier les posts supprimés pendant l'arrêt du bot. Les événements de thread
+    sont écrits dans le cache au plus THREAD_CACHE_SAVE_DELAY secondes plus tard :
+    après un arrêt brutal, le cache ne manque que les tout derniers.
+    """
+    def __init__(self):
+        self.threads = {}  # id thread -> {"id", "name", "forum_id", "tag_ids", "tags", "archived", "archived_at"}
+        self.by_tag = {}   # tag (minuscules) -> ids des threads
+        self.cursors = {}  # id forum -> date d'archivage la plus récente déjà lue
+        self.saved_at = None
+        self.failed = {}   # id forum -> raison, forums incomplets lors du dernier rafraîchissement
+        self.ready = False
+        self.dirty = False
+        self._task = None
+        self._save_task = None
+
+    def _add(self, entry: dict):
+        self.threads[entry["id"]] = entry
+        for tag in entry["tags"]:
+            self.by_tag.setdefault(tag.lower(), set()).add(entry["id"])
+
+    def remove(self, thread_id: int):
+        entry = self.threads.pop(thread_id, None)
+        if not entry:
+            return
+        self.mark_dirty()
+        for tag in entry["tags"]:
+            ids = self.by_tag.get(tag.lower())
+            if ids:
+                ids.discard(thread_id)
+                if not ids:
+                    del self.by_tag[tag.lower()]
+
+    def upsert(self, thread: discord.Thread):
+        if thread.parent_id not in FORUM_IDS:
+            return
+        self.remove(thread.id)
+        self.mark_dirty()
+        self._add({
+            "id": thread.id,
+            "name": thread.name,
+            "guild_id": thread.guild.id,
+            "forum_id": thread.parent_id,
+            "tag_ids": [tag.id for tag in thread.applied_tags],
+            "tags": [tag.name for tag in thread.applied_tags],
+            "archived": bool(thread.archived),
+            "archived_at": thread.archive_timestamp.isoformat() if thread.archive_timestamp else None
+        })
+
+    def retag_forum(self, forum: discord.ForumChannel):
+        # Tags renommés ou supprimés dans un forum : recalcul local des noms
+        for entry in [e for e in self.threads.values() if e["forum_id"] == forum.id]:
+            self.remove(entry["id"])
+            tags = [forum.get_tag(tag_id) for tag_id in entry["tag_ids"]]
+            entry["tag_ids"] = [tag.id for tag in tags if tag]
+            entry["tags"] = [tag.name for tag in tags if tag]
+            self._add(entry)
+
+    def load_cache(self):
+        try:
+            with open(THREAD_CACHE_FILE, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cache des honneurs illisible, parcours complet : {e}")
+            return
+        for entry in cache.get("threads", []):
+            if entry.get("forum_id") in FORUM_IDS:
+                self._add(entry)
+        self.cursors = {int(k): v for k, v in cache.get("cursors", {}).items() if int(k) in FORUM_IDS}
+        self.saved_at = cache.get("saved_at")
+        self.ready = True
+        print(f"🎖️ Cache des honneurs chargé : {len(self.threads)} posts")
+
+    def mark_dirty(self):
+        # Écriture différée, seulement pour un index déjà chargé ou construit
+        # (pas l'index temporaire d'un rafraîchissement)
+        self.dirty = True
+        if self.saved_at and (self._save_task is None or self._save_task.done()):
+            self._save_task = asyncio.get_running_loop().create_task(self._save_later())
+
+    async def _save_later(self):
+        # Tant qu'un événement est arrivé pendant l'écriture, on repart pour un délai
+        while self.dirty:
+            await asyncio.sleep(THREAD_CACHE_SAVE_DELAY)
+            await self.save()
+
+    def _payload(self) -> dict:
+        return {
+            "saved_at": self.saved_at,
+            "cursors": {str(k): v for k, v in self.cursors.items()},
+            "threads": list(self.threads.values())
+        }
+
+    def save_cache(self):
+        write_json_atomic(THREAD_CACHE_FILE, self._payload())
+        self.dirty = False
+
+    async def save(self):
+        # Instantané pris dans la boucle, écriture hors de la boucle
+        payload = self._payload()
+        self.dirty = False
+        try:
+            await asyncio.to_thread(write_json_atomic, THREAD_CACHE_FILE, payload)
+        except OSError as e:
+            self.dirty = True
+            print(f"⚠️ Impossible d'écrire {THREAD_CACHE_FILE} : {e}")
+
+    def _cache_expired(self) -> bool:
+        if not self.saved_at:
+            return True
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(self.saved_at)
+        return age.total_seconds() > THREAD_CACHE_MAX_AGE * 86400
+
+    async def _crawl_forum(self, forum, cursor: Optional[str], fresh: "ThreadTagIndex", progress: dict):
+        # Threads actifs : fournis par la passerelle, sans requête
+        for thread in list(forum.threads):
+            fresh.upsert(thread)
+        async for thread in forum.archived_threads(limit=None):
+            archived_at = thread.archive_timestamp.isoformat()
+            if cursor and datetime.fromisoformat(archived_at) <= datetime.fromisoformat(cursor):
+                break
+            if not progress["newest"] or datetime.fromisoformat(archived_at) > datetime.fromisoformat(progress["newest"]):
+                progress["newest"] = archived_at
+            fresh.upsert(thread)
+            progress["read"] += 1
 
+    async def _refresh_forum(self, forum_id: int, full: bool, fresh: "ThreadTagIndex", semaphore: asyncio.Semaphore) -> int:
+        forum, reason = await resolve_forum(forum_id, semaphore)
+        if not forum:
+            print(f"⚠️ Forum {forum_id} : {reason}")
+            fresh.failed[forum_id] = reason
+            return 0
+        cursor = None if full else self.cursors.get(forum_id)
+        if cursor:
+            # Archives déjà connues : reprises du cache
+            for entry in self.threads.values():
+                if entry["forum_id"] == forum_id and entry["archived"]:
+                    fresh._add(dict(entry))
+        progress = {"newest": cursor, "read": 0}
+        async with semaphore:
+            try:
+                await asyncio.wait_for(self._crawl_forum(forum, cursor, fresh, progress), timeout=FORUM_TIMEOUT)
+                fresh.cursors[forum_id] = progress["newest"]
+                return progress["read"]
+            except asyncio.TimeoutError:
+                print(f"⚠️ Forum {forum_id} : délai de {FORUM_TIMEOUT:g}s dépassé ({progress['read']} archive(s) lue(s))")
+                fresh.failed[forum_id] = "délai dépassé"
+            except Exception as e:
+                print(f"⚠️ Erreur lors de la lecture du forum {forum_id} : {e}")
+                fresh.failed[forum_id] = "erreur de lecture"
+
+        # Lecture partielle : on garde ce qui a été lu et ce que l'on savait déjà,
+        # sans avancer le curseur
+        for entry in self.threads.values():
+            if entry["forum_id"] == forum_id and entry["id"] not in fresh.threads:
+                fresh._add(dict(entry))
+        if forum_id in self.cursors:
+            fresh.cursors[forum_id] = self.cursors[forum_id]
+        return progress["read"]
+
+    async def build(self):
+        # Forums parcourus en parallèle (FORUM_CONCURRENCY à la fois) ;
+        # l'index courant reste servi jusqu'à l'échange
+        full = self._cache_expired()
+        fresh = ThreadTagIndex()
+        semaphore = asyncio.Semaphore(FORUM_CONCURRENCY)
+        read_archived = sum(await asyncio.gather(
+            *(self._refresh_forum(forum_id, full, fresh, semaphore) for forum_id in FORUM_IDS)
+        ))
+
+        self.threads, self.by_tag, self.cursors = fresh.threads, fresh.by_tag, fresh.cursors
+        self.failed = fresh.failed
+        self.saved_at = datetime.now(timezone.utc).isoformat()
+        self.ready = True
+        mode = "complet" if full else "incrémental"
+        print(f"🎖️ Index des honneurs ({mode}) : {len(self.threads)} posts, {len(self.by_tag)} tags, "
+              f"{read_archived} archive(s) lue(s)")
+        await self.save()
+
+    def start_build(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self.build())
+
+    def match(self, keywords: List[str], guild_id: Optional[int] = None) -> List[dict]:
+        """
+        Posts dont tous les tags sont parmi les mots-clés fournis (et au moins un),
+        limités aux forums du serveur `guild_id` s'il est donné.
+        """
+        keywords = set(kw.lower() for kw in keywords)
+        candidates = set()
+        for kw in keywords:
+            candidates |= self.by_tag.get(kw, set())
+        return [
+            self.threads[thread_id] for thread_id in sorted(candidates)
+            if set(tag.lower() for tag in self.threads[thread_id]["tags"]).issubset(keywords)
+            and (guild_id is None or self.threads[thread_id].get("guild_id", guild_id) == guild_id)
+        ]
+
+HONNEUR_INDEX = ThreadTagIndex()
 
 # ----------------- TIRAGE AU SORT D'HONNEUR -----------------
 @tree.command(
     name="honneur",
     description="Tirer un post d'honneur parmi les mots-clés donnés",
-    guild=guild
+    guilds=GUILDS
 )
 @app_commands.describe(
     mot1="Mot-clé obligatoire",
@@ -968,6 +3242,7 @@ async def faction(interaction: discord.Interaction, faction: Optional[app_comman
     mot5=autocomplete_honneur,
     mot6=autocomplete_honneur
 )
+@instrumented()
 async def honneur(
     interaction: discord.Interaction,
     mot1: str,
@@ -977,121 +3252,427 @@ async def honneur(
     mot5: Optional[str] = None,
     mot6: Optional[str] = None):
     
-    await interaction.response.defer(thinking=True, ephemeral=False)
-
     # --- Préparer la liste des mots-clés ---
     keywords = [kw.lower() for kw in [mot1, mot2, mot3, mot4, mot5, mot6] if kw]
     if not keywords:
-        await interaction.followup.send("⚠️ Vous devez fournir au moins un mot-clé.")
+        await reply(interaction, "⚠️ Vous devez fournir au moins un mot-clé.")
         return
 
-    matched_threads = []
-
-    # --- Parcours des forums ---
-    for forum_id in FORUM_IDS:
-        forum = bot.get_channel(forum_id)
-        if not forum:
-            print(f"⚠️ Forum introuvable : {forum_id}")
-            continue
-        try:
-            active_threads = list(forum.threads)
-            archived_threads = [t async for t in forum.archived_threads(limit=None)]
-            threads = active_threads + archived_threads
-
-            for thread in threads:
-                if not thread.applied_tags:
-                    continue
-                thread_tags = set(tag.name.lower() for tag in thread.applied_tags)
-
-                # Vérification stricte selon la règle :
-                # - tous les tags du thread doivent être dans les keywords fournis
-                # - au moins un tag du thread doit correspondre à un keyword
-                if thread_tags and thread_tags.issubset(set(keywords)) and thread_tags.intersection(keywords):
-                    matched_threads.append(thread)
+    if not HONNEUR_INDEX.ready:
+        await reply(interaction, 
+            "⏳ Les tableaux d'honneur sont en cours d'indexation, réessayez dans quelques instants.",
+            ephemeral=True
+        )
+        return
 
-        except Exception as e:
-            print(f"⚠️ Erreur lors de la lecture du forum {forum_id} : {e}")
+    # --- Recherche dans l'index ---
+    # Règle stricte : tous les tags du post parmi les mots-clés, au moins un en commun
+    matched_threads = HONNEUR_INDEX.match(keywords, interaction.guild_id)
 
     # --- Vérification nombre minimal de résultats ---
     if len(matched_threads) < 3:
-        await interaction.followup.send(
-            "⚠️ Moins de 3 honneurs trouvés. Vérifiez les tableaux d'honneur ou contactez un admin."
+        partial = f" ({len(HONNEUR_INDEX.failed)} forum(s) incomplet(s))" if HONNEUR_INDEX.failed else ""
+        await reply(interaction, 
+            f"⚠️ Moins de 3 honneurs trouvés{partial}. Vérifiez les tableaux d'honneur ou contactez un admin."
         )
         return
 
     # --- Tirage aléatoire ---
     chosen_thread = random.choice(matched_threads)
-    thread_url = f"https://discord.com/channels/{interaction.guild_id}/{chosen_thread.id}"
+    thread_url = f"https://discord.com/channels/{interaction.guild_id}/{chosen_thread['id']}"
 
     # --- Création de l'embed ---
     embed = discord.Embed(
         title=f"🎖️ Honneur tiré au hasard parmi {len(matched_threads)} traits",
         color=discord.Color.gold()
     )
-    embed.add_field(name="Nom du post", value=chosen_thread.name, inline=False)
+    embed.add_field(name="Nom du post", value=chosen_thread["name"], inline=False)
     embed.add_field(name="Lien", value=f"[Ouvrir le post]({thread_url})", inline=False)
-    if chosen_thread.applied_tags:
-        embed.add_field(name="Tags", value=", ".join(tag.name for tag in chosen_thread.applied_tags), inline=False)
+    if chosen_thread["tags"]:
+        embed.add_field(name="Tags", value=", ".join(chosen_thread["tags"]), inline=False)
+    if HONNEUR_INDEX.failed:
+        embed.set_footer(text="⚠️ Résultats partiels, forums incomplets : " + ", ".join(
+            f"{forum_id} ({reason})" for forum_id, reason in HONNEUR_INDEX.failed.items()
+        ))
 
-    await interaction.followup.send(embed=embed)
+    await reply(interaction, embed=embed)
 
 
 # ----------------- MISE À JOUR DES TAGS D’HONNEUR -----------------
 @tree.command(
     name="maj_honneurs",
     description="Met à jour la liste des mots-clés d'honneur depuis les tags des forums",
-    guild=guild
+    guilds=GUILDS
 )
+@instrumented()
 async def maj_honneurs(interaction: discord.Interaction):
-    await interaction.response.defer(thinking=True)
+    campaign = interaction.extras["campaign"]
+    await defer(interaction, thinking=True)
     all_tags = set()
+    failed = {}
 
-    for forum_id in FORUM_IDS:
-        forum = bot.get_channel(forum_id)
+    # Forums résolus en parallèle (seuls ceux absents du cache coûtent une requête)
+    semaphore = asyncio.Semaphore(FORUM_CONCURRENCY)
+    results = await asyncio.gather(*(resolve_forum(forum_id, semaphore) for forum_id in FORUM_IDS))
+    for forum_id, (forum, reason) in zip(FORUM_IDS, results):
         if not forum:
-            print(f"⚠️ Forum introuvable : {forum_id}")
+            print(f"⚠️ Forum {forum_id} : {reason}")
+            failed[forum_id] = reason
             continue
+        if forum.guild.id != interaction.guild_id:
+            continue  # forum d'un autre serveur
         try:
             for tag in forum.available_tags:
                 all_tags.add(tag.name)
         except Exception as e:
             print(f"⚠️ Erreur forum {forum_id} : {e}")
+            failed[forum_id] = "erreur de lecture"
+
+    partial = ""
+    if failed:
+        partial = "\n⚠️ Résultats partiels, forums ignorés : " + ", ".join(
+            f"{forum_id} ({reason})" for forum_id, reason in failed.items()
+        )
 
     if not all_tags:
-        await interaction.followup.send("❌ Aucun tag trouvé dans les forums configurés.")
+        await reply(interaction, "❌ Aucun tag trouvé dans les forums configurés." + partial)
         return
 
-    global HonneurKeyWords
-    HonneurKeyWords = sorted(list(all_tags))
-    save_data()
+    await campaign.writer.submit("honneur_tags", {"tags": sorted(all_tags)})
 
-    await interaction.followup.send(
-        f"✅ Liste des Honneurs mise à jour avec {len(HonneurKeyWords)} tags :\n"
-        f"```{', '.join(HonneurKeyWords)}```"
+    await reply(interaction, 
+        f"✅ Liste des Honneurs mise à jour avec {len(campaign.honneur_keywords)} tags :\n"
+        f"```{', '.join(campaign.honneur_keywords)}```" + partial
     )
 
 
 
 
+# ----------------- MOTEUR DE TRANSFERT -----------------
+TRANSFER_DIR = os.getenv("TRANSFER_DIR", ".")
+TRANSFER_WORKERS = max(1, int(os.getenv("TRANSFER_WORKERS", "4")))
+TRANSFER_RATE = float(os.getenv("TRANSFER_RATE", "1"))  # créations de threads par seconde
+TRANSFER_PROGRESS_INTERVAL = 5  # secondes entre deux mises à jour de la progression
+MESSAGE_MAX_LEN = 2000
+
+class TransferCheckpoint:
+    """
+    Reprise d'un transfert source → cible : une ligne JSON par thread, écrite avant
+    (`en_cours`) et après (`ok`) sa création. Un transfert interrompu reprend sans
+    recréer les threads déjà transférés. En mode historique complet, chaque message
+    copié est aussi enregistré (`message`), puis le thread est marqué `complet`.
+    """
+    def __init__(self, source_id: int, target_id: int, full_history: bool = False):
+        suffix = "_complet" if full_history else ""
+        self.path = os.path.join(TRANSFER_DIR, f"transfer_{source_id}_{target_id}{suffix}.jsonl")
+        self.done = {}          # id thread source -> id thread cible
+        self.pending = {}       # id thread source -> nom, création lancée sans confirmation
+        self.last_message = {}  # id thread source -> dernier message copié
+        self.complete = set()   # threads dont tout l'historique est copié
+        self._lock = threading.Lock()
+
+    def load(self) -> "TransferCheckpoint":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # dernière ligne tronquée par un arrêt brutal
+                    etat = entry.get("etat")
+                    if etat == "ok":
+                        self.done[entry["source"]] = entry["cible"]
+                        self.pending.pop(entry["source"], None)
+                        if entry.get("message"):
+                            self.last_message[entry["source"]] = entry["message"]
+                    elif etat == "en_cours":
+                        self.pending[entry["source"]] = entry["nom"]
+                    elif etat == "message":
+                        self.last_message[entry["source"]] = entry["message"]
+                    elif etat == "complet":
+                        self.complete.add(entry["source"])
+        except FileNotFoundError:
+            pass
+        return self
+
+    def _append(self, entry: dict):
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    async def start(self, thread: discord.Thread):
+        self.pending[thread.id] = thread.name
+        await asyncio.to_thread(self._append, {"source": thread.id, "nom": thread.name, "etat": "en_cours"})
+
+    async def finish(self, thread: discord.Thread, target_id: int, first_message_id: Optional[int] = None):
+        self.done[thread.id] = target_id
+        self.pending.pop(thread.id, None)
+        entry = {"source": thread.id, "cible": target_id, "etat": "ok"}
+        if first_message_id:
+            self.last_message[thread.id] = first_message_id
+            entry["message"] = first_message_id
+        await asyncio.to_thread(self._append, entry)
+
+    async def message_copied(self, thread: discord.Thread, message_id: int):
+        self.last_message[thread.id] = message_id
+        await asyncio.to_thread(self._append, {"source": thread.id, "message": message_id, "etat": "message"})
+
+    async def history_complete(self, thread: discord.Thread):
+        self.complete.add(thread.id)
+        await asyncio.to_thread(self._append, {"source": thread.id, "etat": "complet"})
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def split_message(content: str) -> List[str]:
+    return [content[i:i + MESSAGE_MAX_LEN] for i in range(0, len(content), MESSAGE_MAX_LEN)] or [""]
+
+class ThreadTransfer:
+    """
+    Transfert de threads de forum : TRANSFER_WORKERS threads lus et recréés en
+    parallèle, créations cadencées par un seau à jetons recalé sur les en-têtes
+    de Discord, progression enregistrée dans un TransferCheckpoint. Le journal du
+    transfert est envoyé au fil de l'eau par blocs de 1990 caractères.
+
+    Avec `full_history`, tout l'historique de chaque thread est recopié en flux :
+    les pages d'historique sont lues au fur et à mesure, chaque message est
+    transformé, posté (pièces jointes ré-envoyées depuis la mémoire) puis oublié.
+    La mémoire reste bornée quelle que soit la longueur des threads.
+    """
+    def __init__(self, interaction: discord.Interaction, target_forum: discord.ForumChannel,
+                 existing_tags: dict, checkpoint: TransferCheckpoint, full_history: bool = False):
+        self.interaction = interaction
+        self.target_forum = target_forum
+        self.existing_tags = existing_tags
+        self.checkpoint = checkpoint
+        self.full_history = full_history
+        self.bucket = TokenBucket(TRANSFER_RATE, TRANSFER_WORKERS)
+        self.moved = []
+        self.failed = 0
+        self.resumed = 0
+        self.processed = 0
+        self.messages = 0
+        self.total = 0
+        self._last_progress = time.monotonic()
+        self._log = ""
+        self._log_lock = asyncio.Lock()
+        self._tags_lock = asyncio.Lock()
+
+    async def log(self, entry: str):
+        async with self._log_lock:
+            self._log += entry + "\n"
+            while len(self._log) >= 1990:
+                chunk, self._log = self._log[:1990], self._log[1990:]
+                await reply(self.interaction, f"```{chunk}```")
+
+    async def flush_log(self):
+        async with self._log_lock:
+            if self._log.strip():
+                await reply(self.interaction, f"```{self._log.rstrip()}```")
+            self._log = ""
+
+    async def report_progress(self):
+        # Au plus une mise à jour toutes les TRANSFER_PROGRESS_INTERVAL secondes
+        now = time.monotonic()
+        if now - self._last_progress < TRANSFER_PROGRESS_INTERVAL or self.processed >= self.total:
+            return
+        self._last_progress = now
+        content = f"📦 Transfert en cours… {self.processed}/{self.total} thread(s)"
+        if self.full_history:
+            content += f", {self.messages} message(s) copiés"
+        try:
+            await self.interaction.edit_original_response(content=content)
+        except discord.HTTPException:
+            pass
+
+    async def refresh_tags(self):
+        # Tags pas encore propagés côté Discord : un seul refetch pour tous les workers
+        async with self._tags_lock:
+            await asyncio.sleep(1.5)
+            self.target_forum = await self.interaction.client.fetch_channel(self.target_forum.id)
+            self.existing_tags = {tag.name.lower(): tag for tag in self.target_forum.available_tags}
+
+    async def prepare_message(self, msg: discord.Message) -> Tuple[str, List[discord.File]]:
+        """
+        Contenu et pièces jointes d'un message à recopier. Les fichiers sont lus
+        en mémoire (BytesIO) ; ceux qui dépassent la limite d'envoi du serveur
+        sont remplacés par leur lien.
+        """
+        content = f"**{msg.author.display_name}:** {msg.content}" if msg.content else f"**{msg.author.display_name}:**"
+        guild_obj = getattr(self.target_forum, "guild", None)
+        size_limit = guild_obj.filesize_limit if guild_obj else 10 * 1024 * 1024
+        files = []
+        for attachment in msg.attachments:
+            if attachment.size > size_limit:
+                content += f"\n📎 {attachment.url}"
+                continue
+            data = await attachment.read()
+            files.append(discord.File(io.BytesIO(data), filename=attachment.filename, spoiler=attachment.is_spoiler()))
+        return content, files
+
+    async def create_target_thread(self, thread: discord.Thread, first: Optional[discord.Message]):
+        if not first:
+            first_content = "*Aucun message trouvé*"
+            author_name = "Inconnu"
+        else:
+            first_content = first.content or "*Message vide*"
+            author_name = first.author.display_name
+        content = f"**{author_name}:** {first_content}"
+        files = []
+        if self.full_history and first:
+            content, files = await self.prepare_message(first)
+
+        title = thread.name
+        thread_tags_lower = [tag.name.lower() for tag in thread.applied_tags]
+        chunks = split_message(content)
+
+        await self.checkpoint.start(thread)
+        # --- Retry de création du thread jusqu'à 3 fois ---
+        for attempt in range(3):
+            applied_tags = [self.existing_tags[t] for t in thread_tags_lower if t in self.existing_tags]
+            for f in files:
+                f.reset()
+            await self.bucket.acquire()
+            try:
+                created = await self.target_forum.create_thread(
+                    name=title,
+                    content=chunks[0],
+                    files=files,
+                    applied_tags=applied_tags
+                )
+                break
+            except discord.HTTPException as e:
+                if "Unknown Tag" in str(e) and attempt < 2:
+                    print(f"⚠️ Tentative {attempt+1}/3 échouée pour {title} (tags non propagés). Nouvel essai...")
+                    await self.refresh_tags()
+                    continue
+                raise
+
+        # Suite d'un premier message trop long : postée avant que le checkpoint ne le marque copié
+        for chunk in chunks[1:]:
+            await created.thread.send(chunk)
+        await self.checkpoint.finish(thread, created.thread.id, first.id if first else None)
+        await self.log(
+            f"✅ **{title}**\nAuteur: {author_name}\nTags: {', '.join([t.name for t in applied_tags])}\nMessage: {first_content}\n"
+        )
+        return created.thread
+
+    async def copy_history(self, thread: discord.Thread, target_thread: discord.Thread, after_id: Optional[int]):
+        # Limite d'envoi par salon (5 messages / 5 s), recalée sur les en-têtes de Discord
+        bucket = TokenBucket(1, 5)
+        route = f"/channels/{target_thread.id}/messages"
+        RATE_LIMIT_WATCHERS[route] = bucket
+        copied = 0
+        try:
+            after = discord.Object(id=after_id) if after_id else None
+            async for msg in thread.history(limit=None, after=after, oldest_first=True):
+                if msg.type not in (discord.MessageType.default, discord.MessageType.reply):
+                    continue
+                content, files = await self.prepare_message(msg)
+                chunks = split_message(content)
+                embeds = [embed for embed in msg.embeds if embed.type == "rich"]
+                for i, chunk in enumerate(chunks):
+                    last = i == len(chunks) - 1
+                    await bucket.acquire()
+                    await target_thread.send(chunk, files=files if last else [], embeds=embeds if last else [])
+                del files  # tampons libérés dès l'envoi
+                await self.checkpoint.message_copied(thread, msg.id)
+                copied += 1
+                self.messages += 1
+                await self.report_progress()
+        finally:
+            RATE_LIMIT_WATCHERS.pop(route, None)
+        await self.checkpoint.history_complete(thread)
+        return copied
+
+    async def transfer_one(self, thread: discord.Thread):
+        checkpoint = self.checkpoint
+        if thread.id in checkpoint.done and (not self.full_history or thread.id in checkpoint.complete):
+            self.resumed += 1
+            self.moved.append(thread)
+            return
+
+        messages = [msg async for msg in thread.history(limit=1, oldest_first=True)]
+        first = messages[0] if messages else None
+
+        target_thread = None
+        if thread.id in checkpoint.done:
+            # Historique interrompu : le thread cible existe déjà
+            target_thread = self.target_forum.get_thread(checkpoint.done[thread.id]) \
+                or await self.interaction.client.fetch_channel(checkpoint.done[thread.id])
+            self.resumed += 1
+        elif thread.id in checkpoint.pending:
+            # Interrompu entre la création et sa confirmation : le thread existe peut-être déjà
+            target_thread = next((t for t in self.target_forum.threads if t.name == thread.name), None)
+            if target_thread:
+                await checkpoint.finish(thread, target_thread.id, first.id if first else None)
+                self.resumed += 1
+
+        if target_thread is None:
+            target_thread = await self.create_target_thread(thread, first)
+
+        if self.full_history:
+            after_id = checkpoint.last_message.get(thread.id) or (first.id if first else None)
+            copied = await self.copy_history(thread, target_thread, after_id)
+            await self.log(f"📜 **{thread.name}** — {copied} message(s) recopié(s)")
+
+        self.moved.append(thread)
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            try:
+                thread = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await self.transfer_one(thread)
+            except Exception as e:
+                self.failed += 1
+                await self.log(f"❌ **{thread.name}** — Erreur: {e}")
+            self.processed += 1
+            await self.report_progress()
+
+    async def run(self, threads: list):
+        self.total = len(threads)
+        queue = asyncio.Queue()
+        for thread in threads:
+            queue.put_nowait(thread)
+        # Les créations vers le forum cible alimentent le seau avec les en-têtes de Discord
+        route = f"/channels/{self.target_forum.id}/threads"
+        RATE_LIMIT_WATCHERS[route] = self.bucket
+        try:
+            await asyncio.gather(*(self._worker(queue) for _ in range(min(TRANSFER_WORKERS, self.total))))
+        finally:
+            RATE_LIMIT_WATCHERS.pop(route, None)
+        await self.flush_log()
+
 # ----------------- Transfert thread -----------------
 @tree.command(
     name="transfer_threads",
     description="Transférer tous les threads d'un ou plusieurs tags vers un nouveau forum",
-    guild=guild
+    guilds=GUILDS
 )
 @app_commands.describe(
     tags="Liste des tags à filtrer, séparés par des virgules",
-    target_forum="ID du forum de destination"
+    target_forum="ID du forum de destination",
+    historique_complet="Recopier tous les messages des threads, pièces jointes comprises"
 )
 @admin_only()
-async def transfer_threads(interaction: discord.Interaction, tags: str, target_forum: str):
-    await interaction.response.send_message("Préparation du transfert en cours… ⏳", ephemeral=True)
+@instrumented(ephemeral=True)
+async def transfer_threads(interaction: discord.Interaction, tags: str, target_forum: str,
+                           historique_complet: bool = False):
+    await reply(interaction, "Préparation du transfert en cours… ⏳", ephemeral=True)
 
     tags_list = [t.strip() for t in tags.split(",") if t.strip()]
     tags_lower = [t.lower() for t in tags_list]
 
     if len(tags_list) > 20:
-        await interaction.followup.send("❌ Impossible : plus de 20 tags spécifiés.", ephemeral=True)
+        await reply(interaction, "❌ Impossible : plus de 20 tags spécifiés.", ephemeral=True)
         return
 
     # Vérifier forum cible
@@ -1100,14 +3681,14 @@ async def transfer_threads(interaction: discord.Interaction, tags: str, target_f
         if not isinstance(target_forum, discord.ForumChannel):
             raise ValueError
     except Exception:
-        await interaction.followup.send("❌ Forum de destination invalide.", ephemeral=True)
+        await reply(interaction, "❌ Forum de destination invalide.", ephemeral=True)
         return
 
     # Déterminer le forum source
     thread = interaction.channel
     source_forum = thread.parent if isinstance(thread, discord.Thread) else thread
     if not isinstance(source_forum, discord.ForumChannel):
-        await interaction.followup.send(
+        await reply(interaction, 
             "❌ Cette commande doit être exécutée dans un forum ou un thread d’un forum.",
             ephemeral=True
         )
@@ -1130,7 +3711,7 @@ async def transfer_threads(interaction: discord.Interaction, tags: str, target_f
         if any(tag.name.lower() in tags_lower for tag in t.applied_tags)
     ]
     if not all_threads:
-        await interaction.followup.send("❌ Aucun thread ne correspond aux tags donnés.", ephemeral=True)
+        await reply(interaction, "❌ Aucun thread ne correspond aux tags donnés.", ephemeral=True)
         return
 
     # --- ÉTAPE 3 : Collecte de tous les tags utilisés ---
@@ -1150,106 +3731,68 @@ async def transfer_threads(interaction: discord.Interaction, tags: str, target_f
     missing_tags = [lower for lower in all_used_tags if lower not in existing_tags]
 
     if len(existing_tags) + len(missing_tags) > 20:
-        await interaction.followup.send(
+        await reply(interaction, 
             f"❌ Trop de tags à créer ({len(existing_tags)} existants + {len(missing_tags)} nouveaux). "
             "Discord limite à 20 tags par forum.",
             ephemeral=True
         )
         return
 
-    for lower_name in missing_tags:
-        display_name = all_used_tags[lower_name]
+    if missing_tags:
+        # Une seule modification du forum pour tous les tags (create_tag repart de la
+        # liste en cache et écraserait les tags créés juste avant)
+        new_tags = [discord.ForumTag(name=all_used_tags[lower], moderated=False) for lower in missing_tags]
         try:
-            await target_forum.create_tag(name=display_name, moderated=False)
-            print(f"✅ Tag créé : {display_name}")
-            # ⏳ Attente courte pour éviter les pertes de tags
-            await asyncio.sleep(1)
-            # 🔁 Refetch pour s’assurer que le tag est bien enregistré avant le suivant
-            target_forum = await interaction.client.fetch_channel(target_forum.id)
+            edited = await target_forum.edit(available_tags=list(target_forum.available_tags) + new_tags)
+            target_forum = edited or await interaction.client.fetch_channel(target_forum.id)
         except Exception as e:
-            await interaction.followup.send(f"❌ Impossible de créer le tag **{display_name}** : {e}", ephemeral=True)
+            names = ", ".join(tag.name for tag in new_tags)
+            await reply(interaction, f"❌ Impossible de créer les tags **{names}** : {e}", ephemeral=True)
             return
-
-    # Dernier refetch pour la liste complète et synchronisée
-    target_forum = await interaction.client.fetch_channel(target_forum.id)
-    existing_tags = {tag.name.lower(): tag for tag in target_forum.available_tags}
-
-    # --- ÉTAPE 5 : Transfert des threads (avec retry automatique - option 3) ---
-    transfer_log = []
-    moved_threads = []
-    all_success = True
-
-    for thread in all_threads:
-        try:
-            messages = [msg async for msg in thread.history(limit=1, oldest_first=True)]
-            if not messages:
-                first_content = "*Aucun message trouvé*"
-                author_name = "Inconnu"
-            else:
-                first = messages[0]
-                first_content = first.content or "*Message vide*"
-                author_name = first.author.display_name
-
-            title = thread.name
-            thread_tags_lower = [tag.name.lower() for tag in thread.applied_tags]
-            applied_tags = [existing_tags[t] for t in thread_tags_lower if t in existing_tags]
-
-            # --- Retry de création du thread jusqu'à 3 fois ---
-            success = False
-            for attempt in range(3):
-                try:
-                    await target_forum.create_thread(
-                        name=title,
-                        content=f"**{author_name}:** {first_content}",
-                        applied_tags=applied_tags
-                    )
-                    success = True
-                    break
-                except discord.HTTPException as e:
-                    if "Unknown Tag" in str(e) and attempt < 2:
-                        print(f"⚠️ Tentative {attempt+1}/3 échouée pour {title} (tags non propagés). Nouvel essai...")
-                        await asyncio.sleep(1.5)
-                        target_forum = await interaction.client.fetch_channel(target_forum.id)
-                        existing_tags = {tag.name.lower(): tag for tag in target_forum.available_tags}
-                        applied_tags = [existing_tags[t] for t in thread_tags_lower if t in existing_tags]
-                        continue
-                    else:
-                        raise
-
-            if not success:
-                raise RuntimeError("Impossible de créer le thread après 3 tentatives")
-
-            moved_threads.append(thread)
-            transfer_log.append(
-                f"✅ **{title}**\nAuteur: {author_name}\nTags: {', '.join([t.name for t in applied_tags])}\nMessage: {first_content}\n"
-            )
-
-        except Exception as e:
-            all_success = False
-            transfer_log.append(f"❌ **{thread.name}** — Erreur: {e}")
-            continue
-
-    # --- ÉTAPE 6 : Affichage du résumé ---
-    transfer_summary = "\n".join(transfer_log)
-    for i in range(0, len(transfer_summary), 1990):
-        await interaction.followup.send(f"```{transfer_summary[i:i+1990]}```")
+        existing_tags = {tag.name.lower(): tag for tag in target_forum.available_tags}
+        print(f"✅ Tags créés : {', '.join(tag.name for tag in new_tags)}")
+
+    # --- ÉTAPE 5 : Transfert des threads (parallèle, cadencé, avec reprise) ---
+    checkpoint = TransferCheckpoint(source_forum.id, target_forum.id, historique_complet).load()
+    if checkpoint.done or checkpoint.pending:
+        await reply(interaction, 
+            f"♻️ Reprise d'un transfert interrompu : {len(checkpoint.done)} thread(s) déjà transféré(s).",
+            ephemeral=True
+        )
+    transfer = ThreadTransfer(interaction, target_forum, existing_tags, checkpoint, historique_complet)
+    await transfer.run(all_threads)
+
+    # --- ÉTAPE 6 : Résumé ---
+    await interaction.edit_original_response(
+        content=f"📦 Transfert terminé : {len(transfer.moved)}/{len(all_threads)} thread(s) "
+                f"(dont {transfer.resumed} repris), {transfer.failed} échec(s)."
+                + (f" {transfer.messages} message(s) recopié(s)." if historique_complet else "")
+    )
 
     # --- ÉTAPE 7 : Suppression des threads d'origine si tout est réussi ---
-    if all_success and moved_threads:
-        await interaction.followup.send("✅ Tous les threads ont été transférés avec succès. Suppression en cours…", ephemeral=True)
-        for thread in moved_threads:
+    if not transfer.failed and transfer.moved:
+        await reply(interaction, "✅ Tous les threads ont été transférés avec succès. Suppression en cours…", ephemeral=True)
+        deleted_all = True
+        for thread in transfer.moved:
             try:
                 await thread.delete()
             except Exception as e:
+                deleted_all = False
                 print(f"Erreur suppression {thread.name}:", e)
+        if deleted_all:
+            checkpoint.clear()
     else:
-        await interaction.followup.send("⚠️ Certains threads ont échoué. Aucun thread source n’a été supprimé.", ephemeral=True)
+        await reply(interaction, 
+            "⚠️ Certains threads ont échoué. Aucun thread source n’a été supprimé. "
+            "Relancez la commande pour reprendre le transfert.",
+            ephemeral=True
+        )
 
 # ----------------- LISTE DES SYSTÈMES Actifs-----------------
 @tree.command(
     name="liste_sys",
     description="Liste les systèmes actifs d'un secteur",
-    guild=guild
+    guilds=GUILDS
 )
 @app_commands.describe(
     affichage="Choisir l'affichage des systèmes"
@@ -1260,20 +3803,22 @@ async def transfer_threads(interaction: discord.Interaction, tags: str, target_f
         app_commands.Choice(name="Actifs/Inactifs", value=1)
     ]
 )
+@instrumented()
 async def liste_sys(
     interaction: discord.Interaction, 
     affichage: Optional[app_commands.Choice[int]] = None):
 
+    campaign = interaction.extras["campaign"]
     # Par défaut, ActifSeul
     inactifs = bool(affichage.value) if affichage else False
 
     # Secteur actif
-    secteur_nom = list(ACTIVE_SYSTEMS.keys())[0]
+    secteur_nom = list(campaign.active_systems.keys())[0]
 
     # Filtrer les sous-secteurs
     sous_secteurs_actifs = {
         ss: {s: a for s, a in systemes.items() if a or inactifs}
-        for ss, systemes in ACTIVE_SYSTEMS[secteur_nom].items()
+        for ss, systemes in campaign.active_systems[secteur_nom].items()
     }
     # Supprimer les sous-secteurs vides
     sous_secteurs_actifs = {ss: sys for ss, sys in sous_secteurs_actifs.items() if sys}
@@ -1288,7 +3833,7 @@ async def liste_sys(
                 etat = "🟢 actif" if actif else "🔴 inactif"
                 message += f" 🪐 {systeme} ({etat})\n"
             message += "\n"
-        await interaction.response.send_message(message)
+        await reply(interaction, message)
         return
 
     # Cas normal : un seul sous-secteur
@@ -1301,58 +3846,92 @@ async def liste_sys(
         etat = "🟢 actif" if actif else "🔴 inactif"
         message += f" 🪐 {systeme} ({etat})\n"
 
-    await interaction.response.send_message(message)
+    await reply(interaction, message)
 
 # --- Commande activer ---
 @tree.command(
     name="activer_sys",
     description="Activer un système",
-    guild=guild
+    guilds=GUILDS
 )
 @app_commands.describe(
     systeme="Nom du système à activer"
 )
 @app_commands.autocomplete(systeme=completer_activer)
 @admin_only()
+@instrumented()
 async def activer_sys(interaction: discord.Interaction, systeme: str):
-    secteur_nom = list(ACTIVE_SYSTEMS.keys())[0]
-    for ss, systemes in ACTIVE_SYSTEMS[secteur_nom].items():
-        if systeme in systemes:
-            if systemes[systeme]:
-                await interaction.response.send_message(f"🟢 Le système **{systeme}** est déjà activé.")
-            else:
-                systemes[systeme] = True
-                await interaction.response.send_message(f"🟢 Le système **{systeme}** a été activé dans le sous-secteur **{ss}**.")
-            return
-    await interaction.response.send_message(f"❌ Le système **{systeme}** n'a pas été trouvé dans le secteur {secteur_nom}.")
+    campaign = interaction.extras["campaign"]
+    try:
+        ss = await campaign.writer.submit("activation", {"systeme": systeme, "actif": True})
+    except MutationError as e:
+        await reply(interaction, str(e), ephemeral=e.ephemeral)
+        return
+    await reply(interaction, f"🟢 Le système **{systeme}** a été activé dans le sous-secteur **{ss}**.")
 
 # --- Commande désactiver ---
 @tree.command(
     name="desactiver_sys",
     description="Désactiver un système",
-    guild=guild
+    guilds=GUILDS
 )
 @app_commands.describe(
     systeme="Nom du système à désactiver"
 )
 @app_commands.autocomplete(systeme=completer_desactiver)
 @admin_only()
+@instrumented()
 async def desactiver_sys(interaction: discord.Interaction, systeme: str):
-    secteur_nom = list(ACTIVE_SYSTEMS.keys())[0]
-    for ss, systemes in ACTIVE_SYSTEMS[secteur_nom].items():
-        if systeme in systemes:
-            if not systemes[systeme]:
-                await interaction.response.send_message(f"🔴 Le système **{systeme}** est déjà désactivé.")
-            else:
-                systemes[systeme] = False
-                await interaction.response.send_message(f"🔴 Le système **{systeme}** a été désactivé dans le sous-secteur **{ss}**.")
-            return
-    await interaction.response.send_message(f"❌ Le système **{systeme}** n'a pas été trouvé dans le secteur {secteur_nom}.")
+    campaign = interaction.extras["campaign"]
+    try:
+        ss = await campaign.writer.submit("activation", {"systeme": systeme, "actif": False})
+    except MutationError as e:
+        await reply(interaction, str(e), ephemeral=e.ephemeral)
+        return
+    await reply(interaction, f"🔴 Le système **{systeme}** a été désactivé dans le sous-secteur **{ss}**.")
+
+# ----------------- DIAGNOSTIC -----------------
+def format_ms(seconds: Optional[float]) -> str:
+    return "—" if seconds is None else f"{seconds * 1000:.1f} ms"
+
+@tree.command(
+    name="diag",
+    description="Afficher les latences et erreurs des commandes depuis le démarrage",
+    guilds=GUILDS
+)
+@admin_only()
+@instrumented(ephemeral=True)
+async def diag(interaction: discord.Interaction):
+    if not METRICS.commands:
+        await reply(interaction, "Aucune commande mesurée pour l'instant.", ephemeral=True)
+        return
+    ranked = sorted(
+        METRICS.commands.items(),
+        key=lambda item: item[1].latency.percentile(0.95) or 0,
+        reverse=True
+    )
+    uptime = int(time.time() - METRICS.started)
+    lines = [f"📈 **Diagnostic** — depuis {uptime // 3600} h {uptime % 3600 // 60:02d} min"]
+    for name, m in ranked:
+        lat = m.latency
+        line = (f"`/{name}` ×{m.calls} — p50 {format_ms(lat.percentile(0.50))} · "
+                f"p95 {format_ms(lat.percentile(0.95))} · p99 {format_ms(lat.percentile(0.99))} · "
+                f"1re réponse p95 {format_ms(m.first_response.percentile(0.95))}")
+        if m.errors:
+            line += f" · ❌ {m.errors} erreur(s)"
+        if m.deferred:
+            line += f" · ⏳ {m.deferred} defer"
+        if m.late:
+            line += f" · ⚠️ {m.late} hors délai"
+        lines.append(line)
+    for chunk in chunk_lines(lines):
+        await reply(interaction, chunk, ephemeral=True)
 
 # ----------------- HELP -----------------
 @tree.command(name="h",
               description="Afficher la liste complète des commandes disponibles",
-              guild=guild)
+              guilds=GUILDS)
+@instrumented()
 async def h(interaction: discord.Interaction):
     embed = discord.Embed(
         title="📘 Commandes disponibles du Bot Galactique",
@@ -1407,6 +3986,13 @@ async def h(interaction: discord.Interaction):
         inline=False
     )
 
+    # --- Diagnostic ---
+    embed.add_field(
+        name="📈 Diagnostic",
+        value="🟣 **`/diag`** — Latences (p50/p95/p99), erreurs et defer par commande depuis le démarrage.",
+        inline=False
+    )
+
     # --- Divers ---
     embed.add_field(
         name="ℹ️ Divers",
@@ -1420,28 +4006,63 @@ async def h(interaction: discord.Interaction):
         icon_url="https://cdn-icons-png.flaticon.com/512/4712/4712109.png"
     )
 
-    await interaction.response.send_message(embed=embed)
+    await reply(interaction, embed=embed)
 
 # ----------------- EVENT -----------------
 @bot.event
 async def on_ready():
     print(f"✅ Connecté en tant que {bot.user}")
+    if not STARTUP.reported:
+        STARTUP.step("passerelle")
+
+    await sync_commands()
+    if not STARTUP.reported:
+        STARTUP.step("slash commands")
+        STARTUP.report()
+
+    # Rafraîchissement de l'index des honneurs : aussi après une reconnexion complète,
+    # pour rattraper les événements de thread manqués
+    HONNEUR_INDEX.start_build()
+
+@bot.event
+async def on_thread_create(thread: discord.Thread):
+    HONNEUR_INDEX.upsert(thread)
+
+@bot.event
+async def on_thread_update(before: discord.Thread, after: discord.Thread):
+    HONNEUR_INDEX.upsert(after)
 
-    # Synchroniser les commandes pour le serveur
+@bot.event
+async def on_raw_thread_update(payload: discord.RawThreadUpdateEvent):
+    # Threads archivés hors cache : on_thread_update n'est pas émis
+    if payload.thread is not None or payload.parent_id not in FORUM_IDS:
+        return
     try:
-        guild_obj = discord.Object(id=GUILD_ID)
-        await bot.tree.sync(guild=guild_obj)
-        print(f"🌍 Slash commands synchronisées sur le serveur {GUILD_ID}")
-    except Exception as e:
-        print(f"❌ Erreur lors de la synchronisation des commandes : {e}")
+        HONNEUR_INDEX.upsert(await bot.fetch_channel(payload.thread_id))
+    except discord.HTTPException as e:
+        print(f"⚠️ Thread {payload.thread_id} illisible : {e}")
+
+@bot.event
+async def on_raw_thread_delete(payload: discord.RawThreadDeleteEvent):
+    # Version brute de on_thread_delete : couvre aussi les threads hors cache
+    HONNEUR_INDEX.remove(payload.thread_id)
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    if isinstance(after, discord.ForumChannel) and after.id in FORUM_IDS:
+        HONNEUR_INDEX.retag_forum(after)
 
 
 # ----------------- RUN BOT -----------------
-token = os.getenv("DISCORD_BOT_TOKEN")
-if not token:
-    print("❌ DISCORD_BOT_TOKEN not found in environment variables!")
-    exit(1)
-
-load_data()
-start_data_watch(DATA_FILE, load_data) #démarrage de la surveillance
-bot.run(token)
+# Import sans effet de bord (bench.py) : le bot ne démarre qu'en exécution directe
+if __name__ == "__main__":
+    token = os.getenv("DISCORD_BOT_TOKEN")
+    if not token:
+        print("❌ DISCORD_BOT_TOKEN not found in environment variables!")
+        exit(1)
+    if not GUILD_IDS:
+        print("❌ GUILD_ID (ou GUILD_IDS) manquant : aucune commande ne serait enregistrée")
+        exit(1)
+
+    STARTUP.step("import")
+    bot.run(token)
@@ -0,0 +1,104 @@
+"""
+Fixtures communes : main.py importé hors-ligne (pas de jeton, pas de connexion)
+et une campagne fraîche par test, chargée depuis une copie de data.json dans un
+répertoire temporaire.
+"""
+import asyncio
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GUILD_ID", "1")
+os.environ.setdefault("STORAGE_BACKEND", "json")
+sys.path.insert(0, ROOT)
+
+import main  # noqa: E402
+
+@pytest.fixture
+def make_campaign(tmp_path, monkeypatch):
+    """Fabrique de campagnes : make_campaign(backend="json", data=None)."""
+    monkeypatch.chdir(tmp_path)
+    opened = []
+
+    def make(backend: str = "json", data: dict = None):
+        monkeypatch.setattr(main, "STORAGE_BACKEND", backend)
+        if data is None:
+            shutil.copy(os.path.join(ROOT, "data.json"), tmp_path / "data.json")
+        else:
+            main.write_json_atomic(str(tmp_path / "data.json"), data)
+        campaign = main.Campaign(1, "")
+        opened.append(campaign)
+        main.load_data(campaign)
+        return campaign
+
+    yield make
+    for campaign in reversed(opened):
+        campaign.unload()
+
+@pytest.fixture
+def campaign(make_campaign):
+    return make_campaign()
+
+def run(coro):
+    return asyncio.run(coro)
+
+def bataille(planete: str, gagnant: str = "Envahisseur", phase=None) -> dict:
+    """Événement « bataille » Envahisseur contre Défenseur, tel que /ajout le construit."""
+    return {
+        "planete": planete,
+        "gagnant": gagnant,
+        "choix_planete": "Envahisseur",
+        "participants": ["Envahisseur", "Défenseur"],
+        "phase": phase
+    }
+
+def active_planets(campaign) -> list:
+    """Planètes des systèmes actifs (jamais en sommeil)."""
+    return [
+        planete
+        for secteur, sous_secteurs in campaign.active_systems.items()
+        for ss, systemes in sous_secteurs.items()
+        for systeme, actif in systemes.items() if actif
+        for planete in campaign.sectors[secteur][ss][systeme]
+    ]
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """CAMPAIGNS vide, campagnes lues dans tmp_path ; serveur 2 dans campagnes/2."""
+    monkeypatch.chdir(tmp_path)
+    shutil.copy(os.path.join(ROOT, "data.json"), tmp_path / "data.json")
+    os.makedirs(tmp_path / main.CAMPAIGN_DIR / "2")
+    shutil.copy(os.path.join(ROOT, "data.json"), tmp_path / main.CAMPAIGN_DIR / "2" / "data.json")
+    campaigns = main.CampaignRegistry()
+    monkeypatch.setattr(main, "CAMPAIGNS", campaigns)
+    monkeypatch.setattr(main, "GUILD_IDS", [1, 2])
+    yield campaigns
+    for campaign in campaigns.campaigns.values():
+        campaign.unload()
+
+def random_events(campaign, rng, count: int) -> list:
+    """Suite aléatoire de batailles et de modifications sur les planètes actives."""
+    planetes = active_planets(campaign)
+    events = []
+    for _ in range(count):
+        planete = rng.choice(planetes)
+        if rng.random() < 0.7:
+            participants = rng.sample(main.FACTIONS, rng.choice([2, 3]))
+            events.append(("bataille", {
+                "planete": planete,
+                "gagnant": rng.choice(participants + ["Egalite"]),
+                "choix_planete": rng.choice(participants),
+                "participants": participants,
+                "phase": None
+            }))
+        else:
+            events.append(("modif", {
+                "planete": planete,
+                "faction": rng.choice(main.FACTIONS),
+                "points": rng.choice([None, rng.randint(0, 12)]),
+                "batailles": rng.choice([None, rng.randint(0, 5)])
+            }))
+    return events
@@ -0,0 +1,67 @@
+import random
+
+import discord
+
+import main
+
+def embed_chars(embed: discord.Embed) -> int:
+    return (len(embed.title or "") + len(embed.description or "") + len(embed.footer.text or "")
+            + sum(len(field.name) + len(field.value) for field in embed.fields))
+
+def all_pages(pager: main.EmbedPager) -> list:
+    pages = [pager.page(0)]
+    while pager.has_next(len(pages) - 1):
+        pages.append(pager.page(len(pages)))
+    return pages
+
+def check_limits(pages: list):
+    for embeds in pages:
+        assert 1 <= len(embeds) <= main.MESSAGE_MAX_EMBEDS
+        assert sum(embed_chars(embed) for embed in embeds) <= main.MESSAGE_MAX_CHARS
+        for embed in embeds:
+            assert len(embed.fields) <= main.EMBED_MAX_FIELDS
+            for field in embed.fields:
+                assert len(field.name) <= main.EMBED_MAX_FIELD_NAME
+                assert len(field.value) <= main.EMBED_MAX_FIELD_VALUE
+
+def synthetic_blocks(rng) -> dict:
+    blocks = {}
+    for key in range(120):
+        size = rng.choice([1, 2, 5, 24, 30, 60])
+        blocks[key] = [
+            (f"Système {key}" * rng.choice([1, 40]) if i == 0 else "",
+             "x" * rng.choice([10, 300, 1024, 1500]))
+            for i in range(size)
+        ]
+    return blocks
+
+def test_pages_respect_discord_limits_and_keep_every_field_in_order():
+    blocks = synthetic_blocks(random.Random(24))
+    pager = main.EmbedPager("Titre", discord.Color.green(), list(blocks), blocks.__getitem__, "vide")
+    pages = all_pages(pager)
+    assert len(pages) > 1
+    check_limits(pages)
+
+    shown = [(f.name, f.value) for embeds in pages for embed in embeds for f in embed.fields]
+    expected = [
+        (main.clip(name, main.EMBED_MAX_FIELD_NAME), main.clip(value, main.EMBED_MAX_FIELD_VALUE))
+        for key in blocks for name, value in blocks[key]
+    ]
+    assert shown == expected
+
+def test_small_blocks_are_never_split_across_embeds():
+    blocks = {key: [(f"S{key}", "y" * 200), ("", "z" * 200)] for key in range(60)}
+    pager = main.EmbedPager("Titre", discord.Color.green(), list(blocks), blocks.__getitem__, "vide")
+    for embeds in all_pages(pager):
+        for embed in embeds:
+            names = [field.name for field in embed.fields]
+            assert names[0].startswith("S") and names[-1] == ""
+
+def test_empty_pager_shows_placeholder():
+    pager = main.EmbedPager("Titre", discord.Color.green(), [], lambda key: [], "❌ rien")
+    (embed,), = all_pages(pager)
+    assert embed.description == "❌ rien"
+    assert not pager.has_next(0)
+
+def test_stats_pages_fit(campaign):
+    check_limits(all_pages(main.stats_pager(campaign)))
@@ -0,0 +1,34 @@
+import pytest
+
+import main
+from conftest import active_planets, bataille, run
+
+def test_past_phase_battle_goes_to_current_sub_sector_history(campaign):
+    sous_secteur = campaign.current_phase["sous_secteur"]
+    before = main.copy_json(campaign.phases_history[sous_secteur]["2"])
+
+    run(campaign.writer.submit("bataille", bataille(active_planets(campaign)[0], phase=2)))
+
+    after = campaign.phases_history[sous_secteur]["2"]
+    assert after["total_parties"]["Envahisseur"] == before["total_parties"]["Envahisseur"] + 1
+    assert after["total_parties"]["Défenseur"] == before["total_parties"]["Défenseur"] + 1
+    assert after["choix_planete"]["Envahisseur"] == before["choix_planete"]["Envahisseur"] + 1
+    assert set(campaign.phases_history) == {sous_secteur}
+
+def test_past_phase_battle_survives_sqlite_round_trip(make_campaign):
+    campaign = make_campaign("sqlite")
+    run(campaign.writer.submit("bataille", bataille(active_planets(campaign)[0], phase=1)))
+    expected = main.copy_json(campaign.phases_history)
+    main.save_data(campaign)
+    main.load_data(campaign)
+    assert main.copy_json(campaign.phases_history) == expected
+
+def test_battle_outside_played_phases_is_rejected(campaign):
+    history = main.copy_json(campaign.phases_history)
+    current = campaign.current_phase["phase"]
+    for phase in (0, current + 1, 15):
+        with pytest.raises(main.MutationError):
+            run(campaign.writer.submit("bataille", bataille(active_planets(campaign)[0], phase=phase)))
+    assert main.copy_json(campaign.phases_history) == history
+    assert main.local_phase(campaign, campaign.current_phase["sous_secteur"]) == current
+    assert campaign.journal.seq == 0
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+import main
+from conftest import random_events, run
+
+def reports(totals: main.FactionTotals) -> dict:
+    return {f: totals.report(f) for f in main.FACTIONS}
+
+def rebuilt_reports(campaign) -> dict:
+    totals = main.FactionTotals(campaign)
+    totals.rebuild()
+    return reports(totals)
+
+def next_sous_secteur(campaign, rng) -> str:
+    secteur = campaign.current_phase["secteur"]
+    if main.local_phase(campaign, campaign.current_phase["sous_secteur"]) % 3:
+        return None
+    return rng.choice([ss for ss in campaign.sectors[secteur] if ss != campaign.current_phase["sous_secteur"]])
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_totals_match_full_rebuild(make_campaign, backend):
+    campaign = make_campaign(backend)
+    campaign.persister.delay = 60
+    rng = random.Random(25)
+
+    async def scenario():
+        for _ in range(4):
+            events = random_events(campaign, rng, 60)
+            for kind, data in events:
+                if kind == "bataille" and rng.random() < 0.2:
+                    data["phase"] = rng.randint(1, campaign.current_phase["phase"])  # phase passée ou courante
+                await campaign.writer.submit(kind, data)
+                assert reports(campaign.faction_totals) == rebuilt_reports(campaign)
+            await campaign.writer.submit("cloture", {"nouveau_sous_secteur": next_sous_secteur(campaign, rng)})
+            assert reports(campaign.faction_totals) == rebuilt_reports(campaign)
+
+    run(scenario())
+    expected = reports(campaign.faction_totals)
+    main.load_data(campaign)  # rejeu du journal depuis l'état initial
+    assert reports(campaign.faction_totals) == expected
@@ -0,0 +1,14 @@
+import pytest
+
+from generate_campaign import PHASES_PAR_SOUS_SECTEUR, generate_campaign
+
+@pytest.mark.parametrize("phases", range(0, 3 * PHASES_PAR_SOUS_SECTEUR + 3))
+def test_local_phases_never_exceed_three(phases):
+    campaign = generate_campaign(sous_secteurs=3, systemes=2, planetes=2, phases=phases, batailles=1)
+    for history in campaign["phases_history"].values():
+        assert set(history) <= {str(p) for p in range(1, PHASES_PAR_SOUS_SECTEUR + 1)}
+    assert 1 <= campaign["phase_courante"]["phase"] <= PHASES_PAR_SOUS_SECTEUR
+
+def test_generated_campaign_loads(make_campaign):
+    campaign = make_campaign(data=generate_campaign(sous_secteurs=4, phases=7, batailles=1))
+    assert campaign.current_phase["phase"] == 2
@@ -0,0 +1,50 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import main
+from conftest import run
+
+def forum_thread(thread_id: int, forum_id: int, *tags: str):
+    return SimpleNamespace(
+        id=thread_id, name=f"Post {thread_id}", guild=SimpleNamespace(id=1), parent_id=forum_id,
+        applied_tags=[SimpleNamespace(id=i, name=tag) for i, tag in enumerate(tags)],
+        archived=False, archive_timestamp=None
+    )
+
+def test_thread_events_reach_the_cache_without_close(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "THREAD_CACHE_FILE", str(tmp_path / "threads_cache.json"))
+    monkeypatch.setattr(main, "THREAD_CACHE_SAVE_DELAY", 0.01)
+    monkeypatch.setattr(main, "FORUM_IDS", [5])
+    index = main.ThreadTagIndex()
+    index.saved_at = datetime.now(timezone.utc).isoformat()
+
+    async def scenario():
+        index.upsert(forum_thread(1, 5, "Fairplay"))
+        index.upsert(forum_thread(2, 5, "Peinture"))
+        await asyncio.sleep(0.05)
+        index.remove(2)
+        await asyncio.sleep(0.05)
+
+    run(scenario())
+
+    # Arrêt brutal : aucun close(), le cache relu doit refléter les événements
+    reloaded = main.ThreadTagIndex()
+    reloaded.load_cache()
+    assert not index.dirty
+    assert set(reloaded.threads) == {1}
+    assert [entry["id"] for entry in reloaded.match(["fairplay"])] == [1]
+
+def test_refresh_index_does_not_schedule_saves(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "THREAD_CACHE_FILE", str(tmp_path / "threads_cache.json"))
+    monkeypatch.setattr(main, "THREAD_CACHE_SAVE_DELAY", 0)
+    monkeypatch.setattr(main, "FORUM_IDS", [5])
+
+    async def scenario():
+        fresh = main.ThreadTagIndex()
+        fresh.upsert(forum_thread(1, 5, "Fairplay"))
+        await asyncio.sleep(0.01)
+        return fresh
+
+    assert run(scenario())._save_task is None
+    assert not (tmp_path / "threads_cache.json").exists()
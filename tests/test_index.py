@@ -0,0 +1,70 @@
+import json
+import random
+
+import pytest
+
+import main
+from conftest import bataille, random_events, run
+from test_faction_totals import next_sous_secteur
+
+def linear_scan(campaign) -> tuple:
+    """Planètes et systèmes trouvés en parcourant campaign.sectors (première occurrence)."""
+    planets, systems = {}, {}
+    for secteur, sous_secteurs in campaign.sectors.items():
+        for ss in list(sous_secteurs):
+            main.ensure_sub_sector(campaign, secteur, ss)
+            for systeme, planetes in campaign.sectors[secteur][ss].items():
+                systems.setdefault(systeme, planetes)
+                for planete, data in planetes.items():
+                    planets.setdefault(planete, ((secteur, ss, systeme, planete), data))
+    return planets, systems
+
+def assert_index_matches_scan(campaign):
+    planets, systems = linear_scan(campaign)
+    assert sorted(main.all_planets(campaign)) == sorted(planets)
+    assert sorted(main.all_systems(campaign)) == sorted(systems)
+    for planete, (path, data) in planets.items():
+        assert main.find_planet(campaign, planete) == path
+        assert main.get_planet_data(campaign, planete) is data
+    for systeme, planetes in systems.items():
+        assert main.get_system_planets(campaign, systeme) is planetes
+    assert main.find_planet(campaign, "Planète inconnue") is None
+    assert main.get_system_planets(campaign, "Système inconnu") is None
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_lookups_match_scan_after_cloture(make_campaign, backend):
+    campaign = make_campaign(backend)
+    campaign.persister.delay = 60
+    rng = random.Random(1)
+    assert_index_matches_scan(campaign)
+
+    async def scenario():
+        for _ in range(7):
+            for kind, data in random_events(campaign, rng, 5):
+                await campaign.writer.submit(kind, data)
+            await campaign.writer.submit("cloture", {"nouveau_sous_secteur": next_sous_secteur(campaign, rng)})
+            assert_index_matches_scan(campaign)
+
+    run(scenario())
+
+def test_lookups_match_scan_after_external_reload(campaign):
+    with open(campaign.store.path, encoding="utf-8") as f:
+        edited = json.load(f)
+    secteur = next(iter(edited["sectors"]))
+    ss = next(iter(edited["sectors"][secteur]))
+    systeme = next(iter(edited["sectors"][secteur][ss]))
+    planetes = edited["sectors"][secteur][ss][systeme]
+    ancienne = next(iter(planetes))
+    # L'opérateur renomme une planète et ajoute un système
+    planetes["Planète renommée"] = planetes.pop(ancienne)
+    stats = json.loads(json.dumps(planetes["Planète renommée"]))
+    edited["sectors"][secteur][ss]["Système ajouté"] = {"Planète ajoutée": stats}
+    digest = main.write_json_atomic(campaign.store.path, edited)
+
+    run(main.apply_external_reload(campaign, edited, digest))
+    assert_index_matches_scan(campaign)
+    assert main.find_planet(campaign, ancienne) is None
+    assert main.find_planet(campaign, "Planète ajoutée") == (secteur, ss, "Système ajouté", "Planète ajoutée")
+
+    run(campaign.writer.submit("bataille", bataille("Planète renommée")))
+    assert_index_matches_scan(campaign)
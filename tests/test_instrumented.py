@@ -0,0 +1,33 @@
+import asyncio
+
+import main
+from conftest import run
+from fakes import FakeInteraction
+
+def slow_command(ephemeral_command: bool, ephemeral_reply: bool):
+    @main.instrumented(ephemeral=ephemeral_command)
+    async def lente(interaction):
+        await asyncio.sleep(0.05)
+        await main.reply(interaction, "réponse", ephemeral=ephemeral_reply)
+    return lente
+
+def test_private_command_defers_privately(campaign, monkeypatch):
+    monkeypatch.setattr(main, "AUTO_DEFER_BUDGET", 0.01)
+    interaction = FakeInteraction()
+    run(slow_command(True, True)(interaction))
+    assert interaction.sent[0] == ("defer", None, {"thinking": True, "ephemeral": True})
+    assert interaction.sent[1] == ("followup", "réponse", {"ephemeral": True})
+
+def test_private_error_after_public_defer_stays_private(campaign, monkeypatch):
+    monkeypatch.setattr(main, "AUTO_DEFER_BUDGET", 0.01)
+    interaction = FakeInteraction()
+    run(slow_command(False, True)(interaction))
+    assert [kind for kind, _, _ in interaction.sent] == ["defer", "delete", "followup"]
+    assert interaction.sent[0][2]["ephemeral"] is False
+    assert interaction.sent[2][2] == {"ephemeral": True}
+
+def test_public_reply_replaces_public_defer(campaign, monkeypatch):
+    monkeypatch.setattr(main, "AUTO_DEFER_BUDGET", 0.01)
+    interaction = FakeInteraction()
+    run(slow_command(False, False)(interaction))
+    assert [kind for kind, _, _ in interaction.sent] == ["defer", "followup"]
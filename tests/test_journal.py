@@ -0,0 +1,52 @@
+import json
+
+import main
+from conftest import active_planets, bataille, run
+
+def read_seqs(path: str) -> list:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line)["seq"] for line in f]
+    except FileNotFoundError:
+        return []
+
+def submit_all(campaign, events: list):
+    async def scenario():
+        for kind, data in events:
+            await campaign.writer.submit(kind, data)
+    run(scenario())
+
+def test_restart_replays_events_after_snapshot(campaign):
+    campaign.persister.delay = 60
+    planetes = active_planets(campaign)
+    submit_all(campaign, [("bataille", bataille(p)) for p in planetes[:5]])
+    expected = main.copy_json(main.snapshot_data(campaign))
+    assert campaign.store.load().get("journal_seq", 0) == 0  # aucun instantané encore
+
+    main.load_data(campaign)  # redémarrage : data.json d'origine + rejeu du journal
+    assert campaign.journal.seq == 5
+    assert campaign.journal.pending == 5
+    assert main.copy_json(main.snapshot_data(campaign)) == expected
+
+def test_snapshot_archives_included_events(campaign):
+    campaign.persister.delay = 60
+    planetes = active_planets(campaign)
+    submit_all(campaign, [("bataille", bataille(p)) for p in planetes[:3]])
+    run(campaign.persister.flush())
+    submit_all(campaign, [("modif", {"planete": planetes[0], "faction": "Pirate", "points": 7, "batailles": None})])
+
+    assert read_seqs(campaign.journal.archive_path) == [1, 2, 3]
+    assert read_seqs(campaign.journal.path) == [4]
+    assert campaign.journal.pending == 1
+
+    expected = main.copy_json(main.snapshot_data(campaign))
+    main.load_data(campaign)
+    assert main.copy_json(main.snapshot_data(campaign)) == expected
+
+def test_truncated_last_line_is_ignored(campaign):
+    campaign.persister.delay = 60
+    submit_all(campaign, [("bataille", bataille(active_planets(campaign)[0]))])
+    with open(campaign.journal.path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "type": "bataille", "da')
+    main.load_data(campaign)
+    assert campaign.journal.seq == 1
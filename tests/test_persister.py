@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+from conftest import active_planets, bataille, run
+
+async def wait_idle(persister, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while persister._task is not None and not persister._task.done():
+        assert time.monotonic() < deadline, "l'instantané ne s'est jamais terminé"
+        await asyncio.sleep(0.01)
+
+def test_mutation_during_slow_write_is_saved(campaign, monkeypatch):
+    campaign.persister.delay = 0.01
+    original = campaign.store.write
+    started = threading.Event()
+    calls = []
+
+    def slow_write(payload):
+        calls.append(payload["journal_seq"])
+        started.set()
+        time.sleep(0.2)
+        original(payload)
+
+    monkeypatch.setattr(campaign.store, "write", slow_write)
+    planete = active_planets(campaign)[0]
+
+    async def scenario():
+        await campaign.writer.submit("bataille", bataille(planete))
+        while not started.is_set():
+            await asyncio.sleep(0.005)
+        await campaign.writer.submit("bataille", bataille(planete))  # pendant l'écriture
+        await wait_idle(campaign.persister)
+
+    run(scenario())
+    assert calls == [1, 2]
+    assert not campaign.persister.dirty
+    assert campaign.store.load()["journal_seq"] == campaign.journal.seq == 2
+
+def test_failed_write_is_retried(campaign, monkeypatch):
+    campaign.persister.delay = 0.01
+    original = campaign.store.write
+    calls = []
+
+    def flaky_write(payload):
+        calls.append(payload["journal_seq"])
+        if len(calls) == 1:
+            raise OSError("disque plein")
+        original(payload)
+
+    monkeypatch.setattr(campaign.store, "write", flaky_write)
+
+    async def scenario():
+        await campaign.writer.submit("bataille", bataille(active_planets(campaign)[0]))
+        await wait_idle(campaign.persister)
+
+    run(scenario())
+    assert calls == [1, 1]
+    assert campaign.store.load()["journal_seq"] == 1
+    assert campaign.journal.pending == 0
+
+def test_close_writes_pending_state(campaign):
+    campaign.persister.delay = 60
+
+    async def scenario():
+        await campaign.writer.submit("bataille", bataille(active_planets(campaign)[0]))
+        await campaign.persister.close()
+
+    run(scenario())
+    assert campaign.store.load()["journal_seq"] == 1
+    assert not campaign.persister.dirty
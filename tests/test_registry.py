@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+
+import main
+from conftest import run
+from fakes import FakeInteraction
+
+def test_first_command_defers_then_loads_off_the_loop(registry, monkeypatch):
+    interaction = FakeInteraction(guild_id=2)
+    seen = []
+    original = main.load_data
+
+    def load_data(campaign):
+        seen.append((threading.current_thread() is threading.main_thread(), list(interaction.sent)))
+        original(campaign)
+
+    monkeypatch.setattr(main, "load_data", load_data)
+    planete = "Planète Principale"
+    run(main.planete.callback(interaction, planete))
+
+    (on_loop, sent_before), = seen
+    assert not on_loop
+    assert [kind for kind, _, _ in sent_before] == ["defer"]
+    assert interaction.sent[-1][0] == "followup"
+    assert registry.loaded(2) is not None and registry.loaded(1) is None
+
+def test_concurrent_interactions_share_one_load(registry, monkeypatch):
+    calls = []
+    original = main.load_data
+    monkeypatch.setattr(main, "load_data", lambda campaign: (calls.append(1), original(campaign)))
+
+    async def scenario():
+        return await asyncio.gather(registry.load(2), registry.load(2))
+
+    first, second = run(scenario())
+    assert first is second
+    assert calls == [1]
+
+def test_autocomplete_waits_for_background_load(registry):
+    async def scenario():
+        interaction = FakeInteraction(guild_id=2)
+        assert await main.autocomplete_planete(interaction, "") == []
+        while registry.loaded(2) is None:
+            await asyncio.sleep(0.01)
+        return await main.autocomplete_planete(FakeInteraction(guild_id=2), "")
+
+    assert run(scenario())
+
+def test_command_receives_its_campaign(registry):
+    interaction = FakeInteraction(guild_id=2)
+    run(main.planete.callback(interaction, "Planète Principale"))
+    assert interaction.extras["campaign"] is registry.loaded(2)
+
+def test_missing_guild_configuration_is_explicit(registry, monkeypatch):
+    monkeypatch.setattr(main, "GUILD_IDS", [])
+    with pytest.raises(RuntimeError, match="GUILD_ID"):
+        registry.get(None)
+
+def test_command_only_touches_its_guild(registry):
+    first, second = registry.get(1), registry.get(2)
+    run(main.ajout.callback(FakeInteraction(guild_id=2), "Planète Principale", "Envahisseur",
+                            "Envahisseur", "Envahisseur", "Défenseur"))
+    assert second.journal.seq == 1
+    assert first.journal.seq == 0
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import threading
+import time
+
+import main
+from conftest import active_planets, bataille, run
+from test_persister import wait_idle
+
+def test_operator_edit_survives_in_flight_snapshot(campaign, monkeypatch):
+    campaign.persister.delay = 0.01
+    original = campaign.store.write
+    started = threading.Event()
+
+    def slow_write(payload):
+        started.set()
+        time.sleep(0.2)
+        original(payload)
+
+    monkeypatch.setattr(campaign.store, "write", slow_write)
+    with open(campaign.store.path, encoding="utf-8") as f:
+        edited = json.load(f)
+    edited["HonneurKeyWords"] = ["Édité à la main"]
+
+    async def scenario():
+        await campaign.writer.submit("bataille", bataille(active_planets(campaign)[0]))
+        while not started.is_set():
+            await asyncio.sleep(0.005)
+        # L'opérateur enregistre pendant que l'instantané préparé avant lui s'écrit
+        digest = main.write_json_atomic(campaign.store.path, edited)
+        await main.apply_external_reload(campaign, json.loads(json.dumps(edited)), digest)
+        await wait_idle(campaign.persister)
+
+    run(scenario())
+    with open(campaign.store.path, encoding="utf-8") as f:
+        on_disk = json.load(f)
+    assert campaign.honneur_keywords == ["Édité à la main"]
+    assert on_disk["HonneurKeyWords"] == ["Édité à la main"]
+    assert on_disk["journal_seq"] == campaign.journal.seq == 1
+
+def test_plain_reload_installs_edit_without_rewriting(campaign):
+    with open(campaign.store.path, encoding="utf-8") as f:
+        edited = json.load(f)
+    edited["HonneurKeyWords"] = ["Nouveau"]
+    digest = main.write_json_atomic(campaign.store.path, edited)
+
+    run(main.apply_external_reload(campaign, edited, digest))
+    assert campaign.honneur_keywords == ["Nouveau"]
+    assert not campaign.persister.dirty
+    assert campaign.store.read_external() == (None, digest)
@@ -0,0 +1,44 @@
+import random
+
+import main
+from conftest import random_events, run
+
+def engine_state(engine: main.ScoringEngine) -> dict:
+    return {
+        "controller": {key: engine.controller[row] for key, row in engine.rows.items()},
+        "top": {key: engine.top[row] for key, row in engine.rows.items()},
+        "pv": {key: engine.pv[i] for key, i in engine.systems.items()},
+        "controlled": {key: engine.controlled[i] for key, i in engine.systems.items()},
+    }
+
+def rebuilt_state(campaign) -> dict:
+    engine = main.ScoringEngine(campaign)
+    engine.rebuild()
+    return engine_state(engine)
+
+def test_incremental_updates_match_full_rebuild(campaign):
+    campaign.persister.delay = 60
+    rng = random.Random(20)
+
+    async def scenario():
+        for kind, data in random_events(campaign, rng, 300):
+            await campaign.writer.submit(kind, data)
+            assert engine_state(campaign.scoring) == rebuilt_state(campaign)
+
+    run(scenario())
+
+def test_update_planet_reports_control_flip(campaign):
+    planete = "Planète Principale"
+    secteur, ss, systeme, stats = campaign.index.planet(planete)
+    for f in main.FACTIONS:
+        stats.set(f, main.POINTS, 0)
+    campaign.scoring.rebuild()
+
+    stats.set("Pirate", main.POINTS, 3)
+    change = campaign.scoring.update_planet(secteur, ss, systeme, planete)
+    assert (change["ancien"], change["nouveau"]) == (None, "Pirate")
+
+    stats.set("Défenseur", main.POINTS, 3)
+    change = campaign.scoring.update_planet(secteur, ss, systeme, planete)
+    assert (change["ancien"], change["nouveau"]) == ("Pirate", None)
+    assert campaign.scoring.leaders(secteur, ss, systeme, planete) == ["Défenseur", "Pirate"]
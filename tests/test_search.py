@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+import main
+from generate_campaign import generate_campaign
+
+def baseline(names: list, current: str) -> list:
+    """Autocomplétion d'origine : sous-chaîne en minuscules, dans l'ordre de la liste."""
+    return [n for n in names if current.lower() in n.lower()]
+
+def queries(names: list, rng) -> list:
+    """Préfixes, sous-chaînes (dont les trigrammes) et mots, en casse et accents d'origine."""
+    found = {"", " ", "zzz", "é", "’"}
+    for name in rng.sample(names, min(len(names), 40)):
+        for size in (1, 2, 3, 4, 6):
+            found.add(name[:size])
+            start = rng.randrange(len(name))
+            found.add(name[start:start + size])
+        found.update(name.split())
+    return sorted(found)
+
+def index_for(names: list) -> main.SearchIndex:
+    return main.SearchIndex((n, n, n) for n in names)
+
+def campaign_names() -> list:
+    data = generate_campaign(sous_secteurs=3, systemes=6, planetes=5, seed=4)
+    names = list(dict.fromkeys(
+        p for s in data["sectors"].values() for ss in s.values() for sy in ss.values() for p in sy
+    ))
+    # Noms réels de data.json : accents, apostrophes typographiques et mots multiples
+    return names + ["Station d'ancrage des Navigateurs de l'Obscure", "Station Bénédiction du champ Gleecer",
+                    "Twi’tai", "Planète Principale", "Élysée", "Cité-ruche Ærys"]
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_matches_accent_insensitive_baseline(seed):
+    names = campaign_names()
+    index = index_for(names)
+    for current in queries(names, random.Random(seed)):
+        results = [c.value for c in index.search(current, limit=len(names))]
+        query = main.normalize_search(current)
+        # Même ensemble que la recherche d'origine, les accents et apostrophes en moins
+        assert sorted(results) == sorted(
+            n for n in names if query in main.normalize_search(n)
+        ), current
+        assert set(baseline(names, current)) <= set(results), current
+        assert len(results) == len(set(results))
+
+def test_limit_keeps_baseline_results_when_they_fit():
+    names = campaign_names()
+    index = index_for(names)
+    for current in queries(names, random.Random(2)):
+        query = main.normalize_search(current)
+        matching = [n for n in names if query in main.normalize_search(n)]
+        results = [c.value for c in index.search(current)]
+        assert len(results) == min(25, len(matching))
+        if len(matching) <= 25:
+            assert set(baseline(names, current)) <= set(results), current
+
+def test_prefixes_come_first():
+    names = campaign_names()
+    index = index_for(names)
+    for current in ("pla", "sta", "tw", "el"):
+        query = main.normalize_search(current)
+        results = [main.normalize_search(c.value) for c in index.search(current, limit=len(names))]
+        prefixes = [r for r in results if r.startswith(query)]
+        assert results[:len(prefixes)] == sorted(prefixes)
+
+def test_accents_and_apostrophes_are_ignored():
+    index = index_for(campaign_names())
+    assert index.search("twitai") == index.search("Twi’tai") == index.search("TWI'TAI")
+    assert [c.value for c in index.search("benediction")] == ["Station Bénédiction du champ Gleecer"]
+    assert [c.value for c in index.search("elysee")] == [c.value for c in index.search("Élysée")]
@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+import main
+from conftest import ROOT, active_planets, bataille, run
+
+def full_state(campaign) -> dict:
+    # Tous les sous-secteurs chargés, pour comparer les deux backends à l'identique
+    for secteur, sous_secteurs in campaign.sectors.items():
+        for ss in list(sous_secteurs):
+            main.ensure_sub_sector(campaign, secteur, ss)
+    state = main.copy_json(main.snapshot_data(campaign))
+    state.pop("dormant")
+    return state
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_snapshot_round_trip(make_campaign, backend):
+    campaign = make_campaign(backend)
+    campaign.persister.delay = 60
+    planetes = active_planets(campaign)
+
+    async def scenario():
+        for p in planetes[:4]:
+            await campaign.writer.submit("bataille", bataille(p))
+        await campaign.writer.submit("modif", {"planete": planetes[0], "faction": "Pirate", "points": 9, "batailles": 2})
+        await campaign.persister.flush()
+
+    run(scenario())
+    expected = full_state(campaign)
+    main.install_data(campaign, campaign.store.load())
+    assert full_state(campaign) == expected
+
+def test_sqlite_migrates_data_json(make_campaign):
+    with open(os.path.join(ROOT, "data.json"), encoding="utf-8") as f:
+        original = json.load(f)
+    campaign = make_campaign("sqlite")
+    state = full_state(campaign)
+    for key in ("sectors", "system_rules", "active_systems", "phases_history", "total_parties"):
+        assert state[key] == original[key], key
+    assert state["phase_courante"] == original["phase_courante"]
+
+def test_sqlite_incremental_write_touches_dirty_planets_only(make_campaign):
+    campaign = make_campaign("sqlite")
+    campaign.persister.delay = 60
+    planete = active_planets(campaign)[0]
+    run(campaign.writer.submit("bataille", bataille(planete)))
+    assert {key[3] for key in campaign.dirty_planets} == {planete}
+    run(campaign.persister.flush())
+    assert not campaign.dirty_planets
+
+    expected = full_state(campaign)
+    main.install_data(campaign, campaign.store.load())
+    assert full_state(campaign) == expected
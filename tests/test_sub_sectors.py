@@ -0,0 +1,35 @@
+import json
+import os
+
+import main
+from conftest import ROOT, run
+
+def dormant(campaign) -> list:
+    return [(s, ss) for s, sous_secteurs in campaign.sectors.items() for ss, v in sous_secteurs.items() if v is None]
+
+def test_json_keeps_everything_loaded(campaign):
+    assert dormant(campaign) == []
+    run(campaign.evict_dormant())
+    assert dormant(campaign) == []
+
+def test_sqlite_loads_dormant_sub_sector_on_access(make_campaign, monkeypatch):
+    monkeypatch.setattr(main, "SUB_SECTOR_IDLE_TIMEOUT", 0)
+    with open(os.path.join(ROOT, "data.json"), encoding="utf-8") as f:
+        original = json.load(f)
+    campaign = make_campaign("sqlite")
+    asleep = dormant(campaign)
+    assert asleep
+
+    secteur, ss = asleep[0]
+    systeme, planetes = next(iter(campaign.layout[(secteur, ss)].items()))
+    assert planetes[0] in main.all_planets(campaign)
+    assert campaign.index.planet(planetes[0])[2] == systeme
+    assert campaign.sectors[secteur][ss] is not None
+
+    run(campaign.evict_dormant())
+    assert campaign.sectors[secteur][ss] is None
+
+    for s, sous_secteurs in campaign.sectors.items():
+        for x in list(sous_secteurs):
+            main.ensure_sub_sector(campaign, s, x)
+    assert main.copy_json(campaign.sectors) == original["sectors"]
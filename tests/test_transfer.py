@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+import main
+from conftest import run
+from fakes import FakeInteraction
+
+class FakeThread:
+    def __init__(self, thread_id: int, checkpoint: main.TransferCheckpoint, source_id: int):
+        self.id = thread_id
+        self.sent = []
+        self.checkpoint = checkpoint
+        self.source_id = source_id
+
+    async def send(self, content, **kwargs):
+        # Le checkpoint ne doit marquer le premier message copié qu'une fois tout posté
+        self.sent.append((content, self.source_id in self.checkpoint.done))
+
+class FakeForum:
+    def __init__(self, checkpoint: main.TransferCheckpoint, source_id: int):
+        self.id = 20
+        self.created = []
+        self.checkpoint = checkpoint
+        self.source_id = source_id
+
+    async def create_thread(self, name, content, files, applied_tags):
+        thread = FakeThread(30, self.checkpoint, self.source_id)
+        self.created.append((content, thread))
+        return SimpleNamespace(thread=thread)
+
+def test_long_first_message_is_posted_whole(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "TRANSFER_DIR", str(tmp_path))
+    checkpoint = main.TransferCheckpoint(10, 20)
+    source = SimpleNamespace(id=11, name="Rapport", applied_tags=[])
+    forum = FakeForum(checkpoint, source.id)
+    first = SimpleNamespace(id=12, content="x" * (2 * main.MESSAGE_MAX_LEN + 10),
+                            author=SimpleNamespace(display_name="Auteur"))
+    transfer = main.ThreadTransfer(FakeInteraction(), forum, {}, checkpoint)
+
+    run(transfer.create_target_thread(source, first))
+
+    (content, thread), = forum.created
+    assert content + "".join(chunk for chunk, _ in thread.sent) == f"**Auteur:** {first.content}"
+    assert len(thread.sent) == 2
+    assert not any(done for _, done in thread.sent)
+    assert checkpoint.done == {source.id: thread.id}
+    assert checkpoint.last_message == {source.id: first.id}
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import main
+from conftest import active_planets, bataille, run
+
+def journal_seqs(campaign) -> list:
+    with open(campaign.journal.path, encoding="utf-8") as f:
+        return [json.loads(line)["seq"] for line in f]
+
+def test_rejected_event_is_not_journaled(campaign):
+    with pytest.raises(main.MutationError):
+        run(campaign.writer.submit("bataille", bataille("Planète inexistante")))
+    assert campaign.journal.seq == 0
+    assert not main.os.path.exists(campaign.journal.path)
+
+def test_failed_handler_does_not_consume_seq(campaign):
+    campaign.persister.delay = 60
+    planete = active_planets(campaign)[0]
+
+    def broken(campaign, event):
+        raise RuntimeError("panne")
+
+    async def scenario():
+        await campaign.writer.submit("bataille", bataille(planete))
+        main.EVENT_HANDLERS["bataille"] = broken
+        try:
+            with pytest.raises(RuntimeError):
+                await campaign.writer.submit("bataille", bataille(planete))
+        finally:
+            main.EVENT_HANDLERS["bataille"] = main.apply_bataille
+        await campaign.writer.submit("bataille", bataille(planete))
+
+    run(scenario())
+    assert journal_seqs(campaign) == [1, 2]
+    assert campaign.journal.seq == 2
+
+def test_journal_failure_forces_snapshot(campaign, monkeypatch):
+    campaign.persister.delay = 60
+
+    def full_disk(event):
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(campaign.journal, "append", full_disk)
+
+    async def scenario():
+        await campaign.writer.submit("bataille", bataille(active_planets(campaign)[0]))
+        await campaign.persister._task
+
+    run(scenario())
+    assert campaign.store.load()["journal_seq"] == 1